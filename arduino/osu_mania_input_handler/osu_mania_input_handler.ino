@@ -1,47 +1,172 @@
 #include <Arduino.h>
 
+// leds das lanes acendem com as notas que o jogo manda (game/chart_streamer.py)
+// e os botoes mandam press/release (game/serial_input.py). nada bloqueia: o
+// loop le a serial, os botoes e agenda os leds por millis().
+// o emulador em tools/device_emulator.py segue esta mesma logica.
+
 struct Note {
-  unsigned long time;
-  byte lane;        
+  long time;   // inicio (ms da musica)
+  byte lane;
+  long off;    // quando apagar (ms da musica)
 };
 
-// Beatmap - exemplo (Hard)
-Note beatmap[] = {
-  {500, 0}, {750, 1}, {1000, 2}, {1250, 3},
-  {1500, 0}, {1750, 2}, {2000, 1}
-};
-const int totalNotes = sizeof(beatmap) / sizeof(Note);
+// pacotes do pc: 0xAA, tipo, tamanho, payload, xor(tipo, tamanho, payload)
+const byte SYNC_BYTE = 0xAA;
+const byte PKT_RESET = 'R';  // uint8 geracao: esvazia o anel e apaga os leds
+const byte PKT_SYNC = 'S';   // int32: posicao da musica agora (ms)
+const byte PKT_NOTES = 'N';  // n x (uint32 tempo, uint8 led, uint16 duracao)
+const byte NOTE_SIZE = 7;
 
-const int ledPins[] = {2, 3, 4, 5}; 
-int currentNote = 0;
-unsigned long startTime;
+// placa -> pc
+const byte EV_RELEASE = 0x80;  // | lane
+const byte EV_PRESS = 0xA0;    // | lane
+const byte EV_CREDIT = 0xC0;   // | n posicoes liberadas no anel (n < 48)
+const byte ACK_RESET = 0xF0;   // | geracao do reset (0 = boot)
 
-void setup() {
+const byte RING_SIZE = 32;  // o pc nunca manda mais que os creditos
+const long TAP_MS = 80;     // led aceso numa nota simples
+
+const int ledPins[] = {2, 3, 4, 5};
+const int buttonPins[] = {6, 7, 8, 9};  // ligados ao GND, pull-up interno
+const unsigned long DEBOUNCE_US = 5000;
+
+Note ring[RING_SIZE];
+byte ringHead = 0;
+byte ringCount = 0;
+
+long offset = 0;      // millis() - posicao da musica
+bool synced = false;
+bool ledOn[4];
+long ledOff[4];
+
+bool pressed[4];
+unsigned long lastChange[4];
+
+// parser
+byte pState = 0, pType, pLen, pPos, pChk;
+byte pBuf[64];
+
+void resetBoard(byte gen) {
+  ringHead = 0;
+  ringCount = 0;
+  synced = false;
   for (int i = 0; i < 4; i++) {
-    pinMode(ledPins[i], OUTPUT);
+    ledOn[i] = false;
     digitalWrite(ledPins[i], LOW);
   }
+  Serial.write(ACK_RESET | (gen & 0x0F));
+  Serial.write(EV_CREDIT | RING_SIZE);
+}
 
-  Serial.begin(115200);
-  Serial.println("inicie a musica e pressione reset");
-  delay(2000);
-  startTime = millis();
+unsigned long readU32(const byte *p) {
+  return (unsigned long)p[0] | ((unsigned long)p[1] << 8) | ((unsigned long)p[2] << 16) | ((unsigned long)p[3] << 24);
 }
 
-void loop() {
-  unsigned long now = millis() - startTime;
+void handlePacket() {
+  if (pType == PKT_RESET) {
+    resetBoard(pLen ? pBuf[0] : 0);
+  } else if (pType == PKT_SYNC && pLen == 4) {
+    offset = (long)millis() - (long)readU32(pBuf);
+    synced = true;
+  } else if (pType == PKT_NOTES) {
+    for (byte i = 0; i + NOTE_SIZE <= pLen; i += NOTE_SIZE) {
+      if (ringCount >= RING_SIZE) {
+        Serial.write(EV_CREDIT | 1);  // nao cabe: devolve o credito
+        continue;
+      }
+      Note &n = ring[(ringHead + ringCount) % RING_SIZE];
+      n.time = (long)readU32(pBuf + i);
+      n.lane = pBuf[i + 4] & 3;
+      unsigned int dur = pBuf[i + 5] | (pBuf[i + 6] << 8);
+      n.off = n.time + (dur ? (long)dur : TAP_MS);
+      ringCount++;
+    }
+  }
+}
+
+void readSerial() {
+  while (Serial.available()) {
+    byte b = Serial.read();
+    switch (pState) {
+      case 0:  // espera o 0xAA
+        if (b == SYNC_BYTE) pState = 1;
+        break;
+      case 1:
+        pType = b;
+        pChk = b;
+        pState = 2;
+        break;
+      case 2:
+        pLen = b;
+        pChk ^= b;
+        pPos = 0;
+        pState = b > sizeof(pBuf) ? 0 : (b ? 3 : 4);
+        break;
+      case 3:
+        pBuf[pPos++] = b;
+        pChk ^= b;
+        if (pPos == pLen) pState = 4;
+        break;
+      case 4:  // checksum; pacote ruim eh descartado
+        if (b == pChk) handlePacket();
+        pState = 0;
+        break;
+    }
+  }
+}
 
-  if (currentNote < totalNotes && now >= beatmap[currentNote].time) {
-    int lane = beatmap[currentNote].lane;
-    digitalWrite(ledPins[lane], HIGH);
-    Serial.print("nota na lane ");
-    Serial.print(lane);
-    Serial.print(" em ");
-    Serial.println(now);
+void readButtons() {
+  unsigned long nowUs = micros();
+  for (int i = 0; i < 4; i++) {
+    bool down = digitalRead(buttonPins[i]) == LOW;
+    if (down != pressed[i] && nowUs - lastChange[i] >= DEBOUNCE_US) {
+      pressed[i] = down;
+      lastChange[i] = nowUs;
+      Serial.write((down ? EV_PRESS : EV_RELEASE) | i);
+    }
+  }
+}
 
-    delay(100); 
-    digitalWrite(ledPins[lane], LOW);
+void updateLeds() {
+  if (!synced) return;
+  long now = (long)millis() - offset;
+
+  // notas que chegaram na hora: acende e libera a posicao no anel
+  byte freed = 0;
+  while (ringCount && ring[ringHead].time <= now) {
+    Note &n = ring[ringHead];
+    if (!ledOn[n.lane] || n.off > ledOff[n.lane]) ledOff[n.lane] = n.off;
+    ledOn[n.lane] = true;
+    digitalWrite(ledPins[n.lane], HIGH);
+    ringHead = (ringHead + 1) % RING_SIZE;
+    ringCount--;
+    freed++;
+  }
+  if (freed) Serial.write(EV_CREDIT | freed);
+
+  for (int i = 0; i < 4; i++) {
+    if (ledOn[i] && now >= ledOff[i]) {
+      ledOn[i] = false;
+      digitalWrite(ledPins[i], LOW);
+    }
+  }
+}
 
-    currentNote++;
+void setup() {
+  for (int i = 0; i < 4; i++) {
+    pinMode(ledPins[i], OUTPUT);
+    digitalWrite(ledPins[i], LOW);
+    pinMode(buttonPins[i], INPUT_PULLUP);
   }
+
+  Serial.begin(115200);
+  Serial.println("osu mania controller");
+  resetBoard(0);  // avisa o pc que o anel esta vazio (geracao 0 = boot)
+}
+
+void loop() {
+  readSerial();
+  readButtons();
+  updateLeds();
 }
@@ -0,0 +1,115 @@
+# game/asset_cache.py
+# cache LRU de surfaces ja carregadas, convertidas e escaladas.
+# chave: (caminho, tamanho alvo, modo); limite por bytes de pixel.
+# compartilhado entre menu e gameplay; zera quando o tamanho da janela muda.
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import pygame
+
+DEFAULT_BUDGET = 64 * 1024 * 1024  # 64 MB de pixels
+
+# modos: "opaque" -> convert + scale, "alpha" -> convert_alpha + smoothscale,
+#        "dimNNN" -> opaque com escurecimento NNN (0..255) ja aplicado
+# a carga tem duas etapas: decode() nao precisa da janela (roda em thread,
+# devolve bytes prontos para frombuffer); finish() converte no formato da tela.
+def decode(path: str, size: Tuple[int, int], mode: str) -> Tuple[bytes, Tuple[int, int], str]:
+    img = pygame.image.load(path)
+    if mode == "alpha":
+        # smoothscale exige 32 bits; copia para uma surface RGBA (sem precisar da janela)
+        rgba = pygame.Surface(img.get_size(), pygame.SRCALPHA, 32)
+        rgba.blit(img, (0, 0))
+        img = pygame.transform.smoothscale(rgba, size)
+        return pygame.image.tobytes(img, "RGBA"), size, "RGBA"
+    img = pygame.transform.scale(img, size)
+    return pygame.image.tobytes(img, "RGB"), size, "RGB"
+
+def finish(data: bytes, size: Tuple[int, int], fmt: str, mode: str) -> pygame.Surface:
+    img = pygame.image.frombuffer(data, size, fmt)
+    if mode == "alpha":
+        return img.convert_alpha()
+    surf = img.convert()
+    if mode.startswith("dim"):
+        shade = pygame.Surface(size, pygame.SRCALPHA)
+        shade.fill((0, 0, 0, int(mode[3:])))
+        surf.blit(shade, (0, 0))
+    return surf
+
+def _load(path: str, size: Tuple[int, int], mode: str) -> pygame.Surface:
+    return finish(*decode(path, size, mode), mode)
+
+def _nbytes(surf: pygame.Surface) -> int:
+    w, h = surf.get_size()
+    return w * h * surf.get_bytesize()
+
+class SurfaceCache:
+    def __init__(self, budget: int = DEFAULT_BUDGET):
+        self.budget = budget
+        self.items: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.failed: set = set()  # (caminho, tamanho) que nao carregou: nao tenta de novo
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.display_size: Optional[Tuple[int, int]] = None
+
+    def check_display(self, size: Tuple[int, int]):
+        # surfaces foram escaladas/convertidas para a janela antiga
+        if size != self.display_size:
+            self.clear()
+            self.display_size = size
+
+    def clear(self):
+        self.items.clear()
+        self.failed.clear()
+        self.bytes = 0
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self.items
+
+    def get(self, path: Optional[str], size: Tuple[int, int], mode: str = "opaque",
+            load: bool = True) -> Optional[pygame.Surface]:
+        # load=False: so consulta o cache (quem carrega eh o prefetch)
+        if not path:
+            return None
+        key = (path, tuple(size), mode)
+        surf = self.items.get(key)
+        if surf is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        if not load or (path, key[1]) in self.failed:
+            return None
+        try:
+            surf = _load(path, key[1], mode)
+        except (pygame.error, OSError):
+            # capa/bg quebrado: senao relia o disco (e estourava) a cada frame
+            self.failed.add((path, key[1]))
+            return None
+        self.put(key, surf)
+        return surf
+
+    def put(self, key: tuple, surf: pygame.Surface):
+        self.failed.discard((key[0], key[1]))
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.bytes -= _nbytes(old)
+        self.items[key] = surf
+        self.bytes += _nbytes(surf)
+        # nunca remove o item recem inserido, mesmo se ele sozinho passar do limite
+        while self.bytes > self.budget and len(self.items) > 1:
+            _, ev = self.items.popitem(last=False)
+            self.bytes -= _nbytes(ev)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "items": len(self.items), "failed": len(self.failed), "bytes": self.bytes, "budget": self.budget,
+        }
+
+# instancia compartilhada por menu e gameplay
+surfaces = SurfaceCache()
@@ -0,0 +1,126 @@
+# game/audio_info.py
+# duracao de um audio (ms) lida so dos cabecalhos, sem decodificar nem abrir
+# o mixer: serve para validar charts em lote (tools/validate_beatmaps.py).
+#  wav -> bytes do chunk data / byte rate do chunk fmt
+#  ogg -> granule da ultima pagina / sample rate (vorbis; opus a 48 kHz)
+#  mp3 -> frames do cabecalho Xing/Info/VBRI; sem ele (CBR), tamanho / bitrate
+# devolve None se o formato nao for reconhecido.
+from __future__ import annotations
+import os, struct
+from typing import Optional
+
+TAIL = 65536  # final do ogg lido para achar a ultima pagina
+
+def audio_length_ms(path: str) -> Optional[int]:
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        with open(path, "rb") as f:
+            if ext == ".wav":
+                return _wav(f)
+            if ext == ".ogg":
+                return _ogg(f)
+            if ext == ".mp3":
+                return _mp3(f, os.fstat(f.fileno()).st_size)
+    except (OSError, struct.error):
+        return None
+    return None
+
+def _wav(f) -> Optional[int]:
+    head = f.read(12)
+    if head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return None
+    byte_rate = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        cid, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if cid == b"fmt ":
+            fmt = f.read(size)
+            byte_rate = struct.unpack_from("<I", fmt, 8)[0]
+            size = 0
+        elif cid == b"data":
+            return size * 1000 // byte_rate if byte_rate else None
+        f.seek(size + (size & 1), 1)  # chunks alinhados em 2 bytes
+
+def _ogg(f) -> Optional[int]:
+    first = f.read(4096)
+    if first[:4] != b"OggS":
+        return None
+    body = first[27 + first[26]:]  # pula o header e a tabela de segmentos
+    if body[:7] == b"\x01vorbis":
+        rate, pre_skip = struct.unpack_from("<I", body, 12)[0], 0
+    elif body[:8] == b"OpusHead":
+        rate, pre_skip = 48000, struct.unpack_from("<H", body, 10)[0]
+    else:
+        return None
+    f.seek(0, 2)
+    size = f.tell()
+    f.seek(max(0, size - TAIL))
+    tail = f.read()
+    i = tail.rfind(b"OggS")
+    if i < 0 or i + 14 > len(tail):
+        return None
+    granule = struct.unpack_from("<q", tail, i + 6)[0]
+    return max(0, granule - pre_skip) * 1000 // rate if rate else None
+
+# kbps por (mpeg1?, layer)
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_BITRATES[(False, 3)] = _BITRATES[(False, 2)]
+_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+def _frame(h: bytes):
+    # (bitrate bps, sample rate, amostras por frame, tamanho, mpeg1, mono) ou None
+    if len(h) < 4 or h[0] != 0xFF or h[1] & 0xE0 != 0xE0:
+        return None
+    version, layer = (h[1] >> 3) & 3, 4 - ((h[1] >> 1) & 3)
+    br_idx, sr_idx, pad = h[2] >> 4, (h[2] >> 2) & 3, (h[2] >> 1) & 1
+    if version == 1 or layer == 4 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][br_idx] * 1000
+    rate = _RATES[version][sr_idx]
+    if layer == 1:
+        spf, size = 384, (12 * bitrate // rate + pad) * 4
+    else:
+        spf = 1152 if layer == 2 or mpeg1 else 576
+        size = spf // 8 * bitrate // rate + pad
+    return bitrate, rate, spf, size, mpeg1, (h[3] >> 6) == 3
+
+def _mp3(f, file_size: int) -> Optional[int]:
+    head = f.read(10)
+    start = 0
+    if head[:3] == b"ID3":  # tag id3v2 no inicio: tamanho syncsafe
+        start = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+        if head[5] & 0x10:
+            start += 10
+    f.seek(start)
+    buf = f.read(65536)
+    for i in range(len(buf) - 4):
+        fr = _frame(buf[i:i + 4])
+        if fr is None:
+            continue
+        bitrate, rate, spf, size, mpeg1, mono = fr
+        # confirma com o header do frame seguinte (evita sync falso)
+        nxt = buf[i + size:i + size + 4]
+        if len(nxt) == 4 and _frame(nxt) is None:
+            continue
+        side = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+        xing = buf[i + 4 + side:i + 4 + side + 12]
+        if xing[:4] in (b"Xing", b"Info") and struct.unpack(">I", xing[4:8])[0] & 1:
+            return struct.unpack(">I", xing[8:12])[0] * spf * 1000 // rate
+        vbri = buf[i + 36:i + 54]
+        if vbri[:4] == b"VBRI":
+            return struct.unpack_from(">I", vbri, 14)[0] * spf * 1000 // rate
+        audio = file_size - (start + i)
+        f.seek(file_size - 128)
+        if f.read(3) == b"TAG":  # id3v1 no fim
+            audio -= 128
+        return audio * 8 * 1000 // bitrate
+    return None
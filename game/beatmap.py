@@ -0,0 +1,58 @@
+# game/beatmap.py
+# representacao compacta de um beatmap: colunas paralelas em array
+# (tempo em ms, lane, fim do hold em ms, flag de julgamento) em vez de
+# um dict por nota. ~10 bytes por nota contra 200+ do list-of-dicts.
+from array import array
+
+class Beatmap:
+    __slots__ = ("times", "lanes", "ends", "judged", "meta")
+
+    def __init__(self, meta=None):
+        self.times = array("i")     # inicio da nota (ms)
+        self.lanes = array("b")     # 0..3
+        self.ends = array("i")      # fim do hold (ms); 0 = nota simples
+        self.judged = bytearray()   # 0/1, estado da gameplay
+        self.meta = meta or {}
+
+    @classmethod
+    def from_notes(cls, notes, meta=None):
+        # notes: iteravel de (tempo_ms, lane) ou (tempo_ms, lane, fim_ms)
+        bm = cls(meta)
+        for n in notes:
+            bm.append(*n)
+        return bm
+
+    def append(self, time: int, lane: int, end: int = 0):
+        self.times.append(int(time))
+        self.lanes.append(int(lane))
+        self.ends.append(int(end))
+        self.judged.append(0)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        # (tempo, lane, fim) por nota
+        return zip(self.times, self.lanes, self.ends)
+
+    def is_sorted(self) -> bool:
+        t = self.times
+        return all(t[i] <= t[i + 1] for i in range(len(t) - 1))
+
+    def sort(self):
+        # ordena todas as colunas pelo tempo (estavel)
+        if self.is_sorted():
+            return self
+        order = sorted(range(len(self.times)), key=self.times.__getitem__)
+        self.times = array("i", (self.times[i] for i in order))
+        self.lanes = array("b", (self.lanes[i] for i in order))
+        self.ends = array("i", (self.ends[i] for i in order))
+        self.judged = bytearray(self.judged[i] for i in order)
+        return self
+
+    def reset(self):
+        # limpa o estado de julgamento (ex: reiniciar a musica)
+        self.judged[:] = bytes(len(self.times))
+
+    def nbytes(self) -> int:
+        return sum(c.itemsize * len(c) for c in (self.times, self.lanes, self.ends)) + len(self.judged)
@@ -0,0 +1,130 @@
+# game/beatmap_cache.py
+# cache binario dos charts: cada <chart>.json ganha um <chart>.bmc ao lado.
+# layout (little-endian):
+#   header  -> magic, versao, flags, mtime_ns e tamanho do json, hash do json,
+#              numero de notas, tamanho do bloco de metadados
+#   colunas -> int32 tempos[n], int32 fins[n], uint8 lanes[n]
+#   meta    -> json utf-8 com os metadados do chart
+# o arquivo eh lido via mmap; se o json mudou (mtime/tamanho e hash) recompila.
+# mtime mudou mas o hash bate (touch, git checkout): so o mtime do header eh
+# regravado, para as proximas cargas nao rehashearem o json.
+from __future__ import annotations
+import hashlib, json, mmap, os, struct, sys, tempfile
+from array import array
+from typing import Callable
+
+from .beatmap import Beatmap
+
+MAGIC = b"OMBC"
+VERSION = 3  # 3: fins de hold vindos do parser
+HEADER = struct.Struct("<4sHHqQ16sII")
+MTIME_OFFSET = 8  # depois de magic, versao e flags
+EXT = ".bmc"
+
+def cache_path(chart_path: str) -> str:
+    return os.path.splitext(chart_path)[0] + EXT
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def _column(typecode: str, buf) -> array:
+    col = array(typecode)
+    col.frombytes(buf)
+    if sys.byteorder != "little" and col.itemsize > 1:
+        col.byteswap()
+    return col
+
+def _le_bytes(col: array) -> bytes:
+    if sys.byteorder != "little" and col.itemsize > 1:
+        col = array(col.typecode, col)
+        col.byteswap()
+    return col.tobytes()
+
+def write_cache(chart_path: str, bm: Beatmap, src: bytes, st: os.stat_result):
+    meta = json.dumps(bm.meta, ensure_ascii=False).encode("utf-8")
+    header = HEADER.pack(MAGIC, VERSION, 0, st.st_mtime_ns, st.st_size, _digest(src), len(bm), len(meta))
+
+    path = cache_path(chart_path)
+    tmp_fd, tmp_path = tempfile.mkstemp(prefix=".tmp_bmc_", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(tmp_fd, "wb") as f:
+            f.write(header)
+            f.write(_le_bytes(bm.times))
+            f.write(_le_bytes(bm.ends))
+            f.write(bm.lanes.tobytes())
+            f.write(meta)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _read_header(mm):
+    if len(mm) < HEADER.size:
+        return None
+    magic, version, _flags, mtime_ns, size, digest, count, meta_len = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION:
+        return None
+    if len(mm) != HEADER.size + count * 9 + meta_len:
+        return None
+    return mtime_ns, size, digest, count, meta_len
+
+def _from_mmap(mm, count: int, meta_len: int) -> Beatmap:
+    off = HEADER.size
+    bm = Beatmap()
+    bm.times = _column("i", mm[off:off + 4*count]); off += 4*count
+    bm.ends = _column("i", mm[off:off + 4*count]); off += 4*count
+    bm.lanes = _column("b", mm[off:off + count]); off += count
+    bm.judged = bytearray(count)
+    bm.meta = json.loads(mm[off:off + meta_len].decode("utf-8")) if meta_len else {}
+    return bm
+
+def _touch_header(path: str, mtime_ns: int):
+    # conteudo igual com mtime novo: atualiza so o campo do header
+    try:
+        with open(path, "r+b") as f:
+            f.seek(MTIME_OFFSET)
+            f.write(struct.pack("<q", mtime_ns))
+    except OSError:
+        pass  # pasta so de leitura: continua valido, so mais lento
+
+def read_cache(chart_path: str, st: os.stat_result | None = None) -> Beatmap | None:
+    # devolve o Beatmap do cache se ele ainda corresponde ao json; senao None
+    path = cache_path(chart_path)
+    try:
+        st = st or os.stat(chart_path)
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hdr = _read_header(mm)
+                if hdr is None:
+                    return None
+                mtime_ns, size, digest, count, meta_len = hdr
+                stale = (mtime_ns, size) != (st.st_mtime_ns, st.st_size)
+                if stale:
+                    # mtime mudou: so confia se o conteudo for o mesmo
+                    with open(chart_path, "rb") as src:
+                        if _digest(src.read()) != digest:
+                            return None
+                bm = _from_mmap(mm, count, meta_len)
+    except (OSError, ValueError):
+        return None
+    if stale:
+        _touch_header(path, st.st_mtime_ns)
+    return bm
+
+def compile_chart(chart_path: str, parse: Callable[[bytes], Beatmap]) -> Beatmap:
+    # parseia o json e grava o .bmc; se nao der pra gravar, segue so com o parse
+    st = os.stat(chart_path)
+    with open(chart_path, "rb") as f:
+        src = f.read()
+    bm = parse(src).sort()
+    try:
+        write_cache(chart_path, bm, src, st)
+    except OSError:
+        pass
+    return bm
+
+def load_beatmap(chart_path: str, parse: Callable[[bytes], Beatmap]) -> Beatmap:
+    bm = read_cache(chart_path)
+    if bm is None:
+        bm = compile_chart(chart_path, parse)
+    return bm
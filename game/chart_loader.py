@@ -0,0 +1,127 @@
+# game/chart_loader.py
+# loader unico de charts, usado pelo menu, gameplay e tools.
+# formatos aceitos:
+#  v1 -> [{ "tempo": ms, "coluna": 1..4 }, ...]                  em <diff>.json
+#  v2 -> { "song": {...}, "approach_rate": n,
+#          "notes": [{ "time": segundos, "lane": 0..3 }, ...] }  em <song>_<diff>.json
+# a conversao (segundos -> ms, offset_ms, coluna -> lane) acontece uma vez,
+# na compilacao do cache binario; a gameplay recebe o Beatmap pronto.
+from __future__ import annotations
+import json, os
+from typing import Any, Dict, Optional
+
+from . import beatmap_cache
+from .beatmap import Beatmap
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SONGS_DIR = os.path.join(ROOT, "musicas")
+BG_ASSETS_DIR = os.path.join(ROOT, "assets", "backgrounds")
+
+DIFFS = ("easy", "normal", "hard", "expert", "master")
+AUDIO_NAMES = ("audio.mp3", "musica.mp3")
+AUDIO_EXTS = (".mp3", ".ogg", ".wav")
+COVER_NAMES = ("capa.png", "capa.jpg", "cover.png", "cover.jpg")
+BG_NAMES = ("background.png", "background.jpg")
+
+def song_dir(song_id: str) -> str:
+    return os.path.join(SONGS_DIR, song_id)
+
+def _chart_diff(filename: str) -> Optional[str]:
+    # "easy.json", "minha_musica_hard.json" (e ate "x_normal.json.json") -> diff
+    if not filename.lower().endswith(".json"):
+        return None
+    stem = filename
+    while stem.lower().endswith(".json"):
+        stem = stem[:-5]
+    diff = stem.rsplit("_", 1)[-1].lower()
+    return diff if diff in DIFFS else None
+
+def find_charts(folder: str, names=None) -> Dict[str, str]:
+    # {diff: caminho} na ordem de DIFFS; names evita listar a pasta de novo
+    if names is None:
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            return {}
+    found = {}
+    for name in sorted(names):
+        diff = _chart_diff(name)
+        if diff and diff not in found:
+            found[diff] = os.path.join(folder, name)
+    return {d: found[d] for d in DIFFS if d in found}
+
+def _first(folder: str, names, candidates) -> Optional[str]:
+    for c in candidates:
+        if c in names:
+            return os.path.join(folder, c)
+    return None
+
+def find_audio(folder: str, names=None, meta: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    if names is None:
+        try:
+            names = set(os.listdir(folder))
+        except OSError:
+            return None
+    if meta and meta.get("audio_file") in names:
+        return os.path.join(folder, meta["audio_file"])
+    audio = _first(folder, names, AUDIO_NAMES)
+    if audio:
+        return audio
+    for name in sorted(names):
+        if name.lower().endswith(AUDIO_EXTS):
+            return os.path.join(folder, name)
+    return None
+
+def find_cover(folder: str, names) -> Optional[str]:
+    return _first(folder, names, COVER_NAMES)
+
+def find_bg(folder: str, names) -> Optional[str]:
+    bg = _first(folder, names, BG_NAMES)
+    if bg:
+        return bg
+    # fallback: assets/backgrounds/<song_id>.jpg ou <song_id>_bg.jpg
+    song_id = os.path.basename(os.path.normpath(folder))
+    for cand in (f"{song_id}.jpg", f"{song_id}_bg.jpg", f"{song_id}.png", f"{song_id}_bg.png"):
+        p = os.path.join(BG_ASSETS_DIR, cand)
+        if os.path.exists(p):
+            return p
+    return None
+
+def detect_format(data) -> int:
+    if isinstance(data, list):
+        return 1
+    if isinstance(data, dict) and isinstance(data.get("notes"), list):
+        return 2
+    raise ValueError("formato de chart desconhecido")
+
+def read_meta(data) -> Dict[str, Any]:
+    if detect_format(data) == 1:
+        return {"format": 1}
+    song = data.get("song") or {}
+    return {
+        "format": 2,
+        "title": song.get("title"),
+        "artist": song.get("artist"),
+        "bpm": song.get("bpm"),
+        "audio_file": song.get("audio_file"),
+        "offset_ms": int(song.get("offset_ms", 0) or 0),
+        "preview_ms": int(song["preview_ms"]) if song.get("preview_ms") is not None else None,
+        "difficulty": data.get("difficulty"),
+        "approach_rate": data.get("approach_rate"),
+    }
+
+def parse_chart(src: bytes) -> Beatmap:
+    data = json.loads(src)
+    meta = read_meta(data)
+    # hold: v1 "fim" (ms), v2 "end" (s); sem fim = nota simples (fim 0)
+    if meta["format"] == 1:
+        notes = ((n["tempo"], n["coluna"] - 1, n.get("fim") or 0) for n in data)
+    else:
+        off = meta["offset_ms"]
+        notes = ((round(n["time"] * 1000) + off, n["lane"],
+                  round(n["end"] * 1000) + off if n.get("end") is not None else 0)
+                 for n in data["notes"])
+    return Beatmap.from_notes(notes, meta).sort()
+
+def load_chart(path: str) -> Beatmap:
+    return beatmap_cache.load_beatmap(path, parse_chart)
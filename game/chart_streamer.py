@@ -0,0 +1,190 @@
+# game/chart_streamer.py
+# manda as proximas notas do beatmap carregado para o arduino acender os leds,
+# em vez de um beatmap[] fixo gravado no sketch.
+# pacotes pc -> placa:  0xAA, tipo, tamanho, payload, xor(tipo, tamanho, payload)
+#   'R'  reset: uint8 geracao; a placa esvazia o buffer, apaga os leds e
+#        responde ACK_RESET | geracao
+#   'S'  sync: int32 = posicao da musica (ms); a placa guarda millis() - pos
+#   'N'  notas: ate NOTES_PER_PACKET x (uint32 tempo ms, uint8 led, uint16 duracao ms)
+# controle placa -> pc (mesma porta do game.serial_input):
+#   0xF0 | g     reset da geracao g feito, buffer vazio (g = 0: boot da placa)
+#   0xC0 | n     n posicoes do buffer liberadas (n = 1..47)
+# o host so aceita o ACK da geracao do ultimo 'R' que mandou: um ACK velho
+# (boot, ou de um reset reenviado) chegando depois nao zera os creditos com o
+# anel ainda cheio. creditos antes do ACK certo sao do anel antigo e caem fora.
+# controle de fluxo por creditos: cada nota enviada gasta um, cada nota que a
+# placa tira do anel devolve um, entao o anel (RING_SIZE no sketch) nunca
+# estoura. alem disso so vai o que cai em window_ms a frente da musica.
+# o sync sai a cada sync_ms com SongClock.position(), entao a placa acompanha
+# o mesmo relogio da gameplay (inclusive correcoes de drift).
+# sem controle ligado, get_streamer devolve NULL_STREAMER (nao faz nada).
+from __future__ import annotations
+import struct, time
+from bisect import bisect_left
+from itertools import accumulate
+from collections import deque
+from typing import Optional
+
+from .beatmap import Beatmap
+from .serial_input import load_controller_config
+
+SYNC_BYTE = 0xAA
+PKT_RESET = ord("R")
+PKT_SYNC = ord("S")
+PKT_NOTES = ord("N")
+ACK_RESET = 0xF0
+ACK_MASK = 0xF0
+GEN_MASK = 0x0F  # geracoes 1..15 do host; 0 = boot
+CREDIT_MASK = 0x3F
+NOTES_PER_PACKET = 8  # 60 bytes: cabe no buffer de rx de 64 bytes do uno
+NOTE = struct.Struct("<IBH")
+
+WINDOW_MS = 2000
+SYNC_MS = 250
+RESET_RETRY_MS = 500  # a placa pode estar no bootloader quando a porta abre
+TAP_MS = 80  # led aceso numa nota simples (igual ao sketch)
+
+def packet(kind: int, payload: bytes = b"") -> bytes:
+    body = bytes((kind, len(payload))) + payload
+    chk = 0
+    for b in body:
+        chk ^= b
+    return bytes((SYNC_BYTE,)) + body + bytes((chk,))
+
+class ChartStreamer:
+    def __init__(self, link, beatmap: Beatmap, window_ms: int = WINDOW_MS,
+                 sync_ms: int = SYNC_MS, led_of_lane=None):
+        # link: SerialInput (write + on_control) ou qualquer coisa com os dois
+        self.link = link
+        self.times, self.lanes, self.ends = beatmap.times, beatmap.lanes, beatmap.ends
+        # ate quando cada nota fica acesa, e o maximo acumulado (monotono, para
+        # achar com bisect onde recomecar depois de um reset): nota que passou
+        # durante o handshake de reset ainda acende pelo que falta
+        self._last = [max(t, e) if e else t + TAP_MS for t, e in zip(self.times, self.ends)]
+        self._reach = list(accumulate(self._last, max))
+        self.window_ms = window_ms
+        self.sync_ms = sync_ms
+        self.led_of_lane = list(led_of_lane) if led_of_lane is not None else None
+        self.control: deque = deque()  # bytes de controle vindos da thread leitora
+        link.on_control = self.control.append
+        self.ready = False
+        self.credits = 0
+        self.next = 0
+        self.sent = 0
+        self.packets = 0
+        self.resets = 0
+        self.stale_acks = 0
+        self._gen = 0
+        self._rewind = True
+        self._reset_at = None
+        self._sync_at = None
+        self.error: Optional[str] = None
+
+    def _write(self, data: bytes):
+        try:
+            self.link.write(data)
+        except OSError as e:  # placa desconectada: a gameplay segue sem leds
+            self.error = str(e)
+            return
+        self.packets += 1
+
+    def _reset(self):
+        # nova geracao a cada reset (1..15, 0 fica para o boot da placa)
+        self._gen = self._gen % GEN_MASK + 1
+        self._write(packet(PKT_RESET, bytes((self._gen,))))
+
+    def start(self):
+        # esvazia a placa; as notas so vao depois do ACK desta geracao
+        self.ready = False
+        self._reset_at = time.perf_counter()
+        self._reset()
+
+    def stop(self):
+        if self.error is None:
+            self._reset()  # apaga os leds
+        if self.link.on_control == self.control.append:
+            self.link.on_control = None
+
+    def update(self, song_ms: float):
+        # uma vez por frame, com a posicao do audio (sem latencia)
+        if self.error is not None:
+            return
+        control = self.control
+        while control:
+            b = control.popleft()
+            if b & ACK_MASK == ACK_RESET:
+                gen = b & GEN_MASK
+                if gen == self._gen:
+                    # placa vazia com o nosso reset: reenvia a partir de agora
+                    self.ready, self.credits, self._rewind = True, 0, True
+                    self.resets += 1
+                elif gen == 0:
+                    # a placa reiniciou: pede um reset nosso (o ACK dela nao
+                    # diz o que chegou antes ou depois do boot)
+                    self.start()
+                else:
+                    self.stale_acks += 1  # resposta a um reset antigo
+            elif self.ready:
+                self.credits += b & CREDIT_MASK
+        now = time.perf_counter()
+        if not self.ready:
+            if self._reset_at is None or (now - self._reset_at) * 1000 >= RESET_RETRY_MS:
+                self.start()
+            return
+        if self._rewind:
+            self.next = bisect_left(self._reach, song_ms)
+            self._rewind = False
+            self._sync_at = None
+        if self._sync_at is None or (now - self._sync_at) * 1000 >= self.sync_ms:
+            self._write(packet(PKT_SYNC, struct.pack("<i", int(song_ms))))
+            self._sync_at = now
+        self._send_notes(song_ms)
+
+    def _send_notes(self, song_ms: float):
+        times, lanes, ends, last = self.times, self.lanes, self.ends, self._last
+        horizon = song_ms + self.window_ms
+        led = self.led_of_lane
+        i, n = self.next, len(times)
+        while self.credits and i < n and times[i] <= horizon:
+            k = min(self.credits, NOTES_PER_PACKET)
+            payload = bytearray()
+            while k and i < n and times[i] <= horizon:
+                t, end = times[i], ends[i]
+                lane = lanes[i] if led is None else led[lanes[i]]
+                i += 1
+                if lane is None or lane < 0 or last[i - 1] < song_ms:
+                    continue  # lane sem led, ou nota que ja passou
+                payload += NOTE.pack(max(0, t), lane, min(0xFFFF, max(0, end - t)) if end else 0)
+                k -= 1
+            if payload:
+                count = len(payload) // NOTE.size
+                self._write(packet(PKT_NOTES, bytes(payload)))
+                self.credits -= count
+                self.sent += count
+        self.next = i
+
+class NullStreamer:
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def update(self, song_ms: float):
+        pass
+
+NULL_STREAMER = NullStreamer()
+
+def get_streamer(controller, beatmap: Beatmap, cfg: Optional[dict] = None):
+    # streaming so com o controle serial ligado e stream_chart na config
+    if controller is None:
+        return NULL_STREAMER
+    if cfg is None:
+        cfg = load_controller_config()
+    if not cfg.get("stream_chart", True):
+        return NULL_STREAMER
+    lane_map = cfg.get("lanes") or [0, 1, 2, 3]
+    # o botao i da placa fica junto do led i: led da lane = indice no mapa
+    led_of_lane = [lane_map.index(l) if l in lane_map else None for l in range(4)]
+    return ChartStreamer(controller, beatmap, int(cfg.get("window_ms", WINDOW_MS)),
+                         int(cfg.get("sync_ms", SYNC_MS)), led_of_lane)
@@ -1,6 +1,6 @@
 from __future__ import annotations
-import json, os, tempfile, shutil
-from typing import Any, Dict
+import atexit, copy, json, os, tempfile, threading, time
+from typing import Any, Dict, Optional
 
 # pasta base para os dados globais
 BASE_DIR = os.path.join(os.path.dirname(__file__), "..", "dados")
@@ -9,28 +9,138 @@ os.makedirs(BASE_DIR, exist_ok=True)
 def _path(name: str) -> str:
     return os.path.join(BASE_DIR, name)
 
-def _atomic_write(path: str, payload: Any):
+def _write_tmp(path: str, payload: Any) -> str:
+    # grava o payload num temporario ao lado de path e devolve o caminho dele
     tmp_fd, tmp_path = tempfile.mkstemp(prefix=".tmp_data_", dir=os.path.dirname(path))
     try:
         with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
             json.dump(payload, f, ensure_ascii=False, indent=2)
-        shutil.move(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
+
+def _atomic_write(path: str, payload: Any):
+    tmp_path = _write_tmp(path, payload)
+    try:
+        os.replace(tmp_path, path)
     finally:
         if os.path.exists(tmp_path):
             os.remove(tmp_path)
 
-def load_json(name: str, default: Dict[str, Any]) -> Dict[str, Any]:
-    path = _path(name)
-    if not os.path.exists(path):
-        return default
+def _mtime(path: str) -> Optional[int]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return default
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+class JsonRepository:
+    # arquivos json servidos da memoria.
+    # - leitura: carrega uma vez; depois so confere o mtime (no maximo a cada
+    #   check_interval s) para pegar alteracoes feitas fora do jogo
+    # - escrita: atualiza a memoria na hora e agenda um flush; varias escritas
+    #   no mesmo intervalo viram uma so gravacao (temporario + os.replace)
+    # - flush: um por vez (o do timer e o do atexit podem se cruzar); o arquivo
+    #   so eh trocado se o registro ainda eh o ultimo write() daquele path, e
+    #   gravacao que falha continua dirty e agenda outra tentativa
+    def __init__(self, flush_delay: float = 0.5, check_interval: float = 1.0):
+        self.flush_delay = flush_delay
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = {}   # path -> {data, mtime, checked, dirty}
+        self._timer: Optional[threading.Timer] = None
+        self.disk_reads = 0
+        self.disk_writes = 0
+        self.write_errors = 0
+
+    def read(self, path: str, default: Any) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            rec = self._files.get(path)
+            if rec and (rec["dirty"] or now - rec["checked"] < self.check_interval):
+                return copy.deepcopy(rec["data"]) if rec["data"] is not None else default
+
+        mtime = _mtime(path)
+        with self._lock:
+            rec = self._files.get(path)
+            if rec and (rec["dirty"] or rec["mtime"] == mtime):
+                rec["checked"] = now
+                return copy.deepcopy(rec["data"]) if rec["data"] is not None else default
+
+        data = None
+        if mtime is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.disk_reads += 1
+            except Exception:
+                data = None
+        with self._lock:
+            self._files[path] = {"data": data, "mtime": mtime, "checked": now, "dirty": False}
+        return copy.deepcopy(data) if data is not None else default
+
+    def write(self, path: str, payload: Any):
+        with self._lock:
+            self._files[path] = {"data": copy.deepcopy(payload), "mtime": None,
+                                 "checked": time.monotonic(), "dirty": True}
+            self._schedule()
+
+    def _schedule(self):
+        # chamado com self._lock
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                pending = [(p, rec) for p, rec in self._files.items() if rec["dirty"]]
+            failed = False
+            # serializa fora do lock; write() sempre troca o registro inteiro,
+            # entao rec["data"] nao muda durante a gravacao
+            for path, rec in pending:
+                tmp_path = None
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp_path = _write_tmp(path, rec["data"])
+                    with self._lock:
+                        # um write() mais novo ja trocou o registro: este payload
+                        # esta velho e o novo sai no proximo flush (continua dirty)
+                        if self._files.get(path) is rec:
+                            os.replace(tmp_path, path)
+                            tmp_path = None
+                            rec["dirty"] = False
+                            rec["mtime"] = _mtime(path)
+                            self.disk_writes += 1
+                except Exception:
+                    # disco cheio, permissao...: rec segue dirty (a memoria
+                    # continua valendo) e tenta de novo depois
+                    failed = True
+                    self.write_errors += 1
+                finally:
+                    if tmp_path is not None and os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            if failed:
+                with self._lock:
+                    self._schedule()
+
+# repositorio compartilhado (settings, ultima selecao, leaderboards)
+repository = JsonRepository()
+atexit.register(repository.flush)
+
+def load_json(name: str, default: Dict[str, Any]) -> Dict[str, Any]:
+    return repository.read(_path(name), default)
 
 def save_json(name: str, payload: Dict[str, Any]):
-    _atomic_write(_path(name), payload)
+    repository.write(_path(name), payload)
+
+def flush():
+    repository.flush()
 
 # configuracoes do jogo
 def get_last_selected() -> Dict[str, Any]:
@@ -49,7 +159,11 @@ def get_user_settings() -> Dict[str, Any]:
     return load_json("settings_user.json", {
         "volume": 0.8,      # volume padrao
         "latency_ms": 0,    # compensacao de atraso
-        "bg_video": False   # usar ou nao video de fundo
+        "bg_video": False,  # usar ou nao video de fundo
+        "frame_pacing": "fixed",    # fixed | vsync | uncapped | busy
+        "target_fps": 60,
+        "show_frame_stats": False,  # overlay de tempo de frame (F3 alterna)
+        "menu_sort": "title",       # title | stars (ordem da lista do menu)
     })
 
 def update_user_settings(**kwargs):
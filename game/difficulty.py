@@ -0,0 +1,221 @@
+# game/difficulty.py
+# analise de dificuldade de um chart: curva de notas por segundo, strain por
+# lane (jack, acorde, stream) e uma nota geral em estrelas.
+# por nota i (em ordem de tempo):
+#   jack   = velocidade (toques/s) na mesma lane, se o intervalo < JACK_MS
+#   stream = velocidade trocando de lane, se o intervalo < STREAM_MS (e nao eh acorde)
+#   chord  = notas a mais no mesmo instante (dentro de CHORD_MS)
+#   peso   = 1 (+ HOLD_W se for hold) + jack/JACK_NORM + stream/STREAM_NORM + chord*CHORD_W
+# janelas deslizantes de WINDOW_MS a cada STEP_MS somam os pesos (prefix sum +
+# busca binaria) e dividem pela duracao da janela (notas/s ponderadas);
+# estrelas = media ponderada (DECAY^k) das janelas mais pesadas, comprimida
+# por STAR_SCALE * x^STAR_EXP.
+# usa numpy se estiver instalado; sem ele, o mesmo calculo em python puro
+# (mesmos numeros). rating_for guarda o resultado em dados/difficulty_cache.json
+# pelo hash das notas (replay.chart_digest); a biblioteca chama no scan das
+# pastas novas/alteradas e grava no indice: o menu so le, nunca analisa.
+from __future__ import annotations
+import math
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Dict, List
+
+from .beatmap import Beatmap
+from .data_store import load_json, save_json
+from .replay import chart_digest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BACKEND = "numpy" if np is not None else "python"
+ANALYSIS_VERSION = 1
+CACHE_FILE = "difficulty_cache.json"
+
+WINDOW_MS = 2000     # 1 s nao separa charts esparsos (1 nota por janela)
+STEP_MS = 250
+WINDOW_S = WINDOW_MS / 1000
+CHORD_MS = 15
+JACK_MS = 300
+STREAM_MS = 250
+MIN_GAP_MS = 30      # limita a velocidade (notas coladas nao explodem o strain)
+JACK_NORM = 8.0      # 8 toques/s na mesma lane = +1 por nota
+STREAM_NORM = 16.0
+CHORD_W = 0.3
+HOLD_W = 0.5
+DECAY = 0.95
+TOP_WINDOWS = 200    # 0.95^200 ~ 0: o resto nao pesa
+STAR_SCALE = 0.8     # ~1.1 estrela a 1.5 notas/s, ~5 a 10 notas/s
+STAR_EXP = 0.8
+CURVE_POINTS = 48    # curva de nps guardada para o menu
+LANES = 4
+
+def _stars(strains) -> float:
+    top = sorted(strains, reverse=True)[:TOP_WINDOWS]
+    if not top:
+        return 0.0
+    num = den = 0.0
+    w = 1.0
+    for s in top:
+        num += s * w
+        den += w
+        w *= DECAY
+    return STAR_SCALE * (num / den) ** STAR_EXP
+
+def _curve(nps: List[float]) -> List[float]:
+    # reduz a curva para CURVE_POINTS pontos (maximo de cada trecho)
+    n = len(nps)
+    if n <= CURVE_POINTS:
+        return [float(v) for v in nps]
+    return [float(max(nps[i * n // CURVE_POINTS:(i + 1) * n // CURVE_POINTS])) for i in range(CURVE_POINTS)]
+
+def _summary(n, holds, duration_ms, nps, strains, lane_peaks) -> Dict[str, Any]:
+    return {
+        "version": ANALYSIS_VERSION,
+        "notes": n,
+        "holds": holds,
+        "duration_s": round(duration_ms / 1000, 2),
+        "peak_nps": float(max(nps)) if len(nps) else 0.0,
+        "mean_nps": round(n / max(duration_ms / 1000, 1.0), 2),
+        "stars": round(_stars(strains), 2),
+        "lanes": [{k: round(float(v), 2) for k, v in zip(("jack", "chord", "stream"), p)} for p in lane_peaks],
+        "nps_curve": _curve(nps),
+    }
+
+def _empty() -> Dict[str, Any]:
+    return _summary(0, 0, 0, [], [], [(0.0, 0.0, 0.0)] * LANES)
+
+def _analyze_numpy(bm: Beatmap) -> Dict[str, Any]:
+    t = np.frombuffer(bm.times, dtype=np.int32).astype(np.int64)
+    lanes = np.frombuffer(bm.lanes, dtype=np.int8).astype(np.int64)
+    ends = np.frombuffer(bm.ends, dtype=np.int32)
+    n = len(t)
+    inf = np.iinfo(np.int64).max
+
+    # intervalo para a nota anterior (qualquer lane) e grupos de acorde
+    gap_any = np.empty(n, np.int64)
+    gap_any[0] = inf
+    gap_any[1:] = np.diff(t)
+    group = np.cumsum(gap_any > CHORD_MS) - 1
+    chord = (np.bincount(group)[group] - 1).astype(np.float64)
+
+    # intervalo para a nota anterior na mesma lane: ordena por (lane, tempo)
+    order = np.lexsort((t, lanes))
+    ts, ls = t[order], lanes[order]
+    gap_lane = np.full(n, inf, np.int64)
+    same = ls[1:] == ls[:-1]
+    gap_lane[order[1:]] = np.where(same, np.diff(ts), inf)
+
+    jack = np.where(gap_lane < JACK_MS, 1000.0 / np.maximum(gap_lane, MIN_GAP_MS), 0.0)
+    prev_lane = np.empty(n, np.int64)
+    prev_lane[0] = -1
+    prev_lane[1:] = lanes[:-1]
+    is_stream = (gap_any < STREAM_MS) & (gap_any > CHORD_MS) & (lanes != prev_lane)
+    stream = np.where(is_stream, 1000.0 / np.maximum(gap_any, MIN_GAP_MS), 0.0)
+    weight = 1.0 + HOLD_W * (ends > 0) + jack / JACK_NORM + stream / STREAM_NORM + chord * CHORD_W
+
+    # janelas: [s, s + WINDOW_MS) a cada STEP_MS
+    starts = np.arange(t[0] - WINDOW_MS + STEP_MS, t[-1] + 1, STEP_MS)
+    lo = np.searchsorted(t, starts, "left")
+    hi = np.searchsorted(t, starts + WINDOW_MS, "left")
+
+    def windowed(values):
+        csum = np.concatenate(([0.0], np.cumsum(values)))
+        return (csum[hi] - csum[lo]) / WINDOW_S
+
+    nps = ((hi - lo) / WINDOW_S).tolist()
+    strains = windowed(weight).tolist()
+    lane_peaks = []
+    for lane in range(LANES):
+        mask = lanes == lane
+        lane_peaks.append(tuple(windowed(np.where(mask, comp, 0.0)).max() / norm
+                                for comp, norm in ((jack, JACK_NORM), (chord * CHORD_W, 1.0), (stream, STREAM_NORM))))
+    return _summary(n, int((ends > 0).sum()), int(t[-1] - t[0]), nps, strains, lane_peaks)
+
+def _analyze_python(bm: Beatmap) -> Dict[str, Any]:
+    t, lanes, ends = bm.times, bm.lanes, bm.ends
+    n = len(t)
+    inf = math.inf
+
+    gap_any = [inf] + [t[i] - t[i - 1] for i in range(1, n)]
+    group, g = [], -1
+    for gap in gap_any:
+        if gap > CHORD_MS:
+            g += 1
+        group.append(g)
+    sizes = [0] * (g + 1)
+    for g in group:
+        sizes[g] += 1
+    chord = [float(sizes[g] - 1) for g in group]
+
+    last_at = [None] * LANES
+    jack, stream, weight = [], [], []
+    for i in range(n):
+        ti, li = t[i], lanes[i]
+        prev = last_at[li]
+        gl = ti - prev if prev is not None else inf
+        last_at[li] = ti
+        jk = 1000.0 / max(gl, MIN_GAP_MS) if gl < JACK_MS else 0.0
+        ga = gap_any[i]
+        st = 1000.0 / max(ga, MIN_GAP_MS) if (CHORD_MS < ga < STREAM_MS and li != lanes[i - 1]) else 0.0
+        jack.append(jk)
+        stream.append(st)
+        weight.append(1.0 + HOLD_W * (ends[i] > 0) + jk / JACK_NORM + st / STREAM_NORM + chord[i] * CHORD_W)
+
+    starts = range(t[0] - WINDOW_MS + STEP_MS, t[-1] + 1, STEP_MS)
+    lo = [bisect_left(t, s) for s in starts]
+    hi = [bisect_left(t, s + WINDOW_MS) for s in starts]
+
+    def windowed(values):
+        csum = [0.0] + list(accumulate(values))
+        return [(csum[b] - csum[a]) / WINDOW_S for a, b in zip(lo, hi)]
+
+    nps = [(b - a) / WINDOW_S for a, b in zip(lo, hi)]
+    strains = windowed(weight)
+    lane_peaks = []
+    for lane in range(LANES):
+        lane_peaks.append(tuple(
+            max(windowed([v if lanes[i] == lane else 0.0 for i, v in enumerate(comp)])) / norm
+            for comp, norm in ((jack, JACK_NORM), ([c * CHORD_W for c in chord], 1.0), (stream, STREAM_NORM))))
+    return _summary(n, sum(1 for e in ends if e > 0), t[-1] - t[0], nps, strains, lane_peaks)
+
+def analyze(bm: Beatmap, backend: str = BACKEND) -> Dict[str, Any]:
+    # bm precisa estar ordenado (o loader ja entrega assim)
+    if not len(bm):
+        return _empty()
+    if backend == "numpy":
+        if np is None:
+            raise RuntimeError("numpy nao instalado")
+        return _analyze_numpy(bm)
+    return _analyze_python(bm)
+
+_cache = None
+_dirty = False
+
+def _load_cache() -> Dict[str, Any]:
+    global _cache
+    if _cache is None:
+        data = load_json(CACHE_FILE, {})
+        if data.get("version") != ANALYSIS_VERSION:
+            data = {"version": ANALYSIS_VERSION, "charts": {}}
+        _cache = data
+    return _cache
+
+def rating_for(bm: Beatmap) -> Dict[str, Any]:
+    # analise com cache pelo hash das notas (mesmo chart em outra pasta
+    # reaproveita); grava no disco so em save_cache()
+    global _dirty
+    charts = _load_cache()["charts"]
+    key = chart_digest(bm)
+    hit = charts.get(key)
+    if hit is None:
+        hit = charts[key] = analyze(bm)
+        _dirty = True
+    return hit
+
+def save_cache():
+    global _dirty
+    if _dirty:
+        save_json(CACHE_FILE, _cache)
+        _dirty = False
@@ -0,0 +1,155 @@
+# game/frame_pacing.py
+# ritmo dos frames e telemetria de tempo de frame.
+# modos (settings_user.json: "frame_pacing" e "target_fps"):
+#   fixed    - clock.tick(target_fps) (padrao, 60)
+#   busy     - clock.tick_busy_loop(target_fps): mais preciso, gasta cpu
+#   vsync    - o present espera o refresh (janela criada com vsync=1 no
+#              main.py); a gameplay faz polling de input ate perto do proximo
+#              refresh estimado. se a janela saiu sem vsync, vira fixed
+#              (senao o loop giraria a 100% de cpu)
+#   uncapped - sem limite nenhum
+# FrameStats guarda uma janela dos ultimos frames (p50/p95/p99 para o overlay)
+# e um histograma da partida inteira, gravado em dados/frame_times.json.
+from __future__ import annotations
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import pygame
+
+from .data_store import get_user_settings, save_json
+
+MODES = ("fixed", "vsync", "uncapped", "busy")
+FPS_CHOICES = (60, 75, 120, 144, 165, 240)
+BUCKET_MS = 0.5
+MAX_MS = 100.0
+VSYNC_MARGIN = 0.25  # fracao do periodo do refresh deixada para desenhar
+
+_vsync = False  # o main.py avisa se a janela foi criada com vsync
+
+def set_vsync(active: bool):
+    global _vsync
+    _vsync = bool(active)
+
+def _refresh_hz(default: int) -> int:
+    # pygame-ce tem get_current_refresh_rate; sem ele (ou 0), usa o FPS alvo
+    fn = getattr(pygame.display, "get_current_refresh_rate", None)
+    try:
+        hz = fn() if fn is not None else 0
+    except pygame.error:
+        hz = 0
+    return hz if hz > 0 else default
+
+class FrameStats:
+    def __init__(self, window: int = 600):
+        self.recent: deque = deque(maxlen=window)
+        self.hist = [0] * (int(MAX_MS / BUCKET_MS) + 1)  # ultimo balde = MAX_MS ou mais
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, ms: float):
+        self.recent.append(ms)
+        self.hist[min(int(ms / BUCKET_MS), len(self.hist) - 1)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.worst:
+            self.worst = ms
+
+    def percentiles(self, ps=(50, 95, 99)) -> Dict[int, float]:
+        # da janela recente
+        values = sorted(self.recent)
+        if not values:
+            return {p: 0.0 for p in ps}
+        return {p: values[min(len(values) - 1, int(len(values) * p / 100))] for p in ps}
+
+    def summary(self) -> str:
+        pc = self.percentiles()
+        mean = sum(self.recent) / len(self.recent) if self.recent else 0.0
+        fps = 1000.0 / mean if mean else 0.0
+        return f"{fps:5.0f} fps  p50 {pc[50]:5.2f}  p95 {pc[95]:5.2f}  p99 {pc[99]:5.2f} ms"
+
+    def _hist_percentile(self, p: float) -> float:
+        target = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.hist):
+            seen += n
+            if seen >= target and n:
+                return (i + 1) * BUCKET_MS
+        return 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        # da partida inteira (percentis com a resolucao do balde)
+        return {
+            "frames": self.count,
+            "mean_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": self._hist_percentile(50),
+            "p95_ms": self._hist_percentile(95),
+            "p99_ms": self._hist_percentile(99),
+            "max_ms": round(self.worst, 3),
+            "bucket_ms": BUCKET_MS,
+            "histogram": {f"{i * BUCKET_MS:g}": n for i, n in enumerate(self.hist) if n},
+        }
+
+class FramePacer:
+    def __init__(self, mode: Optional[str] = None, target_fps: Optional[int] = None):
+        if mode is None or target_fps is None:
+            us = get_user_settings()
+            mode = mode or us.get("frame_pacing", "fixed")
+            target_fps = target_fps or us.get("target_fps", 60)
+        self.mode = mode if mode in MODES else "fixed"
+        if self.mode == "vsync" and not _vsync:
+            self.mode = "fixed"  # flip sem vsync nao espera nada
+        self.target_fps = max(1, int(target_fps or 60))
+        if self.mode in ("fixed", "busy"):
+            self.frame_ns = 1_000_000_000 // self.target_fps
+        elif self.mode == "vsync":
+            self.frame_ns = 1_000_000_000 // _refresh_hz(self.target_fps)
+        else:
+            self.frame_ns = 0
+        self.clock = pygame.time.Clock()
+        self.stats = FrameStats()
+        self._last = time.perf_counter_ns()
+        self._next = self._last
+
+    @property
+    def busy(self) -> bool:
+        return self.mode == "busy"
+
+    def tick(self):
+        # fim de frame para loops comuns (menu, opcoes)
+        if self.mode == "fixed":
+            self.clock.tick(self.target_fps)
+        elif self.mode == "busy":
+            self.clock.tick_busy_loop(self.target_fps)
+        self.frame_done()
+
+    def deadline(self) -> int:
+        # prazo do proximo frame para quem espera fazendo polling (gameplay);
+        # sem limite -> agora (uma volta de polling e segue)
+        now = time.perf_counter_ns()
+        if not self.frame_ns:
+            return now
+        if self.mode == "vsync":
+            # chamado logo depois do present (que ja esperou o refresh): polling
+            # ate perto do proximo. se o present nao bloqueou (frame sem nada
+            # para atualizar), isto tambem limita o loop
+            return now + self.frame_ns - int(self.frame_ns * VSYNC_MARGIN)
+        self._next = max(self._next + self.frame_ns, now - self.frame_ns)
+        return self._next
+
+    def frame_done(self):
+        now = time.perf_counter_ns()
+        self.stats.add((now - self._last) / 1e6)
+        self._last = now
+
+    def dump(self, **info):
+        # grava o histograma da partida (sobrescreve a anterior)
+        save_json("frame_times.json", {
+            "date": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "mode": self.mode,
+            "target_fps": self.target_fps,
+            **info,
+            **self.stats.to_dict(),
+        })
@@ -1,10 +1,23 @@
 import os, json, pygame
 from .leaderboard import submit_result
 from .data_store import get_user_settings
+from .scheduler import NoteScheduler
+from .judge import Judge
+from . import chart_loader, library
+from .asset_cache import surfaces
+from .render import PlayfieldRenderer
+from .skin import load_skin
+from .input import InputPoller
+from .serial_input import get_controller
+from .chart_streamer import get_streamer
+from .song_clock import SongClock
+from .frame_pacing import FramePacer
+from .replay import ReplayRecorder, result_of
+from .profiler import get_profiler
+from .text_cache import get_font
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 CFG_KEYS = os.path.join(ROOT, "config", "keys_pc.json")
-SONGS_DIR = os.path.join(ROOT, "musicas")  # ajuste para "songs" se for o seu caso
 
 # janelas de acerto (ms) default - pode ser sobrescrito por config
 HIT_WINDOWS = { "perfect": 50, "good": 100, "bad": 150 }
@@ -16,53 +29,36 @@ def _load_keys_and_windows():
     hw = cfg.get("timing", {}).get("hit_window_ms", HIT_WINDOWS)
     return lane_keys, hw
 
-def _load_beatmap(song_id: str, difficulty: str):
-    bp = os.path.join(SONGS_DIR, song_id, f"{difficulty}.json")
-    with open(bp, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    # formato esperado: [{ "tempo": ms, "coluna": 1..4 }, ...]
-    notes = [{"time": int(n["tempo"]), "lane": int(n["coluna"]) - 1} for n in data]
-    return notes
-
-def _find_audio(song_id: str):
-    a1 = os.path.join(SONGS_DIR, song_id, "audio.mp3")
-    a2 = os.path.join(SONGS_DIR, song_id, "musica.mp3")
-    if os.path.exists(a1): return a1
-    if os.path.exists(a2): return a2
-    return None
-
-def _find_bg(song_id: str):
-    for name in ("background.png", "background.jpg"):
-        p = os.path.join(SONGS_DIR, song_id, name)
-        if os.path.exists(p):
-            return p
-    return None
-
 def run_game(screen, song_id: str, difficulty: str, player_name: str = "Player"):
     pygame.mixer.init()
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("arial", 24)
+    font = get_font("arial", 24)
 
     # carrega user settings
     us = get_user_settings()
     user_volume = float(us.get("volume", 0.9) or 0.9)      # 0.0..1.0
     latency_ms  = int(us.get("latency_ms", 0) or 0)        # pode ser negativo
     show_bg     = bool(us.get("bg_video", False))          # usar ou nao background
+    show_stats  = bool(us.get("show_frame_stats", False))  # overlay de tempo de frame
 
     # carrega teclas e hit windows
     lane_keys, HW = _load_keys_and_windows()
-
-    # carrega audio
-    audio = _find_audio(song_id)
+    lane_of_key = {k: i for i, k in enumerate(lane_keys)}
+    poller = InputPoller(lane_of_key)
+    controller = get_controller(len(lane_keys))  # arduino (config/controller.json), se ligado
+    if controller:
+        controller.attach(poller.queue, len(lane_keys))
+
+    # carrega beatmap (ja em ms, vindo do cache binario) e audio
+    song = library.get_song(song_id)
+    if not song or difficulty not in song["charts"]:
+        raise RuntimeError(f"Chart '{difficulty}' nao encontrado para {song_id}")
+    beatmap = chart_loader.load_chart(song["charts"][difficulty])
+    audio = song["audio"]
     if not audio:
         raise RuntimeError(f"Audio nao encontrado para {song_id}")
     pygame.mixer.music.load(audio)
     pygame.mixer.music.set_volume(user_volume)
 
-    # carrega beatmap
-    notes = _load_beatmap(song_id, difficulty)
-    notes.sort(key=lambda n: n["time"])
-
     # visual
     W, H = screen.get_size()
     LANE_W = 100
@@ -71,134 +67,137 @@ def run_game(screen, song_id: str, difficulty: str, player_name: str = "Player")
     NOTE_H = 24
     SPEED = 0.6  # pixel por ms (ajuste conforme ar)
 
+    # o scheduler so entrega as notas entre now - bad e o topo da tela
+    sched = NoteScheduler(beatmap, miss_ms=HW["bad"], ahead_ms=int((HIT_Y + NOTE_H) / SPEED))
+    judge = Judge(sched, HW, lanes=len(lane_keys))
+    recorder = ReplayRecorder(song_id, difficulty, player_name, beatmap, HW, latency_ms)
+    streamer = get_streamer(controller, beatmap)  # leds do arduino seguem o chart
+
     # background. se show_bg for False, nao exibe
     bg_img = None
     if show_bg:
-        bg_path = _find_bg(song_id)
-        if bg_path and os.path.exists(bg_path):
-            bg_img = pygame.image.load(bg_path).convert()
-            bg_img = pygame.transform.scale(bg_img, (W, H))
-
-    # estado
-    start_ms = None
-    idx_next = 0
-    score = 0
-    combo = 0
-    max_combo = 0
-    total_notes = len(notes)
-    hits = 0
+        surfaces.check_display((W, H))
+        bg_img = surfaces.get(song["bg"], (W, H), "dim140")  # leve escurecimento para contraste
+
+    # fundo, lanes e linha de acerto sao pre-compostos uma vez
+    skin = load_skin(us.get("skin"), LANE_W, NOTE_H, H)
+    renderer = PlayfieldRenderer(screen, bg_img, LANE_W, LEFT_X, HIT_Y, NOTE_H, skin=skin)
+
+    # estado: tempo da musica vem do relogio sincronizado com o mixer
+    song_clock = SongClock(latency_ms)
+    hud_head = f"{song_id} [{difficulty}]  "
+    hud_tail = f"Vol: {int(user_volume*100)}%  Lat: {latency_ms}ms"
+    pacer = FramePacer()
+    stats_line, stats_at = (), 0
+    prof = get_profiler("gameplay")  # OSUMANIA_PROFILE=1 liga
+
+    def judge_inputs():
+        # julga presses/releases no instante em que chegaram (misses e fins de
+        # hold anteriores entram antes); roda a cada volta do polling (~1 kHz),
+        # nao so uma vez por frame. tudo vai para o replay
+        if not song_clock.started:
+            poller.queue.drain()
+            return
+        for t_ns, lane, down in poller.queue.drain():
+            t = song_clock.now_ms(t_ns)
+            recorder.record(t, lane, down)
+            judge.advance(t)
+            grade = judge.press(lane, t) if down else judge.release(lane, t)
+            if grade:
+                renderer.hit(lane, t)
+        # notas que passaram da janela bad viram miss; holds segurados ate o fim completam
+        judge.advance(song_clock.now_ms())
 
     # loop
     running = True
+    events = poller.pump()
     while running:
-        for ev in pygame.event.get():
+        prof.frame_start()
+        for ev in events:
             if ev.type == pygame.QUIT:
                 pygame.mixer.music.stop()
+                streamer.stop()
+                prof.export()
                 raise SystemExit
-            if ev.type == pygame.KEYDOWN:
-                if ev.key == pygame.K_ESCAPE:
-                    pygame.mixer.music.stop()
-                    return  # sai sem salvar
-
-                # hit por lane
-                if ev.key in lane_keys and start_ms is not None:
-                    lane = lane_keys.index(ev.key)
-                    now = pygame.time.get_ticks() - start_ms + latency_ms  # aplica latencia
-
-                    # procura melhor nota nesta lane
-                    best_j = -1
-                    best_dt = 10**9
-                    for j in range(max(0, idx_next-3), min(len(notes), idx_next+20)):
-                        n = notes[j]
-                        if n.get("judged"): 
-                            continue
-                        if n["lane"] != lane:
-                            continue
-                        dt = abs(n["time"] - now)
-                        if dt < best_dt:
-                            best_dt, best_j = dt, j
-
-                    if best_j >= 0 and best_dt <= HW["bad"]:
-                        n = notes[best_j]
-                        n["judged"] = True
-                        if best_dt <= HW["perfect"]:
-                            score += 300
-                            combo += 1
-                        elif best_dt <= HW["good"]:
-                            score += 100
-                            combo += 1
-                        else:
-                            score += 50
-                            combo = 0
-                        max_combo = max(max_combo, combo)
-                        hits += 1
+            if ev.type == pygame.VIDEOEXPOSE:
+                renderer.invalidate()
+            if ev.type == pygame.KEYDOWN and ev.key == pygame.K_ESCAPE:
+                pygame.mixer.music.stop()
+                streamer.stop()
+                pacer.dump(song=song_id, difficulty=difficulty, aborted=True)
+                prof.export()
+                return  # sai sem salvar
+            if ev.type == pygame.KEYDOWN and ev.key == pygame.K_F3:
+                show_stats = not show_stats
 
         # start audio e cronometro
-        if start_ms is None:
+        if not song_clock.started:
             pygame.mixer.music.play()
-            start_ms = pygame.time.get_ticks()
+            song_clock.start()
+            streamer.start()
+
+        prof.mark("events")
+
+        # corrige fase/drift com a posicao do mixer e julga o que chegou
+        song_clock.update()
+        judge_inputs()
+        streamer.update(song_clock.position())
+        prof.mark("input")
 
         # tempo atual com latencia
-        now = pygame.time.get_ticks() - start_ms + latency_ms
-
-        # avanca indice para otimizacao de desenho
-        while idx_next < len(notes) and notes[idx_next]["time"] < now - 1000:
-            idx_next += 1
-
-        # draw
-        if bg_img:
-            screen.blit(bg_img, (0, 0))
-            # leve escurecimento para contraste
-            s = pygame.Surface((W, H), pygame.SRCALPHA); s.fill((0,0,0,140))
-            screen.blit(s, (0,0))
-        else:
-            screen.fill((12, 12, 20))
-
-        # lanes
-        for i in range(4):
-            x = LEFT_X + i*LANE_W
-            pygame.draw.rect(screen, (50,50,60), (x, 0, LANE_W-4, H))
-        # hit line
-        pygame.draw.line(screen, (250,250,250), (LEFT_X, HIT_Y), (LEFT_X + LANE_W*4, HIT_Y), 3)
-
-        # notas
-        for n in notes:
-            if n.get("judged"): 
-                continue
-            y = HIT_Y - (n["time"] - now) * SPEED
-            x = LEFT_X + n["lane"]*LANE_W + 8
-            if -NOTE_H <= y <= H+NOTE_H:
-                pygame.draw.rect(screen, (80,190,255), (x, y, LANE_W-16, NOTE_H))
-            # miss (passou da janela bad)
-            if now - n["time"] > HW["bad"] and not n.get("judged"):
-                n["judged"] = True
-                combo = 0
-
-        # HUD
-        acc = (hits/total_notes) if total_notes else 0.0
-        hud = f"{song_id} [{difficulty}]  Score: {score}  Combo: {combo}  Acc: {acc*100:.0f}%  Vol: {int(user_volume*100)}%  Lat: {latency_ms}ms"
-        screen.blit(font.render(hud, True, (240,240,240)), (20, 20))
+        now = song_clock.now_ms()
+
+        # draw: apaga so o que mudou desde o frame anterior
+        # HUD em campos: os fixos ficam no cache, so score/combo/acc mudam
+        # overlay de tempo de frame: texto atualizado 4x por segundo
+        if not show_stats:
+            stats_line = ()
+        elif not stats_line or now - stats_at >= 250:
+            stats_line, stats_at = (f"[{pacer.mode}] {pacer.stats.summary()}",), now
+        renderer.begin_frame((
+            (hud_head,
+             f"Score: {judge.score}  ", f"Combo: {judge.combo}  ", f"Acc: {judge.accuracy()*100:.0f}%  ",
+             hud_tail),
+        ) + ((stats_line,) if stats_line else ()))
+        prof.mark("erase")
+
+        # notas e holds (so os da janela visivel), num unico blits
+        renderer.draw_chart(now, sched, judge, SPEED)
+        prof.mark("notes")
+
+        renderer.draw_hud(font, (240,240,240), (20, 20))
+        prof.mark("hud")
 
         # fim da musica?
         if not pygame.mixer.music.get_busy() and now > 1000:
             running = False
 
-        pygame.display.flip()
-        clock.tick(60)
+        renderer.present()
+        prof.mark("present")
+
+        # ate o proximo frame (conforme o frame pacing): bombeia e julga a
+        # entrada em alta frequencia
+        events = poller.wait_until(pacer.deadline(), judge_inputs, spin=pacer.busy)
+        pacer.frame_done()
+        prof.mark("wait")
+
+    streamer.stop()
+    prof.export()
+    pacer.dump(song=song_id, difficulty=difficulty)
+    recorder.save(result_of(judge))
 
     # fim: salva resultado
-    accuracy = (hits/total_notes) if total_notes else 0.0
     res = submit_result(
         song_id=song_id,
         difficulty=difficulty,
         player_name=player_name,
-        score=score,
-        accuracy=accuracy,
-        max_combo=max_combo
+        score=judge.score,
+        accuracy=judge.accuracy(),
+        max_combo=judge.max_combo
     )
     _results_screen(screen, res)
 
 def _results_screen(screen, res):
     clock = pygame.time.Clock()
-    font = pygame.font.SysFont("arial", 28)
-    small = pygame.font.SysFont("arial", 20)
+    font = get_font("arial", 28)
+    small = get_font("arial", 20)
@@ -0,0 +1,80 @@
+# game/input.py
+# entrada da gameplay com carimbo de tempo na chegada.
+# o pygame so entrega eventos quando a fila eh bombeada; bombear uma vez por
+# frame (clock.tick(60)) atrasa o carimbo em ate ~16 ms. aqui a espera entre
+# frames vira um laco que bombeia a fila a ~1 kHz e carimba cada tecla de lane
+# com perf_counter_ns assim que ela aparece (erro <= 1 periodo de polling).
+# outras fontes (threads, controladores) empurram direto na InputQueue com o
+# proprio carimbo. o julgamento consome a fila em ordem de carimbo, a cada
+# volta do polling, sem depender do fps do render.
+from __future__ import annotations
+import time
+from collections import deque
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pygame
+
+POLL_HZ = 1000
+_stamp = itemgetter(0)
+
+class InputQueue:
+    # fila de (t_ns, lane, down); deque.append/popleft sao atomicos, entao
+    # qualquer thread pode empurrar sem lock
+    def __init__(self):
+        self.events: deque = deque()
+
+    def push(self, lane: int, down: bool = True, t_ns: Optional[int] = None):
+        self.events.append((time.perf_counter_ns() if t_ns is None else t_ns, lane, down))
+
+    def drain(self) -> List[Tuple[int, int, bool]]:
+        events = self.events
+        out = []
+        while events:
+            out.append(events.popleft())
+        # fontes diferentes podem chegar fora de ordem; sort estavel so pelo
+        # carimbo mantem a ordem de chegada de eventos com o mesmo carimbo
+        out.sort(key=_stamp)
+        return out
+
+    def __len__(self):
+        return len(self.events)
+
+class InputPoller:
+    def __init__(self, lane_of_key: Dict[int, int], queue: Optional[InputQueue] = None,
+                 poll_hz: int = POLL_HZ):
+        self.lane_of_key = lane_of_key
+        self.queue = queue if queue is not None else InputQueue()
+        self.period_ns = 1_000_000_000 // poll_hz
+
+    def pump(self) -> list:
+        # bombeia o pygame; teclas de lane vao carimbadas para a fila,
+        # o resto (QUIT, ESC, VIDEOEXPOSE...) volta para o loop tratar
+        events = pygame.event.get()
+        t = time.perf_counter_ns()
+        push = self.queue.events.append
+        others = []
+        for ev in events:
+            if ev.type == pygame.KEYDOWN or ev.type == pygame.KEYUP:
+                lane = self.lane_of_key.get(ev.key)
+                if lane is not None:
+                    push((t, lane, ev.type == pygame.KEYDOWN))
+                    continue
+            others.append(ev)
+        return others
+
+    def wait_until(self, deadline_ns: int, on_poll: Optional[Callable[[], None]] = None,
+                   spin: bool = False) -> list:
+        # espera o proximo frame bombeando a fila; on_poll roda o julgamento a
+        # cada volta. spin: nao dorme entre voltas (modo busy do frame pacing).
+        # devolve os eventos que nao sao de lane para o loop
+        others: list = []
+        while True:
+            others += self.pump()
+            if on_poll is not None:
+                on_poll()
+            now = time.perf_counter_ns()
+            if now >= deadline_ns:
+                return others
+            if not spin:
+                time.sleep(min(self.period_ns, deadline_ns - now) / 1e9)
@@ -0,0 +1,121 @@
+# game/judge.py
+# julgamento de hits por lane + pontuacao.
+# cada lane tem sua lista ordenada de notas e um ponteiro para a primeira
+# nota ainda julgavel; um press compara so a cabeca (e a seguinte) da lane.
+# holds: acertar a cabeca ocupa o slot da lane (active[lane]); a cauda eh
+# julgada no release (pelo quanto soltou antes do fim) ou sai perfect se a
+# tecla continua apertada quando o fim chega. cada hold vale 2 julgamentos.
+# nao depende do pygame, da pra usar sem janela.
+from array import array
+
+# pontos por julgamento; "bad" quebra o combo
+SCORES = {"perfect": 300, "good": 100, "bad": 50}
+
+# estado de cada hold em hold_state
+HOLD_NONE, HOLD_ACTIVE, HOLD_DONE, HOLD_BROKEN = 0, 1, 2, 3
+
+class Judge:
+    def __init__(self, sched, hit_windows, lanes: int = 4):
+        self.sched = sched
+        self.hw = hit_windows
+        self.lane_idx = [array("i") for _ in range(lanes)]
+        for i, lane in enumerate(sched.lanes):
+            self.lane_idx[lane].append(i)
+        self.head = [0] * lanes
+
+        # holds: nota segurada por lane (-1 = nenhuma) e estado por nota
+        self.active = [-1] * lanes
+        self.hold_state = bytearray(len(sched.times))
+        self.total = len(sched.times) + sum(1 for e in sched.ends if e)
+
+        self.score = 0
+        self.combo = 0
+        self.max_combo = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _grade(self, dt: int):
+        hw = self.hw
+        if dt <= hw["perfect"]: return "perfect"
+        if dt <= hw["good"]: return "good"
+        if dt <= hw["bad"]: return "bad"
+        return None
+
+    def press(self, lane: int, now: int):
+        # devolve o julgamento ("perfect"/"good"/"bad") ou None se nao acertou nada
+        if not 0 <= lane < len(self.lane_idx):
+            return None
+        sched = self.sched
+        times, judged = sched.times, sched.judged
+        idx = self.lane_idx[lane]
+        n = len(idx)
+
+        # pula notas ja julgadas ou que ja passaram da janela bad
+        h = self.head[lane]
+        limit = now - self.hw["bad"]
+        while h < n and (judged[idx[h]] or times[idx[h]] < limit):
+            h += 1
+        self.head[lane] = h
+        if h >= n:
+            return None
+
+        best = idx[h]
+        best_dt = abs(times[best] - now)
+        if h + 1 < n:
+            j = idx[h + 1]
+            dt = abs(times[j] - now)
+            if not judged[j] and dt < best_dt:
+                best, best_dt = j, dt
+
+        grade = self._grade(best_dt)
+        if grade is None:
+            return None
+        sched.judge(best)
+        self._apply(grade)
+        if sched.ends[best]:
+            self.active[lane] = best
+            self.hold_state[best] = HOLD_ACTIVE
+        return grade
+
+    def release(self, lane: int, now: int):
+        # solta a tecla: julga a cauda do hold segurado na lane (se houver)
+        if not 0 <= lane < len(self.active):
+            return None
+        i = self.active[lane]
+        if i < 0:
+            return None
+        self.active[lane] = -1
+        grade = self._grade(max(0, self.sched.ends[i] - now))
+        if grade is None:
+            self.hold_state[i] = HOLD_BROKEN
+            self.miss()
+            return None
+        self.hold_state[i] = HOLD_DONE
+        self._apply(grade)
+        return grade
+
+    def advance(self, now: int):
+        # avanca o tempo: misses do scheduler e holds que chegaram ao fim
+        # segurados (cauda perfect). chamar antes de cada press/release
+        self.miss(self.sched.update(now))
+        ends = self.sched.ends
+        for lane, i in enumerate(self.active):
+            if i >= 0 and ends[i] <= now:
+                self.active[lane] = -1
+                self.hold_state[i] = HOLD_DONE
+                self._apply("perfect")
+
+    def _apply(self, grade: str):
+        self.score += SCORES[grade]
+        self.combo = self.combo + 1 if grade != "bad" else 0
+        self.max_combo = max(self.max_combo, self.combo)
+        self.hits += 1
+
+    def miss(self, count: int = 1):
+        if count:
+            self.misses += count
+            self.combo = 0
+
+    def accuracy(self) -> float:
+        total = self.total
+        return (self.hits / total) if total else 0.0
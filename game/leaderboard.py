@@ -1,8 +1,12 @@
 from __future__ import annotations
-import json, os, tempfile, shutil
+import os, sqlite3
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from .data_store import repository
+from . import score_history
+
 # local dos rankings por musica e dificuldade
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "musicas")
 TOP_LIMIT = 10  # mantem so top 10
@@ -11,29 +15,13 @@ def _phase_dir(song_id: str) -> str:
     return os.path.join(DATA_DIR, song_id, "leaderboard")
 
 def _phase_path(song_id: str, difficulty: str) -> str:
-    os.makedirs(_phase_dir(song_id), exist_ok=True)
+    # a pasta leaderboard/ eh criada no flush, quando houver o que gravar
     return os.path.join(_phase_dir(song_id), f"{difficulty.lower()}.json")
 
-def _atomic_write(path: str, payload: Any):
-    tmp_fd, tmp_path = tempfile.mkstemp(prefix=".tmp_lb_", dir=os.path.dirname(path))
-    try:
-        with os.fdopen(tmp_fd, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-        shutil.move(tmp_path, path)
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
-
 def load_leaderboard(song_id: str, difficulty: str) -> List[Dict[str, Any]]:
-    path = _phase_path(song_id, difficulty)
-    if not os.path.exists(path):
-        return []
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    except Exception:
-        return []
+    # servido da memoria; o disco so eh relido se o arquivo mudar por fora
+    data = repository.read(_phase_path(song_id, difficulty), [])
+    return data if isinstance(data, list) else []
 
 def _ts(iso: Optional[str]) -> int:
     if not iso:
@@ -43,14 +31,37 @@ def _ts(iso: Optional[str]) -> int:
     except Exception:
         return 0
 
+# ordem do ranking: score desc, accuracy desc, mais antigo antes em empate.
+# o timestamp numerico fica salvo em "ts" para nao reparsear a data a cada sort.
+def _key(e: Dict[str, Any]):
+    return (-e.get("score", 0), -e.get("accuracy", 0.0), e["ts"])
+
+def _prepare(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # arquivos antigos (sem "ts") ganham o campo. ordena sempre: ter "ts" nao
+    # garante a ordem (edicao a mao, versoes antigas, arquivos juntados) e o
+    # bisect do insert_entry depende dela. o sort do python eh O(n) numa lista
+    # que ja esta em ordem, entao o caso comum continua barato
+    for e in entries:
+        if "ts" not in e:
+            e["ts"] = _ts(e.get("date"))
+    entries.sort(key=_key)
+    return entries
+
+def insert_entry(lb: List[Dict[str, Any]], entry: Dict[str, Any]) -> int:
+    # insere na posicao certa de uma lista ja ordenada; devolve a posicao (1-based)
+    if "ts" not in entry:
+        entry["ts"] = _ts(entry.get("date"))
+    i = bisect_right(lb, _key(entry), key=_key)
+    lb.insert(i, entry)
+    return i + 1
+
+def _percentile(pos: int, total: int) -> int:
+    if not total: return 0
+    return int(round((total - pos) / total * 100))
+
 def save_leaderboard(song_id: str, difficulty: str, entries: List[Dict[str, Any]]):
-    # ordena: score desc, accuracy desc, mais antigo antes em empate
-    entries_sorted = sorted(
-        entries,
-        key=lambda e: (e.get("score", 0), e.get("accuracy", 0.0), -_ts(e.get("date"))),
-        reverse=True,
-    )[:TOP_LIMIT]
-    _atomic_write(_phase_path(song_id, difficulty), entries_sorted)
+    entries_sorted = _prepare(entries)[:TOP_LIMIT]
+    repository.write(_phase_path(song_id, difficulty), entries_sorted)
 
 def submit_result(
     song_id: str,
@@ -60,19 +71,28 @@ def submit_result(
     accuracy: float,   # 0.0..1.0
     max_combo: int,
 ) -> Dict[str, Any]:
+    date = datetime.utcnow().isoformat(timespec="seconds") + "Z"
     entry = {
         "name": player_name[:20],
         "score": int(score),
         "accuracy": round(float(accuracy), 4),
         "max_combo": int(max_combo),
-        "date": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "date": date,
+        "ts": _ts(date),
     }
-    lb = load_leaderboard(song_id, difficulty)
-    lb.append(entry)
+    lb = _prepare(load_leaderboard(song_id, difficulty))
+    pos = insert_entry(lb, entry)
+    total = len(lb)
     save_leaderboard(song_id, difficulty, lb)
 
-    pos, total = rank_position(lb, entry)
-    pct = percentile(lb, entry)
+    # posicao e percentil verdadeiros vem do historico completo (nao so do top 10)
+    try:
+        score_history.add_score(song_id, difficulty, entry["name"], entry["score"],
+                                entry["accuracy"], entry["max_combo"], entry["ts"], date)
+        pos, total = score_history.rank(song_id, difficulty, entry["score"], entry["accuracy"], entry["ts"])
+    except sqlite3.Error as e:
+        print("historico de scores indisponivel:", e)
+    pct = _percentile(pos, total)
 
     # campos auxiliares para tela de resultado
     entry["_position"] = pos
@@ -81,26 +101,30 @@ def submit_result(
     entry["_feedback"] = feedback_phrase(accuracy, pct)
     return entry
 
+def _same(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    return (a["name"], a["score"], a["accuracy"], a["max_combo"], a["date"]) == \
+           (b["name"], b["score"], b["accuracy"], b["max_combo"], b["date"])
+
 def rank_position(lb: List[Dict[str, Any]], entry: Dict[str, Any]) -> (int, int): # type: ignore
-    sorted_lb = sorted(
-        lb,
-        key=lambda e: (e.get("score",0), e.get("accuracy",0.0), -_ts(e.get("date"))),
-        reverse=True
-    )
-    for i, e in enumerate(sorted_lb, start=1):
-        if (e["name"], e["score"], e["accuracy"], e["max_combo"], e["date"]) == \
-           (entry["name"], entry["score"], entry["accuracy"], entry["max_combo"], entry["date"]):
-            return i, len(sorted_lb)
+    # lista qualquer (nao necessariamente ordenada): um sort, depois bisect
+    for e in lb:
+        if "ts" not in e:
+            e["ts"] = _ts(e.get("date"))
+    sorted_lb = sorted(lb, key=_key)
+    if "ts" not in entry:
+        entry = dict(entry, ts=_ts(entry.get("date")))
+    k = _key(entry)
+    i = bisect_left(sorted_lb, k, key=_key)
+    while i < len(sorted_lb) and _key(sorted_lb[i]) == k:
+        if _same(sorted_lb[i], entry):
+            return i + 1, len(sorted_lb)
+        i += 1
     return len(sorted_lb), len(sorted_lb)
 
 def percentile(lb: List[Dict[str, Any]], entry: Dict[str, Any]) -> int:
     if not lb: return 0
-    sorted_lb = sorted(lb, key=lambda e: (e.get("score",0), e.get("accuracy",0.0), -_ts(e.get("date"))), reverse=True)
-    pos = next((i for i, e in enumerate(sorted_lb, start=1)
-                if (e["name"], e["score"], e["accuracy"], e["max_combo"], e["date"]) ==
-                   (entry["name"], entry["score"], entry["accuracy"], entry["max_combo"], entry["date"])), len(sorted_lb))
-    better_than = (len(sorted_lb) - pos) / len(sorted_lb)
-    return int(round(better_than * 100))
+    pos, total = rank_position(lb, entry)
+    return _percentile(pos, total)
 
 def feedback_phrase(accuracy: float, percentile_value: int) -> str:
     acc = accuracy * 100.0
@@ -0,0 +1,145 @@
+# game/library.py
+# indice persistente da biblioteca de musicas (dados/library_index.json).
+# cada pasta de /musicas fica registrada com o mtime dela e o mtime/tamanho
+# de cada chart (editar um chart no lugar nao muda o mtime da pasta); ao abrir
+# o menu so as pastas novas ou alteradas sao escaneadas de novo (os.scandir).
+# o scan tambem guarda a dificuldade de cada chart (game/difficulty.py), para
+# o menu mostrar e ordenar sem analisar nada enquanto navega.
+from __future__ import annotations
+import os
+from typing import Any, Dict, List, Optional
+
+from . import chart_loader, difficulty
+from .data_store import load_json, save_json
+
+INDEX_FILE = "library_index.json"
+INDEX_VERSION = 4
+ROOT = chart_loader.ROOT
+
+_index: Optional[Dict[str, Any]] = None
+
+def _rel(path: Optional[str]) -> Optional[str]:
+    return os.path.relpath(path, ROOT) if path else None
+
+def _abs(path: Optional[str]) -> Optional[str]:
+    return os.path.join(ROOT, path) if path else None
+
+def _rating(path: str) -> Optional[Dict[str, Any]]:
+    # resumo da dificuldade guardado no indice (a analise completa fica no
+    # cache do difficulty); None se o chart nao carregar
+    try:
+        r = difficulty.rating_for(chart_loader.load_chart(path))
+    except Exception:
+        return None
+    return {k: r[k] for k in ("stars", "peak_nps", "notes", "nps_curve")}
+
+def _scan_folder(entry: os.DirEntry) -> Dict[str, Any]:
+    folder = entry.path
+    with os.scandir(folder) as it:
+        names = {e.name for e in it if e.is_file()}
+
+    charts = chart_loader.find_charts(folder, names)
+    meta = {}
+    if charts:
+        try:
+            meta = chart_loader.load_chart(next(iter(charts.values()))).meta
+        except Exception:
+            meta = {}
+    ratings = {d: _rating(p) for d, p in charts.items()}
+
+    return {
+        "id": entry.name,
+        "title": entry.name.replace("_", " ").title(),
+        "artist": meta.get("artist"),
+        "bpm": meta.get("bpm"),
+        "preview_ms": meta.get("preview_ms"),
+        "audio": _rel(chart_loader.find_audio(folder, names, meta)),
+        "cover": _rel(chart_loader.find_cover(folder, names)),
+        "bg": _rel(chart_loader.find_bg(folder, names)),
+        "charts": {d: _rel(p) for d, p in charts.items()},
+        "ratings": {d: r for d, r in ratings.items() if r is not None},
+    }
+
+def _chart_sig(song: Dict[str, Any]) -> Dict[str, Any]:
+    # [mtime_ns, tamanho] de cada chart da musica (None se sumiu)
+    sig = {}
+    for rel in song["charts"].values():
+        try:
+            st = os.stat(_abs(rel))
+            sig[rel] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            sig[rel] = None
+    return sig
+
+def _load_index() -> Dict[str, Any]:
+    global _index
+    if _index is None:
+        data = load_json(INDEX_FILE, {})
+        if data.get("version") != INDEX_VERSION:
+            data = {"version": INDEX_VERSION, "folders": {}}
+        _index = data
+    return _index
+
+def refresh(force: bool = False) -> Dict[str, Any]:
+    # reescaneia so as pastas cujo mtime (ou o de algum chart) mudou; devolve {"scanned": [...], "removed": [...]}
+    index = _load_index()
+    folders = index["folders"]
+    seen, scanned = set(), []
+
+    songs_dir = chart_loader.SONGS_DIR
+    if os.path.isdir(songs_dir):
+        with os.scandir(songs_dir) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                seen.add(entry.name)
+                mtime = entry.stat().st_mtime_ns
+                cached = folders.get(entry.name)
+                if (not force and cached and cached["mtime_ns"] == mtime
+                        and cached["charts"] == _chart_sig(cached["song"])):
+                    continue
+                song = _scan_folder(entry)
+                # o scan pode criar .bmc na pasta; guarda o mtime de depois
+                folders[entry.name] = {"mtime_ns": os.stat(entry.path).st_mtime_ns,
+                                       "charts": _chart_sig(song), "song": song}
+                scanned.append(entry.name)
+
+    removed = [name for name in folders if name not in seen]
+    for name in removed:
+        del folders[name]
+    if scanned or removed:
+        save_json(INDEX_FILE, index)
+    difficulty.save_cache()
+    return {"scanned": scanned, "removed": removed}
+
+def _expand(song: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(song)
+    for k in ("audio", "cover", "bg"):
+        out[k] = _abs(song[k])
+    out["charts"] = {d: _abs(p) for d, p in song["charts"].items()}
+    out["diffs"] = list(song["charts"])
+    # estrelas da musica = a dificuldade mais dificil (0 sem analise)
+    out["stars"] = max((r["stars"] for r in song["ratings"].values()), default=0.0)
+    return out
+
+def all_songs(refresh_first: bool = True) -> List[Dict[str, Any]]:
+    # todas as pastas, inclusive sem audio/charts (para as tools)
+    if refresh_first:
+        refresh()
+    folders = _load_index()["folders"]
+    return [_expand(folders[name]["song"]) for name in sorted(folders)]
+
+def list_songs(refresh_first: bool = True) -> List[Dict[str, Any]]:
+    # so as musicas jogaveis: com audio e pelo menos um chart
+    return [s for s in all_songs(refresh_first) if s["audio"] and s["charts"]]
+
+def get_song(song_id: str) -> Optional[Dict[str, Any]]:
+    folders = _load_index()["folders"]
+    if song_id not in folders:
+        refresh()
+    rec = folders.get(song_id)
+    return _expand(rec["song"]) if rec else None
+
+def chart_path(song_id: str, difficulty: str) -> Optional[str]:
+    song = get_song(song_id)
+    return song["charts"].get(difficulty) if song else None
@@ -1,13 +1,22 @@
 import os, json, pygame
-from .data_store import get_last_selected, set_last_selected, get_user_settings
+from .data_store import get_last_selected, set_last_selected, get_user_settings, update_user_settings
 from .leaderboard import load_leaderboard
 from .options_menu import run_options  # novo: abre menu de opcoes
+from . import chart_loader, library, preview_clips
+from .asset_cache import surfaces
+from .prefetch import prefetcher
+from .text_cache import get_font, texts
+from .frame_pacing import FramePacer
+from .profiler import get_profiler
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-SONGS_DIR = os.path.join(ROOT, "musicas")  # ajuste para "songs" se for o seu caso
+SONGS_DIR = chart_loader.SONGS_DIR
 CFG_KEYS = os.path.join(ROOT, "config", "keys_pc.json")
 
-TEMPO_PREVIEW = 30.0
+PREVIEW_FADE_MS = 300  # crossfade entre os trechos de preview
+SORT_MODES = ("title", "stars")
+SORT_LABELS = {"title": "titulo", "stars": "dificuldade"}
+CURVE_SIZE = (360, 48)
 
 def _load_keys():
     with open(CFG_KEYS, "r", encoding="utf-8") as f:
@@ -19,71 +28,52 @@ def _load_keys():
         "right": pygame.key.key_code(cfg["menu"]["right"]),
         "confirm": pygame.key.key_code(cfg["menu"]["confirm"]),
         "back": pygame.key.key_code(cfg["menu"]["back"]),
+        "sort": pygame.key.key_code(cfg["menu"].get("sort", "tab")),
     }
     return keys
 
 def _scan_songs():
-    items = []
-    for name in sorted(os.listdir(SONGS_DIR)):
-        p = os.path.join(SONGS_DIR, name)
-        if not os.path.isdir(p):
-            continue
-
-        # audio
-        audio = None
-        for cand in ("audio.mp3", "musica.mp3"):
-            ap = os.path.join(p, cand)
-            if os.path.exists(ap):
-                audio = ap; break
-        if not audio:
-            continue
-
-        # cover
-        cover = None
-        for c in ("capa.png", "capa.jpg", "cover.png", "cover.jpg"):
-            cp = os.path.join(p, c)
-            if os.path.exists(cp):
-                cover = cp; break
-
-        # bg
-        bg = None
-        for b in ("background.png", "background.jpg"):
-            bp = os.path.join(p, b)
-            if os.path.exists(bp):
-                bg = bp; break
-
-        # diffs
-        diffs = []
-        for d in ("easy", "normal", "hard", "expert", "master"):
-            if os.path.exists(os.path.join(p, f"{d}.json")):
-                diffs.append(d)
-        if not diffs:
-            continue
-
-        items.append({
-            "id": name,
-            "title": name.replace("_", " ").title(),
-            "audio": audio,
-            "cover": cover,
-            "bg": bg,
-            "diffs": diffs
-        })
-    return items
+    # indice persistente: so reescaneia pastas alteradas
+    return library.list_songs()
+
+def _sorted_songs(songs, mode):
+    # estrelas vem do indice da biblioteca (calculadas no scan), nada eh analisado aqui
+    if mode == "stars":
+        return sorted(songs, key=lambda s: (s["stars"], s["title"].lower()))
+    return sorted(songs, key=lambda s: s["title"].lower())
+
+def _stars_text(stars):
+    return f"{stars:.1f}*" if stars else "-"
+
+def _curve_surface(curve, size, color):
+    # curva de notas/s do chart (do indice) como grafico de linha
+    w, h = size
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    surf.fill((0, 0, 0, 90))
+    if len(curve) >= 2:
+        top = max(curve) or 1.0
+        pts = [(i * (w - 1) / (len(curve) - 1), h - 2 - v / top * (h - 4)) for i, v in enumerate(curve)]
+        pygame.draw.lines(surf, color, False, pts, 2)
+    return surf
 
 def run_menu(screen) -> tuple[str, str]:
     pygame.mixer.init()
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("arial", 28)
-    small = pygame.font.SysFont("arial", 20)
+    pacer = FramePacer()
+    font = get_font("arial", 28)
+    small = get_font("arial", 20)
 
     keys = _load_keys()
     songs = _scan_songs()
     if not songs:
         raise RuntimeError("nenhuma musica encontrada em /musicas")
 
-    # lista combinada: [configuracoes] + songs
+    # lista combinada: [configuracoes] + songs (na ordem escolhida)
     CONFIG_ITEM = {"id": "__config__", "title": "[Configuracoes]"}
-    items = [CONFIG_ITEM] + songs
+    sort_mode = get_user_settings().get("menu_sort", "title")
+    if sort_mode not in SORT_MODES:
+        sort_mode = SORT_MODES[0]
+    items = [CONFIG_ITEM] + _sorted_songs(songs, sort_mode)
+    curves = {}  # (song_id, diff) -> surface da curva de nps
 
     last = get_last_selected()
     # index inicial: se havia ultima musica, posiciona nela (shift +1 por causa do config)
@@ -98,55 +88,107 @@ def run_menu(screen) -> tuple[str, str]:
     phase = "select_song"  # ou "select_diff"
 
     current_preview = None
+    preview_channel = None  # canal tocando o trecho atual
+    show_stats = bool(get_user_settings().get("show_frame_stats", False))
+    stats_text, stats_at = "", 0
+    prof = get_profiler("menu")  # OSUMANIA_PROFILE=1 liga
 
     def apply_volume_from_settings():
         try:
             us = get_user_settings()
             vol = float(us.get("volume", 0.6) or 0.6)
             pygame.mixer.music.set_volume(vol)
+            return vol
         except Exception:
-            pass
+            return 0.6
+
+    def stop_preview(fade_ms=PREVIEW_FADE_MS):
+        nonlocal current_preview, preview_channel
+        if preview_channel is not None:
+            if fade_ms:
+                preview_channel.fadeout(fade_ms)
+            else:
+                preview_channel.stop()
+            preview_channel = None
+        pygame.mixer.music.stop()
+        current_preview = None
 
     def play_preview(song):
-        nonlocal current_preview
+        nonlocal current_preview, preview_channel
         if song["id"] == "__config__":
             # nao toca preview
             if current_preview is not None:
-                pygame.mixer.music.stop()
-                current_preview = None
+                stop_preview()
             return
         if current_preview == song["id"]:
             return
+        clip = prefetcher.preview(song["audio"], song.get("preview_ms"))
+        if clip is None:
+            if not prefetcher.preview_failed(song["audio"], song.get("preview_ms")):
+                # trecho ainda sendo extraido/carregado em background
+                return
+            # sem trecho (formato que o Sound nao decodifica): musica inteira
+            stop_preview()
+            start_ms = song.get("preview_ms")
+            current_preview = song["id"]
+            try:
+                pygame.mixer.music.load(song["audio"])
+                apply_volume_from_settings()
+                pygame.mixer.music.play(start=(preview_clips.DEFAULT_START_MS if start_ms is None else start_ms) / 1000)
+            except pygame.error:
+                pass
+            return
+        # crossfade: o trecho anterior sai enquanto o novo entra
+        # (volume no Sound: o canal fica livre para o fade)
+        old = preview_channel
         pygame.mixer.music.stop()
-        pygame.mixer.music.load(song["audio"])
-        apply_volume_from_settings()
-        pygame.mixer.music.play(start=TEMPO_PREVIEW)
+        clip.set_volume(apply_volume_from_settings())
+        preview_channel = clip.play(loops=-1, fade_ms=PREVIEW_FADE_MS)
+        if old is not None and old is not preview_channel:
+            old.fadeout(PREVIEW_FADE_MS)
         current_preview = song["id"]
 
     running = True
     while running:
+        prof.frame_start()
         screen.fill((10, 10, 18))
         W, H = screen.get_size()
+        surfaces.check_display((W, H))
+        # assets da selecao e vizinhas chegam em background
+        prefetcher.focus(items, sel_song_idx, (W, H))
+        prefetcher.poll()
+        prof.mark("prefetch")
 
         # eventos
         for ev in pygame.event.get():
             if ev.type == pygame.QUIT:
-                pygame.mixer.music.stop()
+                stop_preview(0)
+                prof.export()
                 raise SystemExit
+            if ev.type == pygame.KEYDOWN and ev.key == pygame.K_F3:
+                show_stats = not show_stats
+                continue
             if ev.type == pygame.KEYDOWN:
                 if phase == "select_song":
                     if ev.key == keys["up"]:
                         sel_song_idx = (sel_song_idx - 1) % len(items)
                     elif ev.key == keys["down"]:
                         sel_song_idx = (sel_song_idx + 1) % len(items)
+                    elif ev.key == keys["sort"]:
+                        # alterna a ordem mantendo o mesmo item selecionado
+                        sel_id = items[sel_song_idx]["id"]
+                        sort_mode = SORT_MODES[(SORT_MODES.index(sort_mode) + 1) % len(SORT_MODES)]
+                        items = [CONFIG_ITEM] + _sorted_songs(songs, sort_mode)
+                        sel_song_idx = next(i for i, it in enumerate(items) if it["id"] == sel_id)
+                        update_user_settings(menu_sort=sort_mode)
                     elif ev.key == keys["confirm"]:
                         if items[sel_song_idx]["id"] == "__config__":
                             # abre menu de opcoes e retorna aqui
-                            pygame.mixer.music.stop()
+                            stop_preview(0)
                             run_options(screen)
-                            # apos sair das opcoes, reaplica volume no preview
+                            # apos sair das opcoes, reaplica volume e frame pacing
                             apply_volume_from_settings()
-                            current_preview = None
+                            pacer = FramePacer()
                         else:
                             phase = "select_diff"
                             sel_diff_idx = 0
@@ -160,78 +202,116 @@ def run_menu(screen) -> tuple[str, str]:
                     elif ev.key == keys["confirm"]:
                         song_id = song["id"]
                         diff = diffs[sel_diff_idx]
-                        pygame.mixer.music.stop()
+                        stop_preview(0)
                         set_last_selected(song_id, diff)
+                        prof.export()
                         return song_id, diff
                     elif ev.key == keys["back"]:
                         phase = "select_song"
 
+        prof.mark("events")
+
         # preview automatico quando navegando
+        # (tambem na escolha de dificuldade: o trecho pode chegar depois)
         item = items[sel_song_idx]
-        if phase == "select_song":
-            # bg e preview apenas se for musica
-            if item["id"] != "__config__":
-                play_preview(item)
-            else:
-                # parado em config: sem audio
-                if current_preview is not None:
-                    pygame.mixer.music.stop()
-                    current_preview = None
-
-        # background (se item for musica e tiver bg)
-        if item.get("bg") and item["id"] != "__config__" and os.path.exists(item["bg"]):
-            bg_img = pygame.image.load(item["bg"]).convert()
-            bg_img = pygame.transform.scale(bg_img, (W, H))
+        # bg e preview apenas se for musica
+        if item["id"] != "__config__":
+            play_preview(item)
+        else:
+            # parado em config: sem audio
+            if current_preview is not None:
+                stop_preview()
+
+        prof.mark("preview")
+
+        # background (se item for musica e tiver bg), ja escurecido e em cache
+        bg_img = surfaces.get(item.get("bg"), (W, H), "dim140", load=False) if item["id"] != "__config__" else None
+        if bg_img:
             screen.blit(bg_img, (0, 0))
-            s = pygame.Surface((W, H), pygame.SRCALPHA); s.fill((0,0,0,140))
-            screen.blit(s, (0,0))
         else:
             # fundo simples
             screen.fill((12,12,20))
+        prof.mark("background")
 
         # coluna direita: primeiro configuracoes, depois musicas
         x_list, y_list = W - 360, 100
-        title = font.render("Menu", True, (240,240,240))
+        title = texts.render(font, "Menu", (240,240,240))
         screen.blit(title, (x_list, 50))
+        order = texts.render(small, f"ordem: {SORT_LABELS[sort_mode]} (tab)", (170,170,190))
+        screen.blit(order, (x_list + title.get_width() + 16, 58))
 
-        # desenha lista
+        # desenha lista (estrelas a esquerda de cada musica)
         for i, it in enumerate(items):
             label = it["title"] if it["id"] == "__config__" else it["title"]
             color = (120,200,255) if i == sel_song_idx else (220,220,220)
-            line = font.render(label, True, color)
+            line = texts.render(font, label, color)
             screen.blit(line, (x_list, y_list + 36*i))
+            if it["id"] != "__config__":
+                stars = texts.render(small, _stars_text(it["stars"]), (240,210,120))
+                screen.blit(stars, (x_list - 12 - stars.get_width(), y_list + 36*i + 6))
+
+        prof.mark("list")
 
         # coluna esquerda: leaderboard ou dica
         if item["id"] == "__config__":
             tip = "enter abre configuracoes"
-            screen.blit(small.render(tip, True, (230,230,230)), (40, 100))
+            screen.blit(texts.render(small, tip, (230,230,230)), (40, 100))
         else:
             diff_for_lb = (item["diffs"][sel_diff_idx] if phase == "select_diff"
                            else (get_last_selected().get("difficulty") or item["diffs"][0]))
             lb = load_leaderboard(item["id"], diff_for_lb)[:10]
-            lb_title = font.render(f"Leaderboard — {diff_for_lb.title()}", True, (240,240,240))
+            lb_title = texts.render(font, f"Leaderboard — {diff_for_lb.title()}", (240,240,240))
             screen.blit(lb_title, (40, 50))
             for i, e in enumerate(lb):
                 row = f'{i+1:>2}. {e.get("name","---")[:14]:<14}  {e.get("score",0):>7}  {round(e.get("accuracy",0)*100):>3}%'
-                screen.blit(small.render(row, True, (230,230,230)), (40, 100 + i*24))
+                screen.blit(texts.render(small, row, (230,230,230)), (40, 100 + i*24))
+
+        prof.mark("leaderboard")
 
         # centro: capa e dificuldades se musica
         if item["id"] != "__config__":
-            if item.get("cover") and os.path.exists(item["cover"]):
-                cover = pygame.image.load(item["cover"]).convert_alpha()
-                cover = pygame.transform.smoothscale(cover, (220, 220))
+            cover = surfaces.get(item.get("cover"), (220, 220), "alpha", load=False)
+            if cover:
                 screen.blit(cover, (W//2 - 110, H//2 - 140))
 
-            name_txt = font.render(item["title"], True, (255,255,255))
+            name_txt = texts.render(font, item["title"], (255,255,255))
             screen.blit(name_txt, (W//2 - name_txt.get_width()//2, H//2 + 100))
 
             if phase == "select_diff":
                 diffs = item["diffs"]
                 base_y = H//2 + 140
+                ratings = item.get("ratings", {})
                 for i, d in enumerate(diffs):
                     color = (120,200,255) if i == sel_diff_idx else (210,210,210)
-                    t = font.render(d.title(), True, color)
-                    screen.blit(t, (W//2 - (len(diffs)*90)//2 + i*90 - t.get_width()//2, base_y))
+                    x = W//2 - (len(diffs)*90)//2 + i*90
+                    t = texts.render(font, d.title(), color)
+                    screen.blit(t, (x - t.get_width()//2, base_y))
+                    r = ratings.get(d)
+                    st = texts.render(small, _stars_text(r["stars"] if r else 0), (240,210,120))
+                    screen.blit(st, (x - st.get_width()//2, base_y + 34))
+
+                # curva de densidade da dificuldade selecionada
+                r = ratings.get(diffs[sel_diff_idx])
+                if r:
+                    key = (item["id"], diffs[sel_diff_idx])
+                    if key not in curves:
+                        curves[key] = _curve_surface(r["nps_curve"], CURVE_SIZE, (120,200,255))
+                    cx, cy = W//2 - CURVE_SIZE[0]//2, base_y + 64
+                    screen.blit(curves[key], (cx, cy))
+                    info = f'{r["notes"]} notas  pico {r["peak_nps"]:.1f} notas/s'
+                    screen.blit(texts.render(small, info, (200,200,210)), (cx, cy + CURVE_SIZE[1] + 4))
+
+        prof.mark("center")
+
+        # overlay de tempo de frame (F3), texto atualizado 4x por segundo
+        if show_stats:
+            t = pygame.time.get_ticks()
+            if not stats_text or t - stats_at >= 250:
+                stats_text, stats_at = f"[{pacer.mode}] {pacer.stats.summary()}", t
+            screen.blit(texts.render(small, stats_text, (240,240,160)), (10, H - 28))
+        prof.mark("overlay")
 
         pygame.display.flip()
-        clock.tick(60)
+        prof.mark("flip")
+        pacer.tick()
+        prof.mark("wait")
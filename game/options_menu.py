@@ -1,19 +1,28 @@
 # game/options_menu.py
 import pygame
 from .data_store import get_user_settings, update_user_settings
+from .text_cache import get_font, texts
+from .frame_pacing import FPS_CHOICES, MODES, FramePacer
 
 def run_options(screen) -> None:
-    clock = pygame.time.Clock()
-    font  = pygame.font.SysFont("arial", 28)
-    small = pygame.font.SysFont("arial", 20)
+    pacer = FramePacer()
+    font  = get_font("arial", 28)
+    small = get_font("arial", 20)
 
     s = get_user_settings()
     volume_pct = int(round((s.get("volume", 0.8) or 0.0) * 100))
     bg_video   = bool(s.get("bg_video", False))
     latency_ms = int(s.get("latency_ms", 0))
+    pacing     = s.get("frame_pacing", "fixed") if s.get("frame_pacing") in MODES else "fixed"
+    target_fps = int(s.get("target_fps", 60) or 60)
 
     idx = 0
-    items = ["Volume", "Background durante a musica", "Latencia (ms)", "Salvar", "Voltar"]
+    items = ["Volume", "Background durante a musica", "Latencia (ms)", "Frame pacing", "FPS alvo",
+             "Salvar", "Voltar"]
+
+    def cycle(values, current, step):
+        i = values.index(current) if current in values else 0
+        return values[(i + step) % len(values)]
 
     def apply_volume():
         try:
@@ -25,29 +34,33 @@ def run_options(screen) -> None:
         screen.fill((14,14,22))
         W, H = screen.get_size()
 
-        title = font.render("Opcoes", True, (240,240,240))
+        title = texts.render(font, "Opcoes", (240,240,240))
         screen.blit(title, (W//2 - title.get_width()//2, 50))
 
         opts = [
             f"Volume: {volume_pct}%",
             f"Background: {'Ativo' if bg_video else 'Inativo'}",
             f"Latencia: {latency_ms} ms",
+            f"Frame pacing: {pacing}",
+            f"FPS alvo: {target_fps}" + ("" if pacing != "uncapped" else " (nao usado)"),
             "Salvar alteracoes",
             "Voltar"
         ]
         for i, text in enumerate(opts):
             color = (120,200,255) if i == idx else (220,220,220)
-            t = font.render(text, True, color)
+            t = texts.render(font, text, color)
             screen.blit(t, (W//2 - t.get_width()//2, 150 + i*50))
 
         help_text = {
             0: "Ajusta o volume geral da musica (0-100%).",
             1: "Liga/desliga background na gameplay (imagem/video).",
             2: "Compensa atraso entre audio/visual e sua tecla.",
-            3: "Grava em dados/settings_user.json.",
-            4: "Volta ao menu anterior."
+            3: "fixed/busy: FPS alvo; vsync: monitor (vale ao reiniciar o jogo); uncapped: sem limite.",
+            4: "Limite de FPS em fixed/busy (e no vsync se a janela saiu sem vsync).",
+            5: "Grava em dados/settings_user.json.",
+            6: "Volta ao menu anterior."
         }[idx]
-        h = small.render(help_text, True, (220,220,220))
+        h = texts.render(small, help_text, (220,220,220))
         screen.blit(h, (W//2 - h.get_width()//2, H - 80))
 
         pygame.display.flip()
@@ -72,6 +85,10 @@ def run_options(screen) -> None:
                         bg_video = not bg_video
                     elif idx == 2:
                         latency_ms -= 5
+                    elif idx == 3:
+                        pacing = cycle(MODES, pacing, -1)
+                    elif idx == 4:
+                        target_fps = cycle(FPS_CHOICES, target_fps, -1)
                 elif ev.key in (pygame.K_RIGHT, pygame.K_d):
                     if idx == 0:
                         volume_pct = min(100, volume_pct + 5); apply_volume()
@@ -79,14 +96,21 @@ def run_options(screen) -> None:
                         bg_video = not bg_video
                     elif idx == 2:
                         latency_ms += 5
+                    elif idx == 3:
+                        pacing = cycle(MODES, pacing, 1)
+                    elif idx == 4:
+                        target_fps = cycle(FPS_CHOICES, target_fps, 1)
                 elif ev.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-                    if idx == 3:
+                    if idx == 5:
                         update_user_settings(
                             volume=round(volume_pct/100.0, 2),
                             bg_video=bool(bg_video),
-                            latency_ms=int(latency_ms)
+                            latency_ms=int(latency_ms),
+                            frame_pacing=pacing,
+                            target_fps=int(target_fps)
                         )
                         apply_volume()
-                    elif idx == 4:
+                        pacer = FramePacer()
+                    elif idx == 6:
                         return
-        clock.tick(60)
+        pacer.tick()
@@ -0,0 +1,124 @@
+# game/prefetch.py
+# pre-carrega em threads os assets das musicas vizinhas da selecao no menu:
+# capa e background (decodificados em bytes, prontos para frombuffer) e o
+# trecho de preview (pygame.mixer.Sound de game/preview_clips.py, extraido na
+# primeira vez). a thread da UI nunca le disco: ela so chama focus() quando a
+# selecao muda e poll() uma vez por frame.
+from __future__ import annotations
+import queue, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from . import asset_cache, preview_clips
+
+RADIUS = 2        # musicas antes/depois da selecao
+WORKERS = 2
+POLL_LIMIT = 2    # surfaces finalizadas por frame (convert custa alguns ms)
+
+class Prefetcher:
+    def __init__(self, cache: asset_cache.SurfaceCache, radius: int = RADIUS, workers: int = WORKERS):
+        self.cache = cache
+        self.radius = radius
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._jobs: Dict[tuple, Tuple[object, threading.Event]] = {}
+        self._done: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._previews: Dict[tuple, object] = {}  # (audio, inicio) -> Sound
+        self._failed = set()
+        self._focus = None
+        self.cancelled = 0
+
+    def _submit(self, key: tuple, fn, *args):
+        if key in self._jobs or key in self._failed:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="prefetch")
+        cancel = threading.Event()
+        fut = self._pool.submit(self._run, key, cancel, fn, *args)
+        self._jobs[key] = (fut, cancel)
+
+    def _run(self, key, cancel, fn, *args):
+        if cancel.is_set():
+            return
+        try:
+            result = fn(*args)
+        except Exception:
+            result = None
+        if not cancel.is_set():
+            self._done.put((key, result))
+
+    def focus(self, items, index: int, screen_size, cover_size=(220, 220)):
+        # agenda a selecao atual primeiro e depois os vizinhos; cancela o resto
+        # id(items): o menu troca a lista ao reordenar (vizinhos mudam)
+        state = (index, tuple(screen_size), id(items), len(items))
+        if state == self._focus:
+            return
+        self._focus = state
+
+        order = [index]
+        for d in range(1, self.radius + 1):
+            order += [(index + d) % len(items), (index - d) % len(items)]
+
+        wanted = []
+        for i in order:
+            it = items[i]
+            if it.get("id") == "__config__":
+                continue
+            if it.get("cover"):
+                wanted.append(("img", it["cover"], tuple(cover_size), "alpha"))
+            if it.get("bg"):
+                wanted.append(("img", it["bg"], tuple(screen_size), "dim140"))
+            if it.get("audio"):
+                wanted.append(("preview", it["audio"], it.get("preview_ms")))
+
+        keep = set(wanted)
+        for key in list(self._jobs):
+            if key not in keep:
+                fut, cancel = self._jobs.pop(key)
+                cancel.set()
+                fut.cancel()
+                self.cancelled += 1
+        for clip in list(self._previews):
+            if ("preview",) + clip not in keep:
+                del self._previews[clip]
+
+        for key in wanted:
+            if key[0] == "img":
+                if key[1:] not in self.cache:
+                    self._submit(key, asset_cache.decode, *key[1:])
+            elif key[1:] not in self._previews:
+                self._submit(key, preview_clips.load, *key[1:])
+
+    def poll(self, limit: int = POLL_LIMIT):
+        # integra os resultados prontos (na thread da UI)
+        finished = 0
+        while finished < limit:
+            try:
+                key, result = self._done.get_nowait()
+            except queue.Empty:
+                break
+            if self._jobs.pop(key, None) is None:
+                continue  # cancelado depois de pronto
+            if result is None:
+                self._failed.add(key)
+                if key[0] == "img":
+                    self.cache.failed.add((key[1], key[2]))  # gameplay tambem nao tenta
+                continue
+            if key[0] == "preview":
+                self._previews[key[1:]] = result
+            else:
+                _, path, size, mode = key
+                self.cache.put((path, size, mode), asset_cache.finish(*result, mode))
+                finished += 1
+
+    def preview(self, audio: str, start_ms: Optional[int] = None):
+        return self._previews.get((audio, start_ms))
+
+    def preview_failed(self, audio: str, start_ms: Optional[int] = None) -> bool:
+        return ("preview", audio, start_ms) in self._failed
+
+    def pending(self) -> int:
+        return len(self._jobs)
+
+# instancia compartilhada (o menu eh reaberto apos cada musica)
+prefetcher = Prefetcher(asset_cache.surfaces)
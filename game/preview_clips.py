@@ -0,0 +1,90 @@
+# game/preview_clips.py
+# trechos de preview do menu: extraidos uma vez por musica e guardados em
+# dados/previews/ como wav pcm pequeno (CLIP_S segundos, com fade nas pontas
+# para tocar em loop sem estalo). o trecho comeca em song.preview_ms do chart
+# ou em DEFAULT_START_MS; musica curta -> trecho recuado para caber.
+# nome do arquivo: <hash do caminho>_<hash de tamanho/mtime/inicio/formato>.wav
+# audio trocado -> outro nome; os trechos antigos do mesmo audio sao apagados.
+# roda na thread do prefetch: decodificar o audio inteiro (mixer.Sound) so
+# acontece na primeira vez; depois eh so abrir um wav de ~2 MB.
+from __future__ import annotations
+import hashlib, os, sys, wave
+from array import array
+from typing import Optional
+
+import pygame
+
+from .data_store import BASE_DIR
+
+PREVIEWS_DIR = os.path.join(BASE_DIR, "previews")
+CLIP_VERSION = 1
+DEFAULT_START_MS = 30000
+CLIP_S = 15
+FADE_MS = 400    # fade in/out gravado no trecho
+# formatos do mixer que cabem num wav pcm: tamanho -> (bytes, typecode, centro)
+_PCM = {-16: (2, "h", 0), 8: (1, "B", 128)}
+
+def _key(path: str) -> str:
+    return hashlib.blake2b(os.path.abspath(path).encode("utf-8"), digest_size=8).hexdigest()
+
+def clip_path(audio: str, start_ms: Optional[int] = None) -> str:
+    st = os.stat(audio)
+    fmt = pygame.mixer.get_init()
+    sig = f"{CLIP_VERSION}|{st.st_size}|{st.st_mtime_ns}|{_start(start_ms)}|{fmt}"
+    sig_hash = hashlib.blake2b(sig.encode("utf-8"), digest_size=8).hexdigest()
+    return os.path.join(PREVIEWS_DIR, f"{_key(audio)}_{sig_hash}.wav")
+
+def _start(start_ms: Optional[int]) -> int:
+    return DEFAULT_START_MS if start_ms is None else max(0, int(start_ms))
+
+def _fade(pcm: array, channels: int, frames: int, center: int):
+    # rampa linear nas duas pontas, por amostra (so FADE_MS de cada lado)
+    total = len(pcm) // channels
+    frames = min(frames, total // 2)
+    for i in range(frames):
+        g = i / frames
+        a, b = i * channels, (total - 1 - i) * channels
+        for c in range(channels):
+            pcm[a + c] = int((pcm[a + c] - center) * g) + center
+            pcm[b + c] = int((pcm[b + c] - center) * g) + center
+
+def extract(audio: str, start_ms: Optional[int] = None) -> str:
+    # garante o trecho em disco e devolve o caminho (precisa do mixer iniciado)
+    path = clip_path(audio, start_ms)
+    if os.path.exists(path):
+        return path
+    freq, size, channels = pygame.mixer.get_init()
+    if size not in _PCM:
+        raise ValueError(f"formato do mixer sem wav pcm: {size}")
+    width, typecode, center = _PCM[size]
+
+    raw = pygame.mixer.Sound(file=audio).get_raw()
+    frame = width * channels
+    total = len(raw) // frame
+    count = min(total, CLIP_S * freq)
+    first = min(_start(start_ms) * freq // 1000, total - count)
+    pcm = array(typecode, raw[first * frame:(first + count) * frame])
+    _fade(pcm, channels, FADE_MS * freq // 1000, center)
+    if width > 1 and sys.byteorder == "big":
+        pcm.byteswap()  # wav eh little-endian
+
+    os.makedirs(PREVIEWS_DIR, exist_ok=True)
+    tmp = path + ".tmp"
+    with wave.open(tmp, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(width)
+        w.setframerate(freq)
+        w.writeframes(pcm.tobytes())
+    os.replace(tmp, path)
+
+    prefix = os.path.basename(path).split("_")[0] + "_"
+    for name in os.listdir(PREVIEWS_DIR):
+        if name.startswith(prefix) and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(PREVIEWS_DIR, name))
+            except OSError:
+                pass
+    return path
+
+def load(audio: str, start_ms: Optional[int] = None) -> pygame.mixer.Sound:
+    return pygame.mixer.Sound(file=extract(audio, start_ms))
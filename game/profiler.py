@@ -0,0 +1,161 @@
+# game/profiler.py
+# tempo por fase dos loops (run_game, run_menu), opcional.
+# liga com a variavel de ambiente OSUMANIA_PROFILE:
+#   OSUMANIA_PROFILE=1      -> json agregado + trace do chrome
+#   OSUMANIA_PROFILE=json   -> so o agregado
+#   OSUMANIA_PROFILE=trace  -> so o trace (abre em chrome://tracing ou perfetto)
+# desligado, get_profiler devolve NULL_PROFILER, cujos metodos nao fazem nada.
+# uso no loop:
+#   prof.frame_start()          # topo do frame (fecha o frame anterior)
+#   ...; prof.mark("events")    # tempo desde a marca anterior vai para a fase
+# na saida, prof.export() grava em dados/profile/<nome>_<data>.json e
+# <nome>_<data>.trace.json. compare builds com tools/profile_report.py.
+from __future__ import annotations
+import json, math, os, time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .data_store import BASE_DIR, _atomic_write
+
+PROFILE_DIR = os.path.join(BASE_DIR, "profile")
+ENV = "OSUMANIA_PROFILE"
+MAX_EVENTS = 200_000  # eventos guardados para o trace (os mais recentes)
+BUCKETS_PER_OCTAVE = 16  # baldes de ~4%
+
+def _bucket(us: float) -> int:
+    return int(math.log2(us + 1) * BUCKETS_PER_OCTAVE)
+
+def _bucket_us(b: int) -> float:
+    # meio do balde
+    return 2 ** ((b + 0.5) / BUCKETS_PER_OCTAVE) - 1
+
+class _Phase:
+    __slots__ = ("count", "total", "max", "hist")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.hist: Dict[int, int] = {}
+
+    def add(self, dur_ns: int):
+        self.count += 1
+        self.total += dur_ns
+        if dur_ns > self.max:
+            self.max = dur_ns
+        b = _bucket(dur_ns / 1000)
+        self.hist[b] = self.hist.get(b, 0) + 1
+
+    def percentile(self, p: float) -> float:
+        target = self.count * p / 100
+        seen = 0
+        for b in sorted(self.hist):
+            seen += self.hist[b]
+            if seen >= target:
+                return min(_bucket_us(b), self.max / 1000)
+        return 0.0
+
+    def to_dict(self, frame_total: int) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_us": round(self.total / self.count / 1000, 2) if self.count else 0.0,
+            "p50_us": round(self.percentile(50), 1),
+            "p95_us": round(self.percentile(95), 1),
+            "p99_us": round(self.percentile(99), 1),
+            "max_us": round(self.max / 1000, 1),
+            "total_ms": round(self.total / 1e6, 2),
+            "share": round(self.total / frame_total, 4) if frame_total else 0.0,
+            "histogram": {f"{_bucket_us(b):.1f}": n for b, n in sorted(self.hist.items())},
+        }
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, name: str, formats=("json", "trace"), max_events: int = MAX_EVENTS):
+        self.name = name
+        self.formats = tuple(formats)
+        self.phases: Dict[str, _Phase] = {}
+        self.events: deque = deque(maxlen=max_events)  # (fase, inicio_ns, duracao_ns)
+        self.frames = 0
+        self._frame_t0: Optional[int] = None
+        self._t = 0
+
+    def _add(self, phase: str, start: int, dur: int):
+        st = self.phases.get(phase)
+        if st is None:
+            st = self.phases[phase] = _Phase()
+        st.add(dur)
+        self.events.append((phase, start, dur))
+
+    def frame_start(self):
+        now = time.perf_counter_ns()
+        if self._frame_t0 is not None:
+            self._add("frame", self._frame_t0, now - self._frame_t0)
+            self.frames += 1
+        self._frame_t0 = self._t = now
+
+    def mark(self, phase: str):
+        now = time.perf_counter_ns()
+        self._add(phase, self._t, now - self._t)
+        self._t = now
+
+    def summary(self) -> Dict[str, Any]:
+        frame = self.phases.get("frame")
+        frame_total = frame.total if frame else 0
+        return {
+            "name": self.name,
+            "date": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "frames": self.frames,
+            "phases": {name: st.to_dict(frame_total) for name, st in self.phases.items()},
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        # eventos "X" (duracao completa); o frame engloba as fases dele
+        t0 = self.events[0][1] if self.events else 0
+        trace: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.name}},
+        ]
+        for phase, start, dur in self.events:
+            trace.append({"name": phase, "ph": "X", "pid": 1, "tid": 1,
+                          "ts": (start - t0) / 1000, "dur": dur / 1000})
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export(self, directory: Optional[str] = None) -> List[str]:
+        if not self.frames:
+            return []
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{self.name}_{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}")
+        paths = []
+        if "json" in self.formats:
+            _atomic_write(base + ".json", self.summary())
+            paths.append(base + ".json")
+        if "trace" in self.formats:
+            # trace pode ter centenas de milhares de eventos: json compacto
+            with open(base + ".trace.json", "w", encoding="utf-8") as f:
+                json.dump(self.chrome_trace(), f, separators=(",", ":"))
+            paths.append(base + ".trace.json")
+        return paths
+
+class NullProfiler:
+    enabled = False
+
+    def frame_start(self):
+        pass
+
+    def mark(self, phase: str):
+        pass
+
+    def export(self, directory: Optional[str] = None) -> List[str]:
+        return []
+
+NULL_PROFILER = NullProfiler()
+
+def get_profiler(name: str):
+    mode = os.environ.get(ENV, "").strip().lower()
+    if mode in ("", "0", "false", "off"):
+        return NULL_PROFILER
+    if mode in ("json", "trace"):
+        return Profiler(name, (mode,))
+    return Profiler(name)
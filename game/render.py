@@ -0,0 +1,174 @@
+# game/render.py
+# renderizacao da gameplay com retangulos sujos.
+# a camada estatica (fundo escurecido, lanes e linha de acerto) eh montada uma
+# vez; a cada frame so apaga (com a camada estatica) o que foi desenhado no
+# frame anterior, desenha as notas e o HUD se mudou, e manda para a tela so
+# esses retangulos com display.update(rects).
+# notas e efeitos vem do atlas da skin (game/skin.py) em um unico blits().
+from __future__ import annotations
+from typing import List, Optional
+
+import pygame
+
+from .judge import HOLD_ACTIVE
+from .skin import Skin
+from .text_cache import draw_fields, hud_texts
+
+BG_COLOR = (12, 12, 20)
+LANE_COLOR = (50, 50, 60)
+LINE_COLOR = (250, 250, 250)
+HIT_FX_MS = 90  # duracao do efeito de acerto
+
+class PlayfieldRenderer:
+    def __init__(self, screen: pygame.Surface, bg: Optional[pygame.Surface],
+                 lane_w: int, left_x: int, hit_y: int, note_h: int, lanes: int = 4,
+                 skin: Optional[Skin] = None):
+        self.screen = screen
+        self.lane_w = lane_w
+        self.left_x = left_x
+        self.hit_y = hit_y
+        self.note_h = note_h
+        self.lanes = lanes
+        self.static = self._build_static(bg)
+        self.skin = skin or Skin(lane_w, note_h, screen.get_height(), lanes)
+
+        # destino x e rect de origem de cada sprite, por lane (pre-calculados)
+        atlas = self.skin.atlas
+        self._note_src = []
+        self._hold_src = []
+        self._fx_src = []
+        for lane in range(lanes):
+            lane_x = left_x + lane*lane_w
+            src, (dx, dy) = self.skin.sprite("note", lane)
+            self._note_src.append((lane_x + dx, dy, src))
+            src, (dx, _) = self.skin.sprite("hold", lane)
+            self._hold_src.append((lane_x + dx, src))
+            src, (dx, dy) = self.skin.sprite("hit", lane)
+            self._fx_src.append((atlas, (lane_x + dx, hit_y + dy), src))
+        self._fx_until = [0] * lanes
+
+        self._batch: list = []                # (atlas, destino, origem) deste frame
+        self._prev: List[pygame.Rect] = []    # desenhado no frame anterior (apagar)
+        self._dirty: List[pygame.Rect] = []   # vai para display.update neste frame
+        self._hud_key = None
+        self._hud_parts = ()
+        self._hud_changed = True
+        self._hud_rects: List[pygame.Rect] = []
+        self._full = True
+
+    def _build_static(self, bg) -> pygame.Surface:
+        W, H = self.screen.get_size()
+        surf = pygame.Surface((W, H)).convert()
+        if bg:
+            surf.blit(bg, (0, 0))
+        else:
+            surf.fill(BG_COLOR)
+        for i in range(self.lanes):
+            x = self.left_x + i*self.lane_w
+            pygame.draw.rect(surf, LANE_COLOR, (x, 0, self.lane_w-4, H))
+        pygame.draw.line(surf, LINE_COLOR, (self.left_x, self.hit_y),
+                         (self.left_x + self.lane_w*self.lanes, self.hit_y), 3)
+        return surf
+
+    def invalidate(self):
+        # forca redesenho completo no proximo frame (ex: janela exposta)
+        self._full = True
+
+    def begin_frame(self, hud_lines=()):
+        # hud_lines: linhas do HUD, cada uma uma tupla de campos.
+        # apaga o frame anterior; se o HUD mudou, apaga o HUD antigo antes das notas
+        # (o HUD fica por cima das notas, como sempre foi)
+        screen, static = self.screen, self.static
+        if self._full:
+            screen.blit(static, (0, 0))
+            self._dirty = []
+        else:
+            for r in self._prev:
+                screen.blit(static, r, r)
+            self._dirty = self._prev
+        self._prev = []
+
+        self._hud_parts = tuple(hud_lines)
+        self._hud_changed = self._full or self._hud_parts != self._hud_key
+        if self._hud_changed and not self._full:
+            for r in self._hud_rects:
+                screen.blit(static, r, r)
+                self._dirty.append(r)
+
+    def hit(self, lane: int, now: int):
+        # acende o efeito de acerto da lane por HIT_FX_MS
+        self._fx_until[lane] = now + HIT_FX_MS
+
+    def draw_notes(self, now: int, notes, holds=()):
+        # notes: iteravel de (lane, y); holds: (lane, y_topo, y_base) dos corpos.
+        # corpos, efeitos e notas num unico blits(); corpos cortados na tela
+        atlas, note_src = self.skin.atlas, self._note_src
+        batch = []
+        H = self.screen.get_height()
+        for lane, top, bottom in holds:
+            top, bottom = max(int(top), 0), min(int(bottom), H)
+            if bottom > top:
+                x, src = self._hold_src[lane]
+                batch.append((atlas, (x, top), (src.x, src.y, src.w, min(bottom - top, src.h))))
+        batch += [self._fx_src[lane] for lane, until in enumerate(self._fx_until) if until > now]
+        for lane, y in notes:
+            x, dy, src = note_src[lane]
+            batch.append((atlas, (x, y + dy), src))
+        self._batch = batch
+        for r in self.screen.blits(batch):
+            if r.w and r.h:
+                self._prev.append(r)
+                self._dirty.append(r)
+
+    def draw_chart(self, now: int, sched, judge, speed: float):
+        # notas e holds da janela do scheduler; y = hit_y - (tempo - now) * speed.
+        # hold segurado: cabeca presa na linha de acerto, corpo encolhendo
+        hit_y = self.hit_y
+        notes = [(lane, hit_y - (t - now) * speed) for _, t, lane in sched.visible()]
+        bodies = []
+        for i, t, end, lane in sched.visible_holds():
+            state = judge.hold_state[i]
+            if state > HOLD_ACTIVE:
+                continue  # completo ou solto antes da hora
+            if state == HOLD_ACTIVE:
+                y_head = hit_y
+                notes.append((lane, y_head))
+            else:
+                y_head = hit_y - (t - now) * speed
+            bodies.append((lane, hit_y - (end - now) * speed, y_head + self.note_h // 2))
+        self.draw_notes(now, notes, bodies)
+
+    def _restore(self, r: pygame.Rect):
+        # volta um pedaco para o fundo estatico + notas deste frame
+        screen = self.screen
+        screen.blit(self.static, r, r)
+        clip = screen.get_clip()
+        screen.set_clip(r)
+        screen.blits(self._batch, doreturn=False)
+        screen.set_clip(clip)
+
+    def draw_hud(self, font, color, pos):
+        if self._hud_changed:
+            x, y = pos
+            self._hud_rects = []
+            for line in self._hud_parts:
+                self._hud_rects += draw_fields(self.screen, font, color, (x, y), line, hud_texts)
+                y += font.get_linesize()
+            self._dirty.extend(self._hud_rects)
+            self._hud_key = self._hud_parts
+            return
+        # HUD igual: so refaz os campos que alguma nota (apagada ou nova) tocou
+        dirty = self._dirty
+        parts = [part for line in self._hud_parts for part in line]
+        for part, r in zip(parts, self._hud_rects):
+            if r.collidelist(dirty) != -1:
+                self._restore(r)
+                self.screen.blit(hud_texts.render(font, part, color), r.topleft)
+                dirty.append(r)
+
+    def present(self):
+        if self._full:
+            pygame.display.flip()
+            self._full = False
+        elif self._dirty:
+            pygame.display.update(self._dirty)
@@ -0,0 +1,130 @@
+# game/replay.py
+# replays: os eventos de tecla de uma partida, ja em tempo da musica (ms,
+# com latencia aplicada), na ordem em que o julgamento os viu.
+# formato (dados/replays/<musica>_<dif>_<ts>.json):
+#   {"version": 1, "song", "difficulty", "player", "chart_digest",
+#    "hit_windows", "latency_ms", "result": {score, accuracy, max_combo},
+#    "events": [[t_ms, lane, down], ...]}   down: 1 = press, 0 = release
+# a gameplay avanca o julgamento (misses, fim de holds) ate o instante de cada
+# evento antes de julga-lo, e um miss so acontece depois da janela bad (quando
+# nenhum press acertaria mais a nota); entao reaplicar os eventos no mesmo
+# Judge/NoteScheduler da o mesmo score, accuracy e combo da partida.
+from __future__ import annotations
+import hashlib, json, os, random, time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .beatmap import Beatmap
+from .beatmap_cache import _le_bytes
+from .data_store import BASE_DIR, _atomic_write
+from .judge import Judge
+from .scheduler import NoteScheduler
+
+REPLAY_VERSION = 1
+REPLAYS_DIR = os.path.join(BASE_DIR, "replays")
+
+def chart_digest(bm: Beatmap) -> str:
+    # hash das notas (nao do arquivo): o mesmo chart em v1/v2/.bmc bate
+    h = hashlib.blake2b(digest_size=16)
+    for col in (bm.times, bm.lanes, bm.ends):
+        h.update(_le_bytes(col))
+    return h.hexdigest()
+
+class ReplayRecorder:
+    def __init__(self, song: str, difficulty: str, player: str, beatmap: Beatmap,
+                 hit_windows: Dict[str, int], latency_ms: int = 0):
+        self.header = {
+            "version": REPLAY_VERSION,
+            "song": song,
+            "difficulty": difficulty,
+            "player": player,
+            "chart_digest": chart_digest(beatmap),
+            "hit_windows": dict(hit_windows),
+            "latency_ms": latency_ms,
+        }
+        self.events: List[List[int]] = []
+
+    def record(self, t_ms: int, lane: int, down: bool):
+        self.events.append([int(t_ms), int(lane), 1 if down else 0])
+
+    def to_dict(self, result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {**self.header, "result": result or {}, "events": self.events}
+
+    def save(self, result: Optional[Dict[str, Any]] = None, path: Optional[str] = None) -> str:
+        if path is None:
+            stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+            name = f"{self.header['song']}_{self.header['difficulty']}_{stamp}.json"
+            path = os.path.join(REPLAYS_DIR, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _atomic_write(path, self.to_dict(result))
+        return path
+
+def load_replay(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != REPLAY_VERSION:
+        raise ValueError(f"versao de replay nao suportada: {data.get('version')}")
+    return data
+
+def autoplay_events(beatmap: Beatmap, jitter_ms: float = 0.0, hold_ms: int = 40, seed: int = 1) -> List[List[int]]:
+    # jogador sintetico: press em cada nota (+ desvio gaussiano) e release hold_ms
+    # depois (ou no fim do hold); para testes e benchmarks
+    rng = random.Random(seed)
+    events = []
+    for t, lane, end in beatmap:
+        p = int(round(t + rng.gauss(0.0, jitter_ms))) if jitter_ms else t
+        events.append([p, lane, 1])
+        events.append([max(p + 1, end or p + hold_ms), lane, 0])
+    events.sort()
+    return events
+
+def simulate(beatmap: Beatmap, events, hit_windows: Dict[str, int], lanes: int = 4,
+             frame=None, frame_ms: int = 16) -> Judge:
+    # roda o julgamento da gameplay sobre os eventos, sem relogio nem janela.
+    # frame(now, sched, judge): opcional, chamado a cada frame_ms de musica
+    # (ex: desenhar com o PlayfieldRenderer no driver dummy)
+    beatmap.reset()
+    sched = NoteScheduler(beatmap, miss_ms=hit_windows["bad"], ahead_ms=1000)
+    judge = Judge(sched, hit_windows, lanes=lanes)
+    next_frame = 0
+    for t, lane, down in events:
+        if frame is not None:
+            while next_frame <= t:
+                judge.advance(next_frame)
+                frame(next_frame, sched, judge)
+                next_frame += frame_ms
+        judge.advance(t)
+        if down:
+            judge.press(lane, t)
+        else:
+            judge.release(lane, t)
+    end = max(max(beatmap.times, default=0), max(beatmap.ends, default=0)) + hit_windows["bad"] + 1
+    if frame is not None:
+        while next_frame <= end:
+            judge.advance(next_frame)
+            frame(next_frame, sched, judge)
+            next_frame += frame_ms
+    judge.advance(end)
+    return judge
+
+def result_of(judge: Judge) -> Dict[str, Any]:
+    return {"score": judge.score, "accuracy": judge.accuracy(), "max_combo": judge.max_combo}
+
+def run_replay(replay: Dict[str, Any], beatmap: Beatmap, frame=None) -> Dict[str, Any]:
+    # reexecuta um replay; devolve o resultado, se bate com o gravado e a vazao
+    if replay.get("chart_digest") not in (None, chart_digest(beatmap)):
+        raise ValueError("replay gravado com outra versao do chart")
+    t0 = time.perf_counter()
+    judge = simulate(beatmap, replay["events"], replay["hit_windows"], frame=frame)
+    elapsed = time.perf_counter() - t0
+    res = result_of(judge)
+    expected = replay.get("result") or {}
+    return {
+        **res,
+        "hits": judge.hits,
+        "misses": judge.misses,
+        "notes": len(beatmap),
+        "matches": all(expected.get(k) == v for k, v in res.items()) if expected else None,
+        "seconds": elapsed,
+        "notes_per_s": len(beatmap) / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,82 @@
+# game/scheduler.py
+# linha do tempo das notas para a gameplay.
+# trabalha sobre as colunas de um Beatmap ordenado e mantem dois cursores:
+#  - pending: primeira nota que ainda pode ser julgada (antes dela tudo ja foi julgado)
+#  - vis_end: primeira nota alem da janela visivel
+# assim cada frame so toca nas notas entre now - miss_ms e now + ahead_ms.
+# holds (ends[i] != 0) podem continuar na tela depois que a cabeca passou:
+# quando entram na janela vao para a lista holds (poucos por vez) e saem
+# quando o fim passa de now - miss_ms.
+from bisect import bisect_left, bisect_right
+
+class NoteScheduler:
+    def __init__(self, beatmap, miss_ms: int, ahead_ms: int):
+        self.beatmap = beatmap.sort()
+        self.times = beatmap.times
+        self.lanes = beatmap.lanes
+        self.judged = beatmap.judged
+        self.miss_ms = int(miss_ms)
+        self.ahead_ms = int(ahead_ms)
+        self.ends = beatmap.ends
+        self.pending = 0
+        self.vis_end = 0
+        self.holds = []  # holds na tela (indices)
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def finished(self) -> bool:
+        return self.pending >= len(self.times)
+
+    def seek(self, now: int):
+        # reposiciona os cursores (ex: comecar a musica no meio); nao marca misses
+        self.pending = bisect_left(self.times, now - self.miss_ms)
+        self.vis_end = max(self.pending, bisect_right(self.times, now + self.ahead_ms))
+        # holds que comecaram antes e ainda nao acabaram: procura para tras ate
+        # a nota mais antiga cujo fim ainda pode estar na tela (seek eh raro)
+        ends, limit = self.ends, now - self.miss_ms
+        self.holds = [i for i in range(self.vis_end) if ends[i] and ends[i] >= limit]
+
+    def update(self, now: int) -> int:
+        # avanca os cursores e devolve quantos julgamentos passaram da janela
+        # sem acerto (hold perdido conta cabeca e cauda)
+        times, ends, judged = self.times, self.ends, self.judged
+        n = len(times)
+        misses = 0
+        i = self.pending
+        limit = now - self.miss_ms
+        while i < n and times[i] < limit:
+            if not judged[i]:
+                judged[i] = 1
+                misses += 2 if ends[i] else 1
+            i += 1
+        self.pending = i
+
+        holds = self.holds
+        if holds:
+            holds[:] = [h for h in holds if ends[h] >= limit]
+        j = max(self.vis_end, i)
+        limit = now + self.ahead_ms
+        while j < n and times[j] <= limit:
+            if ends[j]:
+                holds.append(j)
+            j += 1
+        self.vis_end = j
+        return misses
+
+    def visible(self):
+        # (indice, tempo, lane) das notas ainda nao julgadas na janela atual
+        times, lanes, judged = self.times, self.lanes, self.judged
+        for i in range(self.pending, self.vis_end):
+            if not judged[i]:
+                yield i, times[i], lanes[i]
+
+    def visible_holds(self):
+        # (indice, inicio, fim, lane) dos holds na tela, julgados ou nao
+        times, ends, lanes = self.times, self.ends, self.lanes
+        for i in self.holds:
+            yield i, times[i], ends[i], lanes[i]
+
+    def judge(self, i: int):
+        self.judged[i] = 1
@@ -0,0 +1,225 @@
+# game/score_history.py
+# historico completo de partidas em SQLite (dados/scores.sqlite3).
+# - scores: append-only, uma linha por partida
+# - indices em (song, difficulty, score...) e (player, ...) para top-N e recordes
+# - rank/percentil em tempo logaritmico: uma arvore de Fenwick esparsa por
+#   (song, difficulty) sobre o score, guardada na tabela score_tree. cada
+#   insercao/consulta toca ~31 nos, cada um por chave primaria.
+# os json de musicas/*/leaderboard/ sao importados uma vez na criacao do banco.
+from __future__ import annotations
+import json, os, sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_store import BASE_DIR
+
+DB_PATH = os.path.join(BASE_DIR, "scores.sqlite3")
+SONGS_DIR = os.path.join(os.path.dirname(__file__), "..", "musicas")
+TREE_SIZE = 1 << 31  # scores de 0 a 2^31-1
+MAX_SCORE = TREE_SIZE - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    song TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    accuracy REAL NOT NULL,
+    max_combo INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_rank
+    ON scores (song, difficulty, score DESC, accuracy DESC, ts);
+CREATE INDEX IF NOT EXISTS idx_scores_player
+    ON scores (player, song, difficulty, score DESC, accuracy DESC, ts);
+CREATE TABLE IF NOT EXISTS score_tree (
+    song TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    node INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (song, difficulty, node)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_ORDER = "score DESC, accuracy DESC, ts ASC"
+_COLS = "player, score, accuracy, max_combo, ts, date"
+
+_conn: Optional[sqlite3.Connection] = None
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(path or DB_PATH)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        _conn = connect()
+        if _get_meta(_conn, "json_imported") is None:
+            import_json_leaderboards(_conn)
+    return _conn
+
+def _get_meta(conn, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+# --- arvore de Fenwick (contagem de partidas por score) ---
+
+def _clamp(score) -> int:
+    # score fora de 0..MAX_SCORE vira a ponta mais proxima: com indice <= 0 o
+    # laco do Fenwick (i += i & -i) nunca termina
+    return min(max(int(score), 0), MAX_SCORE)
+
+def _tree_add(conn, song: str, difficulty: str, score: int, count: int = 1):
+    i = _clamp(score) + 1  # o Fenwick eh 1-based: score 0 -> no 1
+    rows = []
+    while i <= TREE_SIZE:
+        rows.append((song, difficulty, i, count))
+        i += i & -i
+    conn.executemany(
+        "INSERT INTO score_tree (song, difficulty, node, n) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (song, difficulty, node) DO UPDATE SET n = n + excluded.n", rows)
+
+def _tree_prefix(conn, song: str, difficulty: str, score: int) -> int:
+    # quantas partidas com score <= score
+    if score < 0:
+        return 0
+    nodes = []
+    i = min(score + 1, TREE_SIZE)
+    while i > 0:
+        nodes.append(i)
+        i -= i & -i
+    q = conn.execute(
+        f"SELECT COALESCE(SUM(n), 0) FROM score_tree WHERE song = ? AND difficulty = ? "
+        f"AND node IN ({','.join('?' * len(nodes))})", (song, difficulty, *nodes))
+    return q.fetchone()[0]
+
+def rebuild_tree(conn, song: Optional[str] = None, difficulty: Optional[str] = None):
+    # recalcula a arvore a partir de scores (importacao em massa, reparo)
+    where, args = "", ()
+    if song is not None:
+        where, args = "WHERE song = ? AND difficulty = ?", (song, difficulty)
+    with conn:
+        conn.execute(f"DELETE FROM score_tree {where}", args)
+        tree: Dict[Tuple[str, str, int], int] = {}
+        for s, d, score, c in conn.execute(
+                f"SELECT song, difficulty, score, COUNT(*) FROM scores {where} "
+                f"GROUP BY song, difficulty, score", args):
+            i = _clamp(score) + 1
+            while i <= TREE_SIZE:
+                k = (s, d, i)
+                tree[k] = tree.get(k, 0) + c
+                i += i & -i
+        conn.executemany("INSERT INTO score_tree (song, difficulty, node, n) VALUES (?, ?, ?, ?)",
+                         ((s, d, i, n) for (s, d, i), n in tree.items()))
+
+# --- escrita ---
+
+def add_score(song: str, difficulty: str, player: str, score: int, accuracy: float,
+              max_combo: int, ts: int, date: str, conn: Optional[sqlite3.Connection] = None) -> int:
+    conn = conn or db()
+    difficulty = difficulty.lower()
+    score = _clamp(score)  # tabela e arvore com o mesmo score
+    with conn:
+        cur = conn.execute(
+            "INSERT INTO scores (song, difficulty, player, score, accuracy, max_combo, ts, date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (song, difficulty, player, score, float(accuracy), int(max_combo), int(ts), date))
+        _tree_add(conn, song, difficulty, score)
+    return cur.lastrowid
+
+# --- consultas ---
+
+def top(song: str, difficulty: str, n: int = 10, conn=None) -> List[Dict[str, Any]]:
+    conn = conn or db()
+    rows = conn.execute(
+        f"SELECT {_COLS} FROM scores WHERE song = ? AND difficulty = ? ORDER BY {_ORDER} LIMIT ?",
+        (song, difficulty.lower(), n))
+    return [dict(r) for r in rows]
+
+def total(song: str, difficulty: str, conn=None) -> int:
+    conn = conn or db()
+    return _tree_prefix(conn, song, difficulty.lower(), TREE_SIZE - 1)
+
+def rank(song: str, difficulty: str, score: int, accuracy: float, ts: int, conn=None) -> Tuple[int, int]:
+    # (posicao 1-based, total); empate no score desempata por accuracy e data
+    conn = conn or db()
+    difficulty = difficulty.lower()
+    score = _clamp(score)
+    count = total(song, difficulty, conn)
+    better = count - _tree_prefix(conn, song, difficulty, score)
+    better += conn.execute(
+        "SELECT COUNT(*) FROM scores WHERE song = ? AND difficulty = ? AND score = ? "
+        "AND (accuracy > ? OR (accuracy = ? AND ts < ?))",
+        (song, difficulty, score, accuracy, accuracy, ts)).fetchone()[0]
+    return better + 1, count
+
+def percentile(song: str, difficulty: str, score: int, accuracy: float, ts: int, conn=None) -> int:
+    pos, count = rank(song, difficulty, score, accuracy, ts, conn)
+    if not count:
+        return 0
+    return int(round((count - pos) / count * 100))
+
+def personal_best(player: str, song: str, difficulty: str, conn=None) -> Optional[Dict[str, Any]]:
+    conn = conn or db()
+    row = conn.execute(
+        f"SELECT {_COLS} FROM scores WHERE player = ? AND song = ? AND difficulty = ? "
+        f"ORDER BY {_ORDER} LIMIT 1", (player, song, difficulty.lower())).fetchone()
+    return dict(row) if row else None
+
+def player_bests(player: str, conn=None) -> List[Dict[str, Any]]:
+    # melhor score do jogador em cada musica/dificuldade
+    conn = conn or db()
+    rows = conn.execute(
+        "SELECT song, difficulty, MAX(score) AS score, COUNT(*) AS plays "
+        "FROM scores WHERE player = ? GROUP BY song, difficulty ORDER BY song, difficulty", (player,))
+    return [dict(r) for r in rows]
+
+# --- importacao dos leaderboards em json ---
+
+def import_json_leaderboards(conn=None, songs_dir: Optional[str] = None) -> int:
+    # le musicas/*/leaderboard/*.json; devolve quantas partidas entraram.
+    # partida que ja esta no banco (importacao anterior, ou gravada pelo jogo,
+    # que escreve nos dois) eh pulada: reimportar nao duplica o historico
+    from .leaderboard import _ts
+    conn = conn or db()
+    songs_dir = songs_dir or SONGS_DIR
+    rows = []
+    if os.path.isdir(songs_dir):
+        for song in sorted(os.listdir(songs_dir)):
+            lb_dir = os.path.join(songs_dir, song, "leaderboard")
+            if not os.path.isdir(lb_dir):
+                continue
+            for name in sorted(os.listdir(lb_dir)):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(lb_dir, name), "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                except Exception:
+                    continue
+                diff = name[:-5].lower()
+                for e in entries if isinstance(entries, list) else []:
+                    date = e.get("date") or ""
+                    rows.append((song, diff, str(e.get("name", "---")), _clamp(e.get("score", 0)),
+                                 float(e.get("accuracy", 0.0)), int(e.get("max_combo", 0)),
+                                 int(e.get("ts", _ts(date))), date))
+    with conn:
+        cur = conn.executemany(
+            "INSERT INTO scores (song, difficulty, player, score, accuracy, max_combo, ts, date) "
+            "SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8 WHERE NOT EXISTS ("
+            "SELECT 1 FROM scores WHERE song = ?1 AND difficulty = ?2 AND score = ?4 "
+            "AND accuracy = ?5 AND ts = ?7 AND player = ?3)", rows)
+        added = max(cur.rowcount, 0)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', '1')")
+    if added:
+        rebuild_tree(conn)
+    return added
@@ -0,0 +1,223 @@
+# game/serial_input.py
+# entrada pelo controle arduino (porta serial), em paralelo ao teclado.
+# uma thread le a porta e carimba cada leitura com perf_counter_ns assim que
+# ela volta; os eventos vao para a mesma InputQueue que o InputPoller enche e
+# o run_game consome (deque, sem lock).
+# protocolo placa -> pc, 1 byte por evento:
+#   0x80 | lane        release da lane (0..31)
+#   0xA0 | lane        press da lane
+#   0xC0..0xFF         controle (creditos do streaming de chart, ver chart_streamer)
+#   0x00..0x7F         texto ascii de debug (Serial.print), guardado por linha
+# config em config/controller.json:
+#   {"enabled": true, "port": "/dev/ttyACM0", "baud": 115200, "lanes": [0, 1, 2, 3]}
+#   lanes[i] = lane do jogo para o botao i da placa (null ignora o botao)
+#   stream_chart/window_ms/sync_ms: leds pelo game.chart_streamer
+# usa o pyserial se estiver instalado; sem ele, abre a porta direto com
+# termios (linux/mac). tools/serial_input_check.py testa com um pty.
+from __future__ import annotations
+import json, os, threading, time
+from collections import deque
+from typing import Callable, List, Optional
+
+from .input import InputQueue
+
+try:
+    import serial  # pyserial (opcional)
+except ImportError:
+    serial = None
+try:
+    import select, termios, tty
+except ImportError:  # windows
+    termios = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CFG_CONTROLLER = os.path.join(ROOT, "config", "controller.json")
+
+BAUD = 115200
+READ_TIMEOUT_S = 0.05  # a thread confere o pedido de parada nesse intervalo
+READ_CHUNK = 4096
+
+EV_RELEASE = 0x80
+EV_PRESS = 0xA0
+EV_CONTROL = 0xC0
+LANE_MASK = 0x1F
+
+class _PyserialPort:
+    def __init__(self, path: str, baud: int):
+        self.s = serial.Serial(path, baud, timeout=READ_TIMEOUT_S)
+
+    def read(self) -> bytes:
+        # espera o primeiro byte e leva junto o que ja chegou (read(n) do
+        # pyserial esperaria n bytes ou o timeout)
+        data = self.s.read(1)
+        if data:
+            n = self.s.in_waiting
+            if n:
+                data += self.s.read(n)
+        return data
+
+    def write(self, data: bytes):
+        self.s.write(data)
+
+    def close(self):
+        self.s.close()
+
+class _TermiosPort:
+    def __init__(self, path: str, baud: int):
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        try:
+            tty.setraw(self.fd)  # sem eco nem buffer de linha; VMIN=1
+            attrs = termios.tcgetattr(self.fd)
+            speed = getattr(termios, f"B{baud}", None)
+            if speed is not None:
+                attrs[4] = attrs[5] = speed
+            attrs[2] |= termios.CLOCAL | termios.CREAD
+            termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def read(self) -> bytes:
+        r, _, _ = select.select([self.fd], [], [], READ_TIMEOUT_S)
+        if not r:
+            return b""
+        data = os.read(self.fd, READ_CHUNK)
+        if not data:
+            raise OSError("porta serial fechada")
+        return data
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+
+    def close(self):
+        os.close(self.fd)
+
+def open_port(path: str, baud: int = BAUD, backend: str = "auto"):
+    # objeto com read() (bytes ja disponiveis, b"" no timeout), write, close
+    if backend in ("auto", "pyserial") and serial is not None:
+        return _PyserialPort(path, baud)
+    if backend in ("auto", "termios") and termios is not None:
+        return _TermiosPort(path, baud)
+    raise OSError(f"sem backend serial '{backend}' (instale pyserial)")
+
+class SerialInput:
+    def __init__(self, port: str, baud: int = BAUD, lane_map: Optional[List[Optional[int]]] = None,
+                 queue: Optional[InputQueue] = None, lanes: int = 4, backend: str = "auto"):
+        self.port_name = port
+        self.baud = baud
+        self.backend = backend
+        self.lane_map = list(lane_map) if lane_map is not None else list(range(lanes))
+        self.lanes = lanes
+        self.queue = queue if queue is not None else InputQueue()
+        self.text: deque = deque(maxlen=32)  # ultimas linhas de debug da placa
+        self.events = 0
+        self.dropped = 0  # bytes de lane sem mapeamento
+        self.bytes = 0
+        self.error: Optional[str] = None
+        self.on_control: Optional[Callable[[int], None]] = None  # bytes de controle (thread leitora)
+        self._line = bytearray()
+        self._port = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def attach(self, queue: InputQueue, lanes: Optional[int] = None):
+        # troca a fila de destino (uma por partida)
+        self.queue = queue
+        if lanes is not None:
+            self.lanes = lanes
+
+    def start(self):
+        # abre a porta (OSError se falhar) e sobe a thread leitora
+        self._port = open_port(self.port_name, self.baud, self.backend)
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="serial-input", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, data: bytes):
+        # pc -> placa (chart_streamer); a thread leitora so le
+        if self._port is None:
+            raise OSError("porta serial fechada")
+        self._port.write(data)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        if self._port is not None:
+            self._port.close()
+            self._port = None
+
+    def _run(self):
+        read = self._port.read
+        perf = time.perf_counter_ns
+        while not self._stop.is_set():
+            try:
+                data = read()
+            except OSError as e:  # placa desconectada; SerialException herda de OSError
+                self.error = str(e)
+                return
+            if data:
+                self.feed(data, perf())
+
+    def feed(self, data: bytes, t_ns: int):
+        # bytes que chegaram juntos ganham o mesmo carimbo (o da leitura)
+        push = self.queue.events.append
+        lane_map, lanes = self.lane_map, self.lanes
+        self.bytes += len(data)
+        for b in data:
+            if b >= EV_CONTROL:
+                if self.on_control is not None:
+                    self.on_control(b)
+                continue
+            if b >= EV_RELEASE:
+                i = b & LANE_MASK
+                lane = lane_map[i] if i < len(lane_map) else None
+                if lane is None or not 0 <= lane < lanes:
+                    self.dropped += 1
+                    continue
+                push((t_ns, lane, b >= EV_PRESS))
+                self.events += 1
+            elif b == 0x0A:
+                self.text.append(self._line.decode("ascii", "replace").rstrip("\r"))
+                self._line.clear()
+            elif len(self._line) < 256:
+                self._line.append(b)
+
+def load_controller_config(path: str = CFG_CONTROLLER) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+_controller: Optional[SerialInput] = None
+
+def get_controller(lanes: int = 4) -> Optional[SerialInput]:
+    # controle compartilhado entre partidas; None se desligado ou sem placa.
+    # se a thread morreu (cabo solto), tenta abrir de novo
+    global _controller
+    if _controller is not None and _controller.running:
+        return _controller
+    if _controller is not None:
+        _controller.stop()
+        _controller = None
+    cfg = load_controller_config()
+    if not cfg.get("enabled") or not cfg.get("port"):
+        return None
+    ctl = SerialInput(cfg["port"], int(cfg.get("baud", BAUD)), cfg.get("lanes"), lanes=lanes,
+                      backend=cfg.get("backend", "auto"))
+    try:
+        _controller = ctl.start()
+    except OSError as e:
+        print("controle serial indisponivel:", e)
+        return None
+    return _controller
@@ -0,0 +1,92 @@
+# game/skin.py
+# atlas de sprites da gameplay: nota, corpo de hold e efeito de acerto,
+# pre-renderizados uma vez por lane em uma unica surface. o renderer so
+# guarda os rects de origem e desenha tudo com Surface.blits().
+# skins: assets/skins/<nome>/ com note.png, hold.png, hit.png (ou
+# note_<lane>.png etc. para uma textura por lane); o que faltar usa o padrao.
+from __future__ import annotations
+import os
+from typing import Optional, Sequence, Tuple
+
+import pygame
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SKINS_DIR = os.path.join(ROOT, "assets", "skins")
+
+NOTE_COLOR = (80, 190, 255)
+KINDS = ("note", "hit", "hold")
+
+class Skin:
+    def __init__(self, lane_w: int, note_h: int, body_h: int, lanes: int = 4,
+                 colors: Optional[Sequence[Tuple[int, int, int]]] = None,
+                 textures_dir: Optional[str] = None):
+        self.lane_w = lane_w
+        self.note_h = note_h
+        self.lanes = lanes
+        colors = list(colors or [NOTE_COLOR] * lanes)
+
+        # tamanho de cada sprite e deslocamento dentro da lane
+        self.sizes = {
+            "note": (lane_w - 16, note_h),
+            "hit": (lane_w - 4, note_h * 2),
+            "hold": (lane_w - 40, body_h),
+        }
+        self.offsets = {
+            "note": (8, 0),
+            "hit": (0, -note_h // 2),
+            "hold": (20, 0),
+        }
+        rows, y = {}, 0
+        for kind in KINDS:
+            rows[kind] = y
+            y += self.sizes[kind][1]
+
+        self.atlas = pygame.Surface((lane_w * lanes, y), pygame.SRCALPHA)
+        self.src: dict = {kind: [] for kind in KINDS}
+        for lane in range(lanes):
+            for kind in KINDS:
+                w, h = self.sizes[kind]
+                area = pygame.Rect(lane * lane_w, rows[kind], w, h)
+                tex = _load_texture(textures_dir, kind, lane, (w, h))
+                if tex is not None:
+                    self.atlas.blit(tex, area)
+                else:
+                    _draw_default(self.atlas, kind, area, colors[lane])
+                self.src[kind].append(area)
+        if pygame.display.get_surface() is not None:
+            self.atlas = self.atlas.convert_alpha()
+
+    def sprite(self, kind: str, lane: int) -> Tuple[pygame.Rect, Tuple[int, int]]:
+        # (rect de origem no atlas, deslocamento dentro da lane)
+        return self.src[kind][lane], self.offsets[kind]
+
+def _draw_default(atlas: pygame.Surface, kind: str, area: pygame.Rect, color):
+    if kind == "note":
+        atlas.fill(color, area)
+    elif kind == "hold":
+        atlas.fill((*color, 150), area)
+    else:
+        atlas.fill((*color, 90), area)
+        atlas.fill((255, 255, 255, 140), area.inflate(-8, -area.h // 2))
+
+def _load_texture(textures_dir: Optional[str], kind: str, lane: int, size) -> Optional[pygame.Surface]:
+    if not textures_dir:
+        return None
+    for name in (f"{kind}_{lane}.png", f"{kind}.png"):
+        p = os.path.join(textures_dir, name)
+        if os.path.exists(p):
+            try:
+                img = pygame.image.load(p)
+            except pygame.error:
+                continue
+            rgba = pygame.Surface(img.get_size(), pygame.SRCALPHA, 32)
+            rgba.blit(img, (0, 0))
+            return pygame.transform.smoothscale(rgba, size)
+    return None
+
+def load_skin(name: Optional[str], lane_w: int, note_h: int, body_h: int, lanes: int = 4) -> Skin:
+    # name None/"default" ou pasta inexistente -> sprites padrao
+    textures = os.path.join(SKINS_DIR, name) if name and name != "default" else None
+    if textures and not os.path.isdir(textures):
+        textures = None
+    return Skin(lane_w, note_h, body_h, lanes, textures_dir=textures)
@@ -0,0 +1,113 @@
+# game/song_clock.py
+# posicao da musica para a gameplay.
+# ticks de parede a partir do play() ignoram a latencia de inicio do mixer e
+# o drift entre o relogio do audio e o do sistema. aqui o tempo da musica eh
+# um relogio monotonic (perf_counter_ns) com taxa e fase corrigidas pelas
+# leituras de mixer.music.get_pos(), como um PLL de segunda ordem:
+#   - fase: cada leitura puxa o relogio uma fracao do erro (no maximo
+#     MAX_STEP_MS por leitura, entao a posicao nao pula na tela)
+#   - a posicao devolvida nunca volta: uma correcao para tras (ou uma
+#     ressincronizacao) segura o relogio no maior valor ja entregue ate o
+#     novo trecho alcancar. inputs do frame seguinte nunca caem antes do
+#     julgamento do anterior (e o replay reproduz igual)
+#   - taxa: o erro acumulado ajusta a velocidade, corrigindo drift constante
+#   - erro maior que RESYNC_MS (travada, buffer perdido) ressincroniza de vez
+# get_pos eh a posicao do ultimo callback do mixer + ticks desde entao, entao
+# tem o jitter do callback e a resolucao de 1 ms; os ganhos baixos filtram isso.
+# antes do audio comecar (get_pos <= 0) o relogio fica parado em 0.
+from __future__ import annotations
+import math
+import time
+from typing import Optional
+
+import pygame
+
+PHASE_GAIN = 0.1
+RATE_GAIN = 0.0003  # ajuste de taxa por ms de erro
+MAX_STEP_MS = 2.0
+RESYNC_MS = 80.0
+MAX_RATE_DEV = 0.1  # taxa limitada a 1 +- 10%
+
+class SongClock:
+    def __init__(self, latency_ms: int = 0):
+        self.latency_ms = latency_ms
+        self.base_ns: Optional[int] = None  # instante de referencia
+        self.base_ms = 0.0                  # posicao da musica nesse instante
+        self.rate = 1.0
+        self._floor = -math.inf             # maior posicao ja devolvida
+
+        # estatisticas do erro (audio - relogio) antes da correcao
+        self.samples = 0
+        self.resyncs = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.max_err = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self.base_ns is not None
+
+    def start(self, t_ns: Optional[int] = None):
+        # chamar logo depois de mixer.music.play()
+        self.base_ns = time.perf_counter_ns() if t_ns is None else t_ns
+        self.base_ms = 0.0
+        self.rate = 1.0
+        self._floor = 0.0
+
+    def position(self, t_ns: Optional[int] = None) -> float:
+        # posicao estimada do audio (ms, sem latencia) no instante t_ns
+        if t_ns is None:
+            t_ns = time.perf_counter_ns()
+        pos = self.base_ms + (t_ns - self.base_ns) / 1e6 * self.rate
+        if pos < self._floor:
+            return self._floor
+        self._floor = pos
+        return pos
+
+    def now_ms(self, t_ns: Optional[int] = None) -> int:
+        # tempo da musica para o julgamento/render, com o latency_ms do usuario
+        return int(self.position(t_ns)) + self.latency_ms
+
+    def sample(self, pos_ms: float, t_ns: Optional[int] = None):
+        # pos_ms: leitura do audio (get_pos) feita no instante t_ns
+        if self.base_ns is None:
+            return
+        if t_ns is None:
+            t_ns = time.perf_counter_ns()
+        if pos_ms <= 0:
+            if not self.samples:
+                self.base_ns, self.base_ms = t_ns, 0.0  # audio ainda nao comecou
+            return
+        pred = self.position(t_ns)
+        err = pos_ms - pred
+
+        self.samples += 1
+        delta = err - self._mean
+        self._mean += delta / self.samples
+        self._m2 += delta * (err - self._mean)
+        self.max_err = max(self.max_err, abs(err))
+
+        if abs(err) > RESYNC_MS:
+            self.base_ns, self.base_ms = t_ns, float(pos_ms)
+            self.resyncs += 1
+            return
+        step = max(-MAX_STEP_MS, min(MAX_STEP_MS, err * PHASE_GAIN))
+        self.base_ns, self.base_ms = t_ns, pred + step
+        self.rate = max(1 - MAX_RATE_DEV, min(1 + MAX_RATE_DEV, self.rate + err * RATE_GAIN))
+
+    def update(self):
+        # le o mixer (uma vez por frame basta)
+        self.sample(pygame.mixer.music.get_pos())
+
+    def stats(self) -> dict:
+        # drift: quanto o audio anda a mais (ms por segundo) que o relogio do sistema
+        # jitter: desvio padrao do erro audio - relogio nas leituras
+        jitter = math.sqrt(self._m2 / (self.samples - 1)) if self.samples > 1 else 0.0
+        return {
+            "samples": self.samples,
+            "resyncs": self.resyncs,
+            "drift_ms_per_s": round((self.rate - 1) * 1000, 3),
+            "mean_err_ms": round(self._mean, 3),
+            "jitter_ms": round(jitter, 3),
+            "max_err_ms": round(self.max_err, 3),
+        }
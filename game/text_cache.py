@@ -0,0 +1,72 @@
+# game/text_cache.py
+# cache LRU de textos renderizados: chave (font, texto, cor, antialias).
+# font.render eh uma das chamadas mais caras por frame; textos que se
+# repetem (itens de menu, rotulos do HUD) sao rasterizados uma vez so.
+# o HUD da gameplay usa um cache proprio e pequeno (hud_texts): score e combo
+# viram chave nova a cada hit e, no cache compartilhado, expulsariam os textos
+# do menu durante a partida. os rotulos fixos do HUD sao usados todo redesenho,
+# entao ficam no fim do LRU e quem sai sao os numeros velhos.
+# as fontes vem de get_font: uma Font por (nome, tamanho) no jogo todo. a chave
+# do cache eh o objeto Font; com um SysFont novo a cada entrada numa tela nada
+# acertava entre entradas e as entradas velhas prendiam fontes mortas.
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+import pygame
+
+MAX_ITEMS = 1024
+HUD_ITEMS = 64
+
+_fonts: Dict[Tuple[str, int], pygame.font.Font] = {}
+
+def get_font(name: str, size: int) -> pygame.font.Font:
+    # fontes vivem ate o pygame.quit() (o jogo so encerra uma vez)
+    font = _fonts.get((name, size))
+    if font is None:
+        font = _fonts[(name, size)] = pygame.font.SysFont(name, size)
+    return font
+
+class TextCache:
+    def __init__(self, max_items: int = MAX_ITEMS):
+        self.max_items = max_items
+        self.items: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+        key = (font, text, tuple(color), antialias)
+        surf = self.items.get(key)
+        if surf is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self.items[key] = surf
+        if len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self.items.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "items": len(self.items)}
+
+# instancia compartilhada por menu, opcoes e gameplay
+texts = TextCache()
+# campos do HUD (numeros que mudam a cada hit)
+hud_texts = TextCache(HUD_ITEMS)
+
+def draw_fields(screen, font, color, pos: Tuple[int, int], parts: Iterable[str],
+                cache: TextCache = texts) -> List[pygame.Rect]:
+    # desenha uma linha em pedacos (ex: rotulo fixo + numero que muda);
+    # so o pedaco que mudou eh rasterizado de novo. devolve os rects desenhados
+    x, y = pos
+    rects = []
+    for part in parts:
+        surf = cache.render(font, part, color)
+        rects.append(screen.blit(surf, (x, y)))
+        x += surf.get_width()
+    return rects
@@ -7,13 +7,23 @@ from game.menu import run_menu
 from game.gameplay import run_game
 from game.options_menu import run_options
 from game.data_store import get_user_settings
+from game.frame_pacing import FramePacer, set_vsync
 
 ROOT = os.path.abspath(os.path.dirname(__file__))
 
 def init_pygame(width=1000, height=720):
     pygame.init()
     pygame.mixer.init()
-    screen = pygame.display.set_mode((width, height))
+    screen = None
+    if get_user_settings().get("frame_pacing") == "vsync":
+        # vsync no pygame 2 precisa de SCALED ou OPENGL; se o driver recusar, janela normal
+        try:
+            screen = pygame.display.set_mode((width, height), pygame.SCALED, vsync=1)
+        except pygame.error:
+            screen = None
+    set_vsync(screen is not None)  # sem vsync, o modo vsync usa o limitador fixed
+    if screen is None:
+        screen = pygame.display.set_mode((width, height))
     pygame.display.set_caption("projeto_osumania")
     return screen
 
@@ -27,7 +37,7 @@ def apply_global_volume():
 
 def main():
     screen = init_pygame()
-    clock = pygame.time.Clock()
+    pacer = FramePacer()
 
     running = True
     while running:
@@ -69,7 +79,7 @@ def main():
         except Exception as e:
             print("erro na gameplay:", e)
 
-        clock.tick(60)
+        pacer.tick()
 
     # encerra
     try:
@@ -0,0 +1,765 @@
+# tools/bench.py
+# benchmarks de desempenho (rodam sem janela)
+# uso: python tools/bench.py            -> roda todos
+#      python tools/bench.py scheduler  -> roda so os nomeados
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+BENCHES = {}
+
+def bench(fn):
+    BENCHES[fn.__name__[len("bench_"):]] = fn
+    return fn
+
+def _synthetic_notes(count, nps=8.0, lanes=4, seed=1):
+    # notas com densidade constante (nps notas por segundo), tempos em ms
+    rng = random.Random(seed)
+    step = 1000.0 / nps
+    times = [int(i * step) for i in range(count)]
+    lane_list = [rng.randrange(lanes) for _ in range(count)]
+    return times, lane_list
+
+def _timeit(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+@bench
+def bench_scheduler():
+    # custo por frame (update + percorrer janela visivel) vs varredura de todas as notas
+    from game.beatmap import Beatmap
+    from game.scheduler import NoteScheduler
+
+    FRAME_MS, FRAMES = 16, 2000
+    print(f"{'notas':>8} {'scheduler us/frame':>20} {'scan total us/frame':>20}")
+    for count in (100, 1_000, 10_000, 100_000):
+        times, lanes = _synthetic_notes(count)
+        sched = NoteScheduler(Beatmap.from_notes(zip(times, lanes)), miss_ms=150, ahead_ms=1000)
+        start = times[count // 2] - FRAME_MS * FRAMES // 2 if count > 200 else 0
+        sched.seek(start)
+
+        t0 = time.perf_counter()
+        now = start
+        for _ in range(FRAMES):
+            sched.update(now)
+            for _ in sched.visible():
+                pass
+            now += FRAME_MS
+        per_frame = (time.perf_counter() - t0) / FRAMES
+
+        # referencia: laco antigo sobre todas as notas (menos frames, eh O(n))
+        notes = [{"time": t, "lane": l} for t, l in zip(times, lanes)]
+        def scan_all():
+            for n in notes:
+                if n.get("judged"):
+                    continue
+                y = 600 - (n["time"] - start) * 0.6
+                if -24 <= y <= 744:
+                    pass
+        naive = _timeit(scan_all, max(1, 20_000 // count))
+
+        print(f"{count:>8} {per_frame*1e6:>20.1f} {naive*1e6:>20.1f}")
+
+@bench
+def bench_judge():
+    # presses por segundo no julgamento por lane, chart denso (40 notas/s)
+    from game.beatmap import Beatmap
+    from game.scheduler import NoteScheduler
+    from game.judge import Judge
+
+    hw = {"perfect": 50, "good": 100, "bad": 150}
+    rng = random.Random(2)
+    for count in (1_000, 100_000):
+        times, lanes = _synthetic_notes(count, nps=40.0)
+        presses = [(l, t + rng.randint(-60, 60)) for t, l in zip(times, lanes)]
+        presses.sort(key=lambda p: p[1])
+
+        sched = NoteScheduler(Beatmap.from_notes(zip(times, lanes)), miss_ms=hw["bad"], ahead_ms=1000)
+        judge = Judge(sched, hw)
+        t0 = time.perf_counter()
+        for lane, now in presses:
+            judge.press(lane, now)
+        dt = time.perf_counter() - t0
+        print(f"{count:>8} notas: {len(presses)/dt:>12,.0f} presses/s  hits={judge.hits} score={judge.score}")
+
+@bench
+def bench_beatmap():
+    # memoria e iteracao: list-of-dicts (formato antigo) vs Beatmap em colunas
+    import tracemalloc
+    from game.beatmap import Beatmap
+
+    print(f"{'notas':>8} {'dicts bytes/nota':>17} {'Beatmap bytes/nota':>19} {'dicts ms/iter':>14} {'Beatmap ms/iter':>16}")
+    for count in (1_000, 100_000):
+        times, lanes = _synthetic_notes(count)
+
+        tracemalloc.start()
+        notes = [{"time": t, "lane": l, "judged": False} for t, l in zip(times, lanes)]
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        bm = Beatmap.from_notes(zip(times, lanes))
+        bm_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        def iter_dicts():
+            s = 0
+            for n in notes:
+                if not n["judged"]:
+                    s += n["time"] + n["lane"]
+        def iter_columns():
+            s = 0
+            for t, l, j in zip(bm.times, bm.lanes, bm.judged):
+                if not j:
+                    s += t + l
+
+        rep = max(1, 200_000 // count)
+        d_ms = _timeit(iter_dicts, rep) * 1e3
+        b_ms = _timeit(iter_columns, rep) * 1e3
+        print(f"{count:>8} {dict_bytes/count:>17.1f} {bm_bytes/count:>19.1f} {d_ms:>14.3f} {b_ms:>16.3f}")
+
+@bench
+def bench_beatmap_cache():
+    # tempo de carga: json.loads do chart vs .bmc via mmap
+    import json, os, tempfile
+    from game import beatmap_cache
+    from game.chart_loader import parse_chart
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (1_500, 100_000):
+            times, lanes = _synthetic_notes(count)
+            path = os.path.join(tmp, f"chart_{count}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump([{"tempo": t, "coluna": l + 1} for t, l in zip(times, lanes)], f, indent=4)
+            beatmap_cache.compile_chart(path, parse_chart)
+
+            def from_json():
+                with open(path, "rb") as f:
+                    parse_chart(f.read())
+            rep = max(3, 30_000 // count)
+            j_ms = _timeit(from_json, rep) * 1e3
+            c_ms = _timeit(lambda: beatmap_cache.read_cache(path), rep) * 1e3
+            print(f"{count:>8} notas: json {j_ms:8.3f} ms   bmc {c_ms:8.3f} ms   ({j_ms/c_ms:.0f}x)")
+
+@bench
+def bench_library():
+    # abertura do menu: scan completo vs refresh incremental do indice
+    import json, os, tempfile
+    from game import chart_loader, data_store, library
+
+    count = 2_000
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = os.path.join(tmp, "musicas")
+        dados = os.path.join(tmp, "dados")
+        os.makedirs(dados)
+        times, lanes = _synthetic_notes(50)
+        chart = json.dumps([{"tempo": t, "coluna": l + 1} for t, l in zip(times, lanes)])
+        for i in range(count):
+            d = os.path.join(songs, f"song_{i:05d}")
+            os.makedirs(d)
+            for name in ("audio.mp3", "capa.png"):
+                open(os.path.join(d, name), "wb").close()
+            with open(os.path.join(d, "hard.json"), "w") as f:
+                f.write(chart)
+
+        old = (chart_loader.SONGS_DIR, data_store.BASE_DIR, library._index)
+        chart_loader.SONGS_DIR, data_store.BASE_DIR, library._index = songs, dados, None
+        try:
+            t0 = time.perf_counter(); library.refresh(); cold = time.perf_counter() - t0
+            library._index = None  # simula reabrir o jogo (le o indice do disco)
+            t0 = time.perf_counter(); library.list_songs(); warm = time.perf_counter() - t0
+            os.utime(os.path.join(songs, "song_00007"), ns=(0, 0))
+            t0 = time.perf_counter(); res = library.refresh(); one = time.perf_counter() - t0
+        finally:
+            chart_loader.SONGS_DIR, data_store.BASE_DIR, library._index = old
+        print(f"{count} pastas: scan completo {cold*1e3:.0f} ms, indice em dia {warm*1e3:.0f} ms, "
+              f"1 pasta alterada {one*1e3:.0f} ms (reescaneadas={len(res['scanned'])})")
+
+@bench
+def bench_ranking():
+    # submit: 3 sorts com fromisoformat (antigo) vs insercao unica com bisect
+    from datetime import datetime, timedelta
+    from game import leaderboard as lbm
+
+    def old_submit(lb, entry):
+        key = lambda e: (e.get("score", 0), e.get("accuracy", 0.0), -lbm._ts(e.get("date")))
+        lb.append(entry)
+        sorted(lb, key=key, reverse=True)                 # save_leaderboard
+        ranked = sorted(lb, key=key, reverse=True)        # rank_position
+        sorted(lb, key=key, reverse=True)                 # percentile
+        ident = lambda e: (e["name"], e["score"], e["accuracy"], e["max_combo"], e["date"])
+        pos = next(i for i, e in enumerate(ranked, start=1) if ident(e) == ident(entry))
+        return pos, lbm._percentile(pos, len(lb))
+
+    def new_submit(lb, entry):
+        pos = lbm.insert_entry(lb, entry)
+        return pos, lbm._percentile(pos, len(lb))
+
+    rng = random.Random(3)
+    base = datetime(2024, 1, 1)
+    for count in (10_000, 1_000_000):
+        lb = []
+        for i in range(count):
+            date = (base + timedelta(seconds=i)).isoformat(timespec="seconds") + "Z"
+            lb.append({"name": f"p{i}", "score": rng.randint(0, 500_000), "accuracy": round(rng.random(), 4),
+                       "max_combo": 0, "date": date, "ts": lbm._ts(date)})
+        entry = {"name": "novo", "score": 250_000, "accuracy": 0.5, "max_combo": 0,
+                 "date": "2025-01-01T00:00:00Z"}
+        entry["ts"] = lbm._ts(entry["date"])
+
+        sorted_lb = sorted((dict(e) for e in lb), key=lbm._key)
+        t0 = time.perf_counter(); new = new_submit(sorted_lb, dict(entry)); t_new = time.perf_counter() - t0
+        t0 = time.perf_counter(); old = old_submit(lb, dict(entry)); t_old = time.perf_counter() - t0
+        assert old == new, (old, new)
+        print(f"{count:>9} entradas: antigo {t_old*1e3:10.1f} ms   bisect {t_new*1e3:8.3f} ms   (pos={new[0]}, pct={new[1]})")
+
+@bench
+def bench_history():
+    # historico em SQLite: consultas com 1M partidas numa mesma musica
+    import os, tempfile
+    from game import score_history as sh
+
+    count, queries = 1_000_000, 1_000
+    rng = random.Random(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sh.connect(os.path.join(tmp, "scores.sqlite3"))
+        t0 = time.perf_counter()
+        with conn:
+            conn.executemany(
+                "INSERT INTO scores (song, difficulty, player, score, accuracy, max_combo, ts, date) "
+                "VALUES ('s', 'hard', ?, ?, ?, 0, ?, '')",
+                ((f"p{i % 5000}", rng.randint(0, 9000) * 50, round(rng.random(), 4), i) for i in range(count)))
+        sh.rebuild_tree(conn)
+        print(f"carga de {count:,} partidas + arvore: {time.perf_counter() - t0:.1f} s")
+
+        def avg_us(fn):
+            t0 = time.perf_counter()
+            for _ in range(queries):
+                fn()
+            return (time.perf_counter() - t0) / queries * 1e6
+
+        score = lambda: rng.randint(0, 9000) * 50
+        print(f"  insert (+arvore)   {avg_us(lambda: sh.add_score('s', 'hard', 'x', score(), 0.5, 0, 2*count, '', conn)):9.1f} us")
+        print(f"  top 10             {avg_us(lambda: sh.top('s', 'hard', 10, conn)):9.1f} us")
+        print(f"  rank               {avg_us(lambda: sh.rank('s', 'hard', score(), 0.5, count, conn)):9.1f} us")
+        print(f"  percentile         {avg_us(lambda: sh.percentile('s', 'hard', score(), 0.5, count, conn)):9.1f} us")
+        print(f"  personal best      {avg_us(lambda: sh.personal_best(f'p{rng.randrange(5000)}', 's', 'hard', conn)):9.1f} us")
+        naive = lambda: conn.execute("SELECT COUNT(*) FROM scores WHERE song = 's' AND difficulty = 'hard' "
+                                     "AND score > ?", (score(),)).fetchone()
+        t0 = time.perf_counter()
+        for _ in range(20):
+            naive()
+        print(f"  rank via COUNT(*)  {(time.perf_counter() - t0) / 20 * 1e6:9.1f} us  (referencia, linear)")
+        conn.close()
+
+        # pontas: score 0 (no 1 da arvore), negativo e acima do maximo sao
+        # presos em 0..MAX_SCORE (antes, indice <= 0 travava o _tree_add)
+        conn = sh.connect(os.path.join(tmp, "pontas.sqlite3"))
+        for i, sc in enumerate((0, 0, -5, 1000, 1 << 40)):
+            sh.add_score("s", "hard", f"p{i}", sc, 0.5, 0, i, "", conn)
+        assert sh.total("s", "hard", conn) == 5
+        assert sh.rank("s", "hard", 0, 0.5, 0, conn) == (3, 5)          # empata com 2 e eh o mais antigo
+        assert sh.rank("s", "hard", -1, 0.5, 99, conn) == (6, 5)         # preso em 0, depois de todos
+        assert sh.rank("s", "hard", sh.MAX_SCORE, 0.5, 99, conn) == (2, 5)
+        sh.rebuild_tree(conn)
+        assert sh.total("s", "hard", conn) == 5
+        assert [r["score"] for r in sh.top("s", "hard", 10, conn)] == [sh.MAX_SCORE, 1000, 0, 0, 0]
+        print("  scores 0, negativo e acima do maximo: ok")
+        conn.close()
+
+def _headless_pygame(size=(1000, 720)):
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    return pygame, pygame.display.set_mode(size)
+
+@bench
+def bench_text():
+    # custo de texto por frame nas 3 telas: font.render direto vs TextCache
+    pygame, screen = _headless_pygame()
+    from game.text_cache import HUD_ITEMS, TextCache, draw_fields, get_font
+
+    font = get_font("arial", 28)
+    small = get_font("arial", 20)
+    hud_font = get_font("arial", 24)
+    FRAMES = 300
+    white = (240, 240, 240)
+
+    songs = [f"Musica Numero {i}" for i in range(30)]
+    rows = [f"{i+1:>2}. {'jogador'+str(i):<14}  {100000 - i*1234:>7}  {90 - i:>3}%" for i in range(10)]
+    opts = ["Volume: 80%", "Background: Inativo", "Latencia: 0 ms", "Salvar alteracoes", "Voltar"]
+
+    # no HUD score/combo mudam a cada hit (~1 a cada 8 frames num chart de 8 notas/s)
+    def hud_frame(render, f):
+        f //= 8
+        text = f"musica [hard]  Score: {f*300}  Combo: {f}  Acc: 97%  Vol: 80%  Lat: 0ms"
+        screen.blit(render(hud_font, text, white), (20, 20))
+    def hud_fields(cache, f):
+        f //= 8
+        draw_fields(screen, hud_font, white, (20, 20), (
+            "musica [hard]  ", f"Score: {f*300}  ", f"Combo: {f}  ", "Acc: 97%  ", "Vol: 80%  Lat: 0ms"), cache)
+    def menu_frame(render, f, font=font, small=small):
+        for i, t in enumerate(songs):
+            screen.blit(render(font, t, (120, 200, 255) if i == f % 30 else (220, 220, 220)), (600, 100 + 36*i))
+        for i, r in enumerate(rows):
+            screen.blit(render(small, r, (230, 230, 230)), (40, 100 + 24*i))
+    def options_frame(render, f):
+        for i, t in enumerate(opts):
+            screen.blit(render(font, t, (120, 200, 255) if i == f % 5 else (220, 220, 220)), (300, 150 + 50*i))
+
+    direct = lambda fnt, text, color: fnt.render(text, True, color)
+    for name, old, new in (
+        ("gameplay HUD", lambda f: hud_frame(direct, f), None),
+        ("menu", lambda f: menu_frame(direct, f), menu_frame),
+        ("opcoes", lambda f: options_frame(direct, f), options_frame),
+    ):
+        cache = TextCache(HUD_ITEMS) if new is None else TextCache()
+        t0 = time.perf_counter()
+        for f in range(FRAMES):
+            old(f)
+        t_old = (time.perf_counter() - t0) / FRAMES
+        t0 = time.perf_counter()
+        for f in range(FRAMES):
+            if new is None:
+                hud_fields(cache, f)
+            else:
+                new(cache.render, f)
+        t_new = (time.perf_counter() - t0) / FRAMES
+        print(f"{name:<14} antes {t_old*1e3:7.3f} ms/frame   depois {t_new*1e3:7.3f} ms/frame")
+
+    # partida longa (1000 hits) e volta ao menu. como no jogo, cada entrada no
+    # menu pede as fontes de novo: SysFont cria outra Font (chave nova no cache,
+    # nada acerta), get_font devolve a mesma. o HUD no cache compartilhado
+    # expulsa os textos do menu; com o hud_texts nao
+    sysfont = pygame.font.SysFont
+    for label, fonts, separate in (("SysFont, HUD compartilhado", sysfont, False),
+                                   ("SysFont, HUD proprio", sysfont, True),
+                                   ("get_font, HUD compartilhado", get_font, False),
+                                   ("get_font, HUD proprio", get_font, True)):
+        shared = TextCache()
+        enter_menu = lambda: menu_frame(shared.render, 0, fonts("arial", 28), fonts("arial", 20))
+        enter_menu()
+        hud = TextCache(HUD_ITEMS) if separate else shared
+        for f in range(8000):
+            hud_fields(hud, f)
+        before = shared.misses
+        enter_menu()
+        print(f"{label:<27}: menu depois da partida rasteriza {shared.misses - before} de "
+              f"{len(songs) + len(rows)} textos de novo")
+
+@bench
+def bench_render():
+    # frame da gameplay: redesenho total + flip (antigo) vs retangulos sujos
+    import pygame
+    from game.beatmap import Beatmap
+    from game.scheduler import NoteScheduler
+    from game.render import PlayfieldRenderer
+    from game.text_cache import draw_fields
+
+    FRAMES = 240
+    bg_path = ROOT / "assets" / "backgrounds" / "never_meant_to_belong_bg.jpg"
+    for size in ((1920, 1080), (2560, 1440)):
+        pygame, screen = _headless_pygame(size)
+        W, H = size
+        LANE_W, NOTE_H, SPEED = 100, 24, 0.6
+        LEFT_X, HIT_Y = W//2 - LANE_W*2, H - 120
+        font = pygame.font.SysFont("arial", 24)
+        bg = pygame.transform.scale(pygame.image.load(str(bg_path)).convert(), size)
+        dimmed = bg.copy()
+        shade = pygame.Surface(size, pygame.SRCALPHA); shade.fill((0, 0, 0, 140))
+        dimmed.blit(shade, (0, 0))
+
+        times, lanes = _synthetic_notes(2_000, nps=12.0)
+        def hud(f):
+            f //= 8
+            return ("musica [hard]  ", f"Score: {f*300}  ", f"Combo: {f}  ", "Acc: 97%  ", "Vol: 80%  Lat: 0ms")
+
+        def old_frame(sched, f, now):
+            screen.blit(bg, (0, 0))
+            s = pygame.Surface((W, H), pygame.SRCALPHA); s.fill((0, 0, 0, 140))
+            screen.blit(s, (0, 0))
+            for i in range(4):
+                pygame.draw.rect(screen, (50, 50, 60), (LEFT_X + i*LANE_W, 0, LANE_W-4, H))
+            pygame.draw.line(screen, (250, 250, 250), (LEFT_X, HIT_Y), (LEFT_X + LANE_W*4, HIT_Y), 3)
+            for _, t, lane in sched.visible():
+                pygame.draw.rect(screen, (80, 190, 255), (LEFT_X + lane*LANE_W + 8, HIT_Y - (t - now)*SPEED, LANE_W-16, NOTE_H))
+            draw_fields(screen, font, (240, 240, 240), (20, 20), hud(f))
+            pygame.display.flip()
+
+        renderer = PlayfieldRenderer(screen, dimmed, LANE_W, LEFT_X, HIT_Y, NOTE_H)
+        def new_frame(sched, f, now):
+            renderer.begin_frame((hud(f),))
+            renderer.draw_notes(now, ((lane, HIT_Y - (t - now)*SPEED) for _, t, lane in sched.visible()))
+            renderer.draw_hud(font, (240, 240, 240), (20, 20))
+            renderer.present()
+
+        results = []
+        for frame in (old_frame, new_frame):
+            sched = NoteScheduler(Beatmap.from_notes(zip(times, lanes)), miss_ms=150, ahead_ms=int((HIT_Y + NOTE_H) / SPEED))
+            t0 = time.perf_counter()
+            for f in range(FRAMES):
+                now = 10_000 + f * 16
+                sched.update(now)
+                frame(sched, f, now)
+            results.append(((time.perf_counter() - t0) / FRAMES, pygame.image.tobytes(screen, "RGB")))
+        (t_old, img_old), (t_new, img_new) = results
+        same = "sim" if img_old == img_new else "nao"
+        print(f"{W}x{H}: antigo {t_old*1e3:6.2f} ms/frame   sujos {t_new*1e3:6.2f} ms/frame   ultimo frame identico: {same}")
+
+    # so o desenho das notas, chart denso: draw.rect por nota vs um blits do atlas
+    from game.skin import Skin
+    skin = Skin(LANE_W, NOTE_H, H)
+    note_src = [skin.sprite("note", lane) for lane in range(4)]
+    for count in (50, 200, 1000):
+        notes = [(i % 4, (i * 37) % (H - NOTE_H)) for i in range(count)]
+        t0 = time.perf_counter()
+        for _ in range(FRAMES):
+            for lane, y in notes:
+                pygame.draw.rect(screen, (80, 190, 255), (LEFT_X + lane*LANE_W + 8, y, LANE_W-16, NOTE_H))
+        t_rect = (time.perf_counter() - t0) / FRAMES
+        t0 = time.perf_counter()
+        for _ in range(FRAMES):
+            batch = []
+            for lane, y in notes:
+                src, (dx, dy) = note_src[lane]
+                batch.append((skin.atlas, (LEFT_X + lane*LANE_W + dx, y + dy), src))
+            screen.blits(batch, doreturn=False)
+        t_blits = (time.perf_counter() - t0) / FRAMES
+        print(f"{count:5d} notas: draw.rect {t_rect*1e3:6.3f} ms   atlas+blits {t_blits*1e3:6.3f} ms")
+
+@bench
+def bench_replay():
+    # replay headless: julgamento (e desenho no driver dummy) por notas/s,
+    # charts do jogo e sinteticos de 100k notas; cada um roda 2x e tem que bater
+    from game import chart_loader, library
+    from game.beatmap import Beatmap
+    from game.replay import autoplay_events, result_of, simulate
+    sys.path.insert(0, str(ROOT / "tools"))
+    from run_replay import render_frames
+
+    HW = {"perfect": 50, "good": 100, "bad": 150}
+    charts = []
+    for song in library.all_songs():  # com ou sem audio
+        for diff, path in song["charts"].items():
+            charts.append((f"{song['id'][:24]} [{diff}]", chart_loader.load_chart(path)))
+    for nps in (8.0, 20.0):
+        times, lanes = _synthetic_notes(100_000, nps=nps)
+        charts.append((f"sintetico 100k @{nps:g} nps", Beatmap.from_notes(zip(times, lanes))))
+
+    draw = render_frames()
+    frames = [0]
+    def frame(now, sched, judge):
+        frames[0] += 1
+        draw(now, sched, judge)
+
+    print(f"{'chart':>32} {'notas':>7} {'score':>9} {'julgar notas/s':>15} {'+render frames/s':>17}  deterministico")
+    for name, bm in charts:
+        events = autoplay_events(bm, jitter_ms=35.0)
+        t0 = time.perf_counter()
+        first = result_of(simulate(bm, events, HW))
+        t_judge = time.perf_counter() - t0
+        same = result_of(simulate(bm, events, HW)) == first
+        render = ""
+        if len(bm) <= 10_000:
+            frames[0] = 0
+            t0 = time.perf_counter()
+            same = same and result_of(simulate(bm, events, HW, frame=frame)) == first
+            render = f"{frames[0] / (time.perf_counter() - t0):,.0f}"
+        print(f"{name:>32} {len(bm):7d} {first['score']:9d} {len(bm) / t_judge:15,.0f} {render:>17}  "
+              f"{'sim' if same else 'NAO'}")
+
+def _synthetic_holds(count, nps=30.0, hold_ratio=0.5, lanes=4, seed=4):
+    # chart denso com holds de 100..600 ms, sem sobreposicao na mesma lane
+    rng = random.Random(seed)
+    step = 1000.0 / nps
+    free_at = [0] * lanes
+    notes = []
+    t = 0.0
+    while len(notes) < count:
+        t += step
+        ti = int(t)
+        open_lanes = [l for l in range(lanes) if free_at[l] < ti]
+        if not open_lanes:
+            continue
+        lane = rng.choice(open_lanes)
+        end = ti + rng.randint(100, 600) if rng.random() < hold_ratio else 0
+        free_at[lane] = (end or ti) + 60
+        notes.append((ti, lane, end))
+    return notes
+
+@bench
+def bench_holds():
+    # holds em alta densidade: corretude do julgamento (autoplay, soltar cedo,
+    # nao tocar) e custo por frame da lista de holds vivos vs varrer todos
+    from game.beatmap import Beatmap
+    from game.scheduler import NoteScheduler
+    from game.replay import autoplay_events, simulate
+
+    HW = {"perfect": 50, "good": 100, "bad": 150}
+    for count in (10_000, 100_000):
+        notes = _synthetic_holds(count)
+        bm = Beatmap.from_notes(notes)
+        holds = sum(1 for _, _, e in notes if e)
+
+        events = autoplay_events(bm)
+        t0 = time.perf_counter()
+        judge = simulate(bm, events, HW)
+        dt = time.perf_counter() - t0
+        assert judge.hits == judge.total == count + holds and judge.misses == 0, "autoplay nao fez tudo perfect"
+        assert judge.score == 300 * judge.total and judge.max_combo == judge.total
+
+        # solta 1 ms depois de acertar a cabeca: cauda quebra se faltar mais que a janela bad
+        early = sorted([[t, l, 1] for t, l, _ in notes] + [[t + 1, l, 0] for t, l, _ in notes])
+        broken = simulate(bm, early, HW)
+        expected = sum(1 for t, _, e in notes if e and e - (t + 1) > HW["bad"])
+        assert broken.misses == expected, f"soltar cedo: {broken.misses} misses, esperado {expected}"
+
+        idle = simulate(bm, [], HW)
+        assert idle.misses == count + holds and idle.hits == 0
+
+        # por frame: holds na tela (lista viva) vs varrer todos os holds do chart
+        bm.reset()
+        sched = NoteScheduler(bm, miss_ms=150, ahead_ms=1000)
+        all_holds = [(t, e, l) for t, l, e in notes if e]
+        frames, live_max, t_live, t_scan = 0, 0, 0.0, 0.0
+        for now in range(0, notes[-1][0], 16):
+            t0 = time.perf_counter()
+            sched.update(now)
+            n_live = sum(1 for _ in sched.visible_holds())
+            t_live += time.perf_counter() - t0
+            live_max = max(live_max, n_live)
+            if frames < 2000:
+                t0 = time.perf_counter()
+                sum(1 for t, e, _ in all_holds if t <= now + 1000 and e >= now - 150)
+                t_scan += time.perf_counter() - t0
+            frames += 1
+        print(f"{count:>8} notas ({holds} holds): autoplay {len(events)/dt:>10,.0f} eventos/s, "
+              f"holds vivos max {live_max}, {t_live/frames*1e6:6.2f} us/frame "
+              f"(varrer todos: {t_scan/min(frames, 2000)*1e6:8.1f} us/frame)  ok")
+
+def _write_pack(base, charts, notes_per_chart=500, seed=5):
+    # pack sintetico: 3 charts v2 por musica + wav curto (so cabecalho importa);
+    # 1 a cada 100 charts com defeito plantado (sobreposicao, fora do audio, tipo)
+    import json
+    import wave
+    rng = random.Random(seed)
+    planted = 0
+    for k in range(0, charts, 3):
+        song = base / f"song_{k // 3:05d}"
+        song.mkdir()
+        seconds = notes_per_chart // 4 + 5
+        with wave.open(str(song / "audio.wav"), "wb") as w:
+            w.setnchannels(1); w.setsampwidth(1); w.setframerate(8000)
+            w.writeframes(b"\x80" * 8000)
+        # duracao declarada no header = seconds (os dados nao sao lidos)
+        with open(song / "audio.wav", "r+b") as f:
+            f.seek(40)
+            f.write((8000 * seconds).to_bytes(4, "little"))
+        for j, diff in enumerate(("easy", "normal", "hard")[:charts - k]):
+            notes = [{"time": round(i * 0.25, 3), "lane": i % 4} for i in range(notes_per_chart)]
+            if (k + j) % 100 == 0:
+                kind = rng.randrange(3)
+                if kind == 0:
+                    notes[10]["end"] = notes[14]["time"] + 0.1  # hold sobre a proxima da lane
+                elif kind == 1:
+                    notes[-1]["time"] = seconds + 3             # depois do fim do audio
+                else:
+                    notes[20]["lane"] = "2"
+                planted += 1
+            data = {"song": {"title": song.name, "audio_file": "audio.wav", "offset_ms": 0},
+                    "difficulty": diff, "approach_rate": 5, "notes": notes}
+            (song / f"{song.name}_{diff}.json").write_text(json.dumps(data), encoding="utf-8")
+    return planted
+
+@bench
+def bench_validate():
+    # validador de charts num pack de 5000 charts: frio (tudo revalidado),
+    # quente (cache por mtime/tamanho) e com mtimes tocados (cache por hash)
+    import json
+    import os
+    import tempfile
+    sys.path.insert(0, str(ROOT / "tools"))
+    import validate_beatmaps as vb
+
+    CHARTS = 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp) / "pack"
+        base.mkdir()
+        t0 = time.perf_counter()
+        planted = _write_pack(base, CHARTS)
+        print(f"pack: {CHARTS} charts x 500 notas gerado em {time.perf_counter() - t0:.1f} s "
+              f"({planted} com defeito)")
+        jobs = os.cpu_count() or 1
+        cache = {"version": vb.VALIDATOR_VERSION, "charts": {}}
+
+        def timed(label, jobs):
+            t0 = time.perf_counter()
+            charts = vb.discover(base)
+            results, hits = vb.run(charts, cache, jobs)
+            dt = time.perf_counter() - t0
+            failed = sum(1 for r in results.values() if r["error_count"])
+            assert failed == planted, f"{label}: {failed} charts com erro, esperado {planted}"
+            print(f"{label:>28}: {dt:6.2f} s  {len(charts) / dt:8,.0f} charts/s  (cache {hits})")
+
+        timed(f"frio, {jobs} processo(s)", jobs)
+        timed("quente (mtime/tamanho)", jobs)
+        for path in base.glob("*/*.json"):
+            os.utime(path)
+        timed("mtime tocado (hash)", jobs)
+        cache["charts"].clear()
+        timed("frio, 1 processo", 1)
+
+        # charts malformados: cada um falha sozinho, com o codigo certo, mesmo
+        # no pool (uma excecao no worker derrubaria o pool.map do pack todo)
+        bad = Path(tmp) / "malformados"
+        notes = [{"time": 1.0, "lane": 0}]
+        cases = {
+            "song_lista": ({"song": [1], "notes": notes}, "song"),
+            "offset_lista": ({"song": {"offset_ms": [1]}, "notes": notes}, "song"),
+            "offset_texto": ({"song": {"offset_ms": "abc"}, "notes": notes}, "song"),
+            "preview_dict": ({"song": {"preview_ms": {"a": 1}}, "notes": notes}, "song"),
+            "tempo_nan": ({"notes": [{"time": float("nan"), "lane": 0}]}, "tipo"),
+            "fim_infinito": ({"notes": [{"time": 1.0, "lane": 0, "end": float("inf")}]}, "tipo"),
+            "tempo_enorme": ({"notes": [{"time": 1e12, "lane": 0}]}, "intervalo"),
+            "raiz_numero": (7, "formato"),
+            "ok": ({"song": {"offset_ms": 10, "preview_ms": 500}, "notes": notes}, None),
+        }
+        for name, (data, _) in cases.items():
+            (bad / name).mkdir(parents=True)
+            (bad / name / "easy.json").write_text(json.dumps(data), encoding="utf-8")
+        charts = vb.discover(bad)
+        results, _ = vb.run(charts, {"version": vb.VALIDATOR_VERSION, "charts": {}}, 2)
+        for name, _, path, _, _ in charts:
+            expect = cases[name][1]
+            got = sorted(c for c in results[path]["counts"] if not c.startswith("aviso_"))
+            assert got == ([expect] if expect else []), f"{name}: {got}, esperado {expect}"
+        # bug do validador num chart: erro "interno" so dele
+        real = vb.validate_chart
+        vb.validate_chart = lambda *a: 1 / 0
+        try:
+            _, _, res = vb._work((charts[0][2], charts[0][3], None))
+        finally:
+            vb.validate_chart = real
+        assert sorted(res["counts"]) == ["interno"], res
+        print(f"{'malformados':>28}: {len(charts)} charts, cada um com o proprio erro  ok")
+
+@bench
+def bench_difficulty():
+    # analisador de dificuldade em charts de 100k notas: numpy vs python puro
+    # (mesmo resultado) e o custo de um acerto no cache (so o hash das notas)
+    from game import difficulty
+    from game.beatmap import Beatmap
+
+    N = 100_000
+    times, lanes = _synthetic_notes(N, nps=20.0)
+    rng = random.Random(6)
+    chords = [(i // 3 * 100, (i % 3 + i // 3) % 4) for i in range(N)]  # acordes de 3
+    charts = {
+        "stream 20 notas/s": Beatmap.from_notes(zip(times, lanes)),
+        "holds 30 notas/s": Beatmap.from_notes(_synthetic_holds(N)),
+        "acordes 30 notas/s": Beatmap.from_notes(chords),
+        "jacks aleatorios": Beatmap.from_notes((i * 40, rng.choice((0, 0, 1))) for i in range(N)),
+    }
+    backends = ["python"] + (["numpy"] if difficulty.np is not None else [])
+    print(f"{'chart':>20} {'estrelas':>8} " + " ".join(f"{b:>10}" for b in backends) + "  igual   cache")
+    for name, bm in charts.items():
+        res, cols = {}, []
+        for b in backends:
+            t0 = time.perf_counter()
+            res[b] = difficulty.analyze(bm, b)
+            cols.append(f"{(time.perf_counter() - t0) * 1000:8.1f}ms")
+        same = all(r == res["python"] for r in res.values())
+        assert same, f"{name}: backends divergem"
+        difficulty.rating_for(bm)
+        t_hit = _timeit(lambda: difficulty.rating_for(bm), 20)
+        print(f"{name:>20} {res['python']['stars']:8.2f} " + " ".join(cols)
+              + f"  {'sim' if same else 'NAO':>5} {t_hit * 1000:5.2f}ms")
+    if difficulty.np is None:
+        print("(numpy nao instalado: so o backend python)")
+
+@bench
+def bench_preview():
+    # preview do menu: o caminho antigo (mixer.music.load + play(start=30) na
+    # thread da UI) contra o trecho pre-extraido (extracao 1x em background,
+    # depois so Sound.play com crossfade na UI). audio: o mp3 de exemplo do
+    # pygame repetido ate ~3 min (frames mp3 concatenam); sem ele, um wav
+    import io
+    import os
+    import tempfile
+    import wave
+    from array import array
+    pygame, _ = _headless_pygame()
+    pygame.mixer.init()
+    from game import preview_clips
+
+    sample = Path(pygame.__file__).parent / "examples" / "data" / "house_lo.mp3"
+    saved_dir = preview_clips.PREVIEWS_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        preview_clips.PREVIEWS_DIR = str(Path(tmp) / "previews")  # nao suja dados/
+        if sample.exists():
+            path = str(Path(tmp) / "song.mp3")
+            Path(path).write_bytes(sample.read_bytes() * 28)
+        else:
+            path = str(Path(tmp) / "song.wav")
+            rng = random.Random(7)
+            with wave.open(path, "wb") as w:  # 3 min estereo 44.1 kHz
+                w.setnchannels(2)
+                w.setsampwidth(2)
+                w.setframerate(44100)
+                w.writeframes(array("h", (rng.randint(-8000, 8000) for _ in range(44100 * 2))).tobytes() * 180)
+        data = Path(path).read_bytes()
+        ext = os.path.splitext(path)[1]
+
+        def old():
+            pygame.mixer.music.load(io.BytesIO(data), ext)
+            pygame.mixer.music.play(start=30.0)
+        t0 = time.perf_counter()
+        old()
+        t_old_first = time.perf_counter() - t0
+        t_old = _timeit(old, 10)
+        pygame.mixer.music.stop()
+
+        t0 = time.perf_counter()
+        preview_clips.extract(path)
+        t_extract = time.perf_counter() - t0
+        t_load = _timeit(lambda: preview_clips.load(path), 10)
+        clips = [preview_clips.load(path) for _ in range(2)]
+        state = {"ch": None, "i": 0}
+
+        def new():
+            old_ch = state["ch"]
+            state["i"] ^= 1
+            state["ch"] = clips[state["i"]].play(loops=-1, fade_ms=300)
+            if old_ch is not None:
+                old_ch.fadeout(300)
+        t_new = _timeit(new, 10)
+        pygame.mixer.stop()
+        size = os.path.getsize(preview_clips.clip_path(path))
+    preview_clips.PREVIEWS_DIR = saved_dir
+    print(f"audio: {Path(path).name}, {len(data) / 1e6:.1f} MB")
+    print(f"antigo, thread da UI (load + seek 30 s): {t_old_first * 1000:8.2f} ms na 1a troca, {t_old * 1000:.2f} ms depois")
+    print(f"trecho: extracao 1x (background)        : {t_extract * 1000:8.2f} ms ({size / 1e6:.1f} MB em disco)")
+    print(f"        carga do cache (background)     : {t_load * 1000:8.2f} ms")
+    print(f"        thread da UI (play + crossfade) : {t_new * 1000:8.2f} ms por troca")
+
+def main():
+    names = sys.argv[1:] or list(BENCHES)
+    for name in names:
+        if name not in BENCHES:
+            print(f"benchmark desconhecido: {name} (disponiveis: {', '.join(BENCHES)})")
+            sys.exit(2)
+    for name in names:
+        print(f"== {name}")
+        BENCHES[name]()
+        print()
+
+if __name__ == "__main__":
+    main()
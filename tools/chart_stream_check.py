@@ -0,0 +1,124 @@
+# tools/chart_stream_check.py
+# testa o game.chart_streamer contra o emulador da placa (tools/device_emulator.py)
+# num pty, com um relogio de musica de verdade (tempo real):
+#  - todas as notas acendem, no tempo certo (erro led - musica)
+#  - o anel da placa nunca estoura (creditos) e nada vai alem da janela
+#  - reboot da placa no meio da musica: o host reenvia a partir dali
+#  - botoes continuam chegando na InputQueue durante o streaming
+# o chart padrao tem notas a cada 45 ms (acordes e holds), mais denso que o
+# delay(100) do sketch antigo aguentava.
+# sai com codigo 1 se alguma verificacao falhar. so linux/mac (pty).
+# uso: python tools/chart_stream_check.py [--ring 32] [--window 2000] [--chart x.json --seconds 20]
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+from device_emulator import DeviceEmulator  # noqa: E402
+from game import chart_loader  # noqa: E402
+from game.beatmap import Beatmap  # noqa: E402
+from game.chart_streamer import ChartStreamer  # noqa: E402
+from game.input import InputQueue  # noqa: E402
+from game.serial_input import SerialInput  # noqa: E402
+
+FRAME_S = 1 / 60
+LEAD_IN_MS = 500   # musica comeca em -500 ms, como antes do audio tocar
+TOLERANCE_MS = 5.0  # erro p95 aceito entre o led e a musica; o p99/max do
+                    # emulador (thread python) pega picos do escalonador
+
+def synthetic(seconds, step_ms=45, seed=2):
+    rng = random.Random(seed)
+    notes, t = [], 200
+    while t < seconds * 1000:
+        lane = rng.randrange(4)
+        r = rng.random()
+        if r < 0.1:
+            notes.append((t, lane, t + rng.randint(150, 600)))  # hold
+        else:
+            notes.append((t, lane))
+            if r < 0.25:
+                notes.append((t, (lane + 2) % 4))  # acorde
+        t += step_ms
+    return Beatmap.from_notes(notes)
+
+def _pct(vals, p):
+    vals = sorted(vals)
+    return vals[min(len(vals) - 1, int(len(vals) * p / 100))]
+
+def run(bm, ring, window, reboot_at=None):
+    t0 = time.perf_counter()
+    def song_ms():
+        return (time.perf_counter() - t0) * 1000 - LEAD_IN_MS
+    dev = DeviceEmulator(ring_size=ring, truth=song_ms).start()
+    queue = InputQueue()
+    link = SerialInput(dev.path, queue=queue).start()
+    streamer = ChartStreamer(link, bm, window_ms=window)
+    streamer.start()
+    end = max(max(bm.times), max(bm.ends)) + 200
+    pressed = rebooted = 0
+    while song_ms() < end:
+        now = song_ms()
+        streamer.update(now)
+        if reboot_at is not None and not rebooted and now >= reboot_at:
+            dev.reboot()
+            rebooted = 1
+        if now > 0 and pressed < int(now // 250):
+            dev.press(pressed % 4)  # jogador apertando durante o streaming
+            pressed += 1
+        time.sleep(FRAME_S)
+    streamer.stop()
+    time.sleep(0.05)
+    link.stop()
+    dev.stop()
+    return dev, streamer, link, queue, pressed
+
+def check(name, bm, ring, window, reboot_at=None):
+    # depois do reboot o host so reenvia no frame seguinte: tolera um frame
+    tolerance = TOLERANCE_MS + (FRAME_S * 1000 if reboot_at is not None else 0)
+    dev, streamer, link, queue, pressed = run(bm, ring, window, reboot_at)
+    want = {(t, l) for t, l, _ in bm}
+    got = {(t, led) for led, t, _ in dev.lit}
+    missing = want - got
+    # erro so na primeira vez que cada nota acende (depois de um reboot, holds
+    # em andamento sao reenviados e religam na hora, de proposito)
+    first = {}
+    for led, t, e in dev.lit:
+        first.setdefault((t, led), abs(e))
+    errs = list(first.values())
+    inputs = len(queue.drain())
+    duration_s = (max(bm.times) + LEAD_IN_MS) / 1000
+    ok = (not missing and dev.overflow == 0 and dev.bad_packets == 0 and dev.max_fill <= ring
+          and dev.max_lead_ms <= window + 50 and _pct(errs, 95) <= tolerance and inputs == pressed
+          and streamer.error is None)
+    print(f"{name}: {len(want)} notas, acesas {len(got)} (faltando {len(missing)}, repetidas "
+          f"{len(dev.lit) - len(got)}), anel max {dev.max_fill}/{ring}, estouros {dev.overflow}, "
+          f"antecedencia max {dev.max_lead_ms:.0f} ms")
+    print(f"  erro led-musica: p50 {_pct(errs, 50):.2f} ms  p95 {_pct(errs, 95):.2f} ms  p99 {_pct(errs, 99):.2f} ms  max {max(errs):.2f} ms; "
+          f"{streamer.packets} pacotes, {dev.rx_bytes / duration_s:,.0f} B/s (115200 baud = 11,520 B/s); "
+          f"resets {streamer.resets}; botoes {inputs}/{pressed} -> {'ok' if ok else 'FALHOU'}")
+    return ok
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ring", type=int, default=32)
+    ap.add_argument("--window", type=int, default=2000)
+    ap.add_argument("--seconds", type=float, default=6.0)
+    ap.add_argument("--chart", help="chart .json (usa os primeiros --seconds)")
+    args = ap.parse_args()
+
+    if args.chart:
+        full = chart_loader.load_chart(args.chart)
+        bm = Beatmap.from_notes(n for n in full if n[0] < args.seconds * 1000)
+    else:
+        bm = synthetic(args.seconds)
+    ok = check("streaming", bm, args.ring, args.window)
+    ok &= check("anel de 4", bm, 4, args.window)
+    ok &= check("reboot no meio", bm, args.ring, args.window, reboot_at=args.seconds * 500)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 # tools/check_paths.py
-import os
+# uso: python tools/check_paths.py [--force]  (--force reescaneia todas as pastas)
+import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from game import library  # noqa: E402
+
 SONGS_DIR = ROOT / "musicas"
 
 def main():
@@ -11,26 +15,11 @@ def main():
         print("pasta 'musicas' nao encontrada")
         return
 
-    for name in sorted(os.listdir(SONGS_DIR)):
-        p = SONGS_DIR / name
-        if not p.is_dir():
-            continue
-
-        # audio
-        audio = None
-        for cand in ("audio.mp3", "musica.mp3"):
-            if (p / cand).exists():
-                audio = cand
-                break
-
-        # diffs
-        diffs = [d for d in ("easy", "normal", "hard") if (p / f"{d}.json").exists()]
-
-        # assets visuais
-        cover = any((p / c).exists() for c in ("capa.png", "capa.jpg", "cover.png", "cover.jpg"))
-        bg = any((p / b).exists() for b in ("background.png", "background.jpg"))
+    res = library.refresh(force="--force" in sys.argv[1:])
+    print(f"reescaneadas: {len(res['scanned'])}, removidas do indice: {len(res['removed'])}")
 
-        print(f"- {name}: audio={'ok' if audio else 'faltando'}, diffs={diffs or 'nenhuma'}, cover={'ok' if cover else 'faltando'}, bg={'ok' if bg else 'faltando'}")
+    for song in library.all_songs(refresh_first=False):
+        print(f"- {song['id']}: audio={'ok' if song['audio'] else 'faltando'}, diffs={song['diffs'] or 'nenhuma'}, cover={'ok' if song['cover'] else 'faltando'}, bg={'ok' if song['bg'] else 'faltando'}")
 
 if __name__ == "__main__":
     main()
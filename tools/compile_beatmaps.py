@@ -0,0 +1,38 @@
+# tools/compile_beatmaps.py
+# gera o cache binario (.bmc) de todos os charts em /musicas
+# uso: python tools/compile_beatmaps.py [--force]
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from game import beatmap_cache, chart_loader, library  # noqa: E402
+
+MUSIC_DIR = ROOT / "musicas"
+
+def main():
+    force = "--force" in sys.argv[1:]
+    if not MUSIC_DIR.exists():
+        print("pasta 'musicas' nao encontrada")
+        sys.exit(2)
+
+    compiled = skipped = failed = 0
+    charts = [c for song in library.all_songs() for c in song["charts"].values()]
+    for chart in map(Path, charts):
+        if not force and beatmap_cache.read_cache(str(chart)) is not None:
+            skipped += 1
+            continue
+        try:
+            bm = beatmap_cache.compile_chart(str(chart), chart_loader.parse_chart)
+        except Exception as e:
+            print(f"[erro] {chart.relative_to(MUSIC_DIR)}: {e}")
+            failed += 1
+            continue
+        print(f"[ok] {chart.relative_to(MUSIC_DIR)} ({len(bm)} notas)")
+        compiled += 1
+
+    print(f"\ncompilados: {compiled}, em dia: {skipped}, falhas: {failed}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
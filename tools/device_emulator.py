@@ -0,0 +1,186 @@
+# tools/device_emulator.py
+# emulador do sketch arduino (arduino/osu_mania_input_handler) num pty, para
+# testar o streaming de chart e a entrada serial sem placa.
+# mesmo protocolo e mesma logica do sketch: parser de pacotes 0xAA, anel de
+# RING_SIZE notas, leds por millis() sem bloquear, creditos devolvidos a cada
+# nota tirada do anel, ACK_RESET | geracao no boot (0) e no reset.
+# sozinho, sobe o dispositivo e mostra os leds; aponte "port" do
+# config/controller.json para o caminho impresso.
+# uso: python tools/device_emulator.py
+import os
+import pty
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from game.chart_streamer import (ACK_RESET, GEN_MASK, NOTE, PKT_NOTES, PKT_RESET, PKT_SYNC,  # noqa: E402
+                                 SYNC_BYTE)
+from game.serial_input import EV_CONTROL, EV_PRESS, EV_RELEASE  # noqa: E402
+
+RING_SIZE = 32  # igual ao sketch
+TAP_MS = 80     # led aceso numa nota simples
+LEDS = 4
+
+class DeviceEmulator:
+    def __init__(self, ring_size: int = RING_SIZE, truth=None, on_led=None):
+        # truth(): posicao real da musica (ms), so para medir o erro dos leds
+        # on_led(led, on, song_ms): chamado a cada mudanca de led
+        self.master, self.slave = pty.openpty()
+        self.path = os.ttyname(self.slave)
+        self.ring_size = ring_size
+        self.truth = truth
+        self.on_led = on_led
+        self.ring: deque = deque()
+        self.offset = None  # millis() - posicao da musica
+        self.led_off = [None] * LEDS
+        self.lit = []       # (led, tempo da nota, erro ms ou None)
+        self.packets = {PKT_RESET: 0, PKT_SYNC: 0, PKT_NOTES: 0}
+        self.bad_packets = 0
+        self.overflow = 0
+        self.max_fill = 0
+        self.max_lead_ms = 0.0  # maior antecedencia de uma nota ao chegar
+        self.rx_bytes = 0
+        self._t0 = time.perf_counter_ns()
+        self._buf = bytearray()
+        self._reboot = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def millis(self) -> float:
+        return (time.perf_counter_ns() - self._t0) / 1e6
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="device-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+        os.close(self.master)
+        os.close(self.slave)
+
+    def press(self, led: int):
+        os.write(self.master, bytes((EV_PRESS | led,)))
+
+    def release(self, led: int):
+        os.write(self.master, bytes((EV_RELEASE | led,)))
+
+    def reboot(self):
+        # como apertar o reset da placa no meio da musica
+        self._reboot = True
+
+    def _boot(self, gen: int = 0):
+        self.ring.clear()
+        for led in range(LEDS):
+            if self.led_off[led] is not None:
+                self.led_off[led] = None
+                self._led(led, False, self.millis() - self.offset)
+        self.offset = None
+        self._send(bytes((ACK_RESET | (gen & GEN_MASK), EV_CONTROL | self.ring_size)))
+
+    def _send(self, data: bytes):
+        os.write(self.master, data)
+
+    def _run(self):
+        self._send(b"osu mania controller\r\n")
+        self._boot()
+        while not self._stop.is_set():
+            if self._reboot:
+                self._reboot = False
+                self._boot()
+            r, _, _ = select.select([self.master], [], [], 0.0005)
+            if r:
+                data = os.read(self.master, 4096)
+                self.rx_bytes += len(data)
+                self._buf += data
+                self._parse()
+            self._tick()
+
+    def _parse(self):
+        buf = self._buf
+        while buf:
+            if buf[0] != SYNC_BYTE:
+                del buf[0]
+                continue
+            if len(buf) < 3 or len(buf) < 4 + buf[2]:
+                return
+            kind, size = buf[1], buf[2]
+            payload = bytes(buf[3:3 + size])
+            chk = kind ^ size
+            for b in payload:
+                chk ^= b
+            if chk != buf[3 + size]:
+                self.bad_packets += 1
+                del buf[0]  # procura o proximo 0xAA
+                continue
+            del buf[:4 + size]
+            self._packet(kind, payload)
+
+    def _packet(self, kind: int, payload: bytes):
+        self.packets[kind] = self.packets.get(kind, 0) + 1
+        if kind == PKT_RESET:
+            self._boot(payload[0] if payload else 0)
+        elif kind == PKT_SYNC:
+            (song_ms,) = struct.unpack("<i", payload)
+            self.offset = self.millis() - song_ms
+        elif kind == PKT_NOTES:
+            now = self.millis() - self.offset if self.offset is not None else None
+            for t, led, dur in NOTE.iter_unpack(payload):
+                if len(self.ring) >= self.ring_size:
+                    self.overflow += 1  # host ignorou os creditos
+                    self._send(bytes((EV_CONTROL | 1,)))
+                    continue
+                self.ring.append((t, led, t + (dur or TAP_MS)))
+                if now is not None:
+                    self.max_lead_ms = max(self.max_lead_ms, t - now)
+            self.max_fill = max(self.max_fill, len(self.ring))
+
+    def _led(self, led: int, on: bool, song_ms):
+        if self.on_led is not None:
+            self.on_led(led, on, song_ms)
+
+    def _tick(self):
+        if self.offset is None:
+            return
+        now = self.millis() - self.offset
+        freed = 0
+        ring = self.ring
+        while ring and ring[0][0] <= now:
+            t, led, off = ring.popleft()
+            err = self.truth() - t if self.truth is not None else None
+            self.lit.append((led, t, err))
+            was_off = self.led_off[led] is None
+            self.led_off[led] = off if was_off else max(off, self.led_off[led])
+            if was_off:
+                self._led(led, True, now)
+            freed += 1
+        if freed:
+            self._send(bytes((EV_CONTROL | freed,)))
+        for led in range(LEDS):
+            if self.led_off[led] is not None and now >= self.led_off[led]:
+                self.led_off[led] = None
+                self._led(led, False, now)
+
+def main():
+    def show(led, on, song_ms):
+        lamps = "".join("#" if dev.led_off[i] is not None else "." for i in range(LEDS))
+        print(f"{song_ms:9.0f} ms  {lamps}")
+    dev = DeviceEmulator(on_led=show).start()
+    print(f"dispositivo em {dev.path} (ctrl+c sai)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    dev.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# tools/import_scores.py
+# importa os leaderboards em json (musicas/*/leaderboard/*.json) para o
+# historico em SQLite. o jogo ja faz isso sozinho na criacao do banco; use
+# --force para importar de novo (ex: arquivos copiados de outra maquina);
+# partidas que ja estao no banco sao puladas.
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from game import score_history  # noqa: E402
+
+def main():
+    conn = score_history.connect()
+    if score_history._get_meta(conn, "json_imported") and "--force" not in sys.argv[1:]:
+        print("leaderboards json ja importados (use --force para importar de novo)")
+        return
+    n = score_history.import_json_leaderboards(conn)
+    print(f"importadas {n} partidas novas para {score_history.DB_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# tools/input_replay.py
+# replay de entrada sintetica para medir o erro de carimbo de tempo.
+# uma thread posta KEYDOWNs no pygame nos instantes de um "jogador" sintetico
+# (nota + desvio gaussiano); o loop de teste roda como a gameplay, com um
+# render falso de RENDER_MS por frame a 60 fps, em dois modos:
+#   frame  - antigo: eventos lidos uma vez por frame (clock.tick(60)) e
+#            carimbados na hora da leitura
+#   poller - game.input.InputPoller: fila bombeada a ~1 kHz entre frames
+# mostra o erro (carimbo - instante real do evento) e quantos julgamentos
+# mudaram em relacao ao julgamento com o tempo exato.
+# uso: python tools/input_replay.py [--count 200] [--render-ms 6]
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame  # noqa: E402
+from game.beatmap import Beatmap  # noqa: E402
+from game.input import InputPoller  # noqa: E402
+from game.judge import Judge  # noqa: E402
+from game.scheduler import NoteScheduler  # noqa: E402
+
+KEYS = [pygame.K_d, pygame.K_f, pygame.K_j, pygame.K_k]
+HW = {"perfect": 50, "good": 100, "bad": 150}
+FRAME_NS = 1_000_000_000 // 60
+
+def synthetic_stream(count, seed=7, sigma_ms=18.0):
+    # (tempo da nota, lane, tempo do press) em ms a partir do inicio
+    rng = random.Random(seed)
+    t, out = 500, []
+    for _ in range(count):
+        t += rng.randint(60, 220)
+        lane = rng.randrange(4)
+        out.append((t, lane, t + rng.gauss(0.0, sigma_ms)))
+    return out
+
+def _poster(stream, start_ns, posted):
+    # posta cada press no instante programado; guarda quando postou de verdade
+    for _, lane, press in sorted(stream, key=lambda s: s[2]):
+        target = start_ns + int(press * 1e6)
+        while True:
+            left = target - time.perf_counter_ns()
+            if left <= 0:
+                break
+            time.sleep(min(left, 500_000) / 1e9 if left > 200_000 else 0)
+        posted.append((time.perf_counter_ns(), lane))
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=KEYS[lane]))
+
+def _run(mode, stream, render_ms):
+    lane_of_key = {k: i for i, k in enumerate(KEYS)}
+    pygame.event.clear()
+    posted, stamped = [], []
+    end_ms = max(s[2] for s in stream) + 300
+    start_ns = time.perf_counter_ns() + 200_000_000
+    th = threading.Thread(target=_poster, args=(stream, start_ns, posted), daemon=True)
+    th.start()
+
+    clock = pygame.time.Clock()
+    poller = InputPoller(lane_of_key)
+    next_frame = time.perf_counter_ns()
+    while (time.perf_counter_ns() - start_ns) / 1e6 < end_ms:
+        if mode == "frame":
+            for ev in pygame.event.get():
+                if ev.type == pygame.KEYDOWN and ev.key in lane_of_key:
+                    stamped.append((time.perf_counter_ns(), lane_of_key[ev.key]))
+            time.sleep(render_ms / 1e3)
+            clock.tick(60)
+        else:
+            poller.pump()
+            time.sleep(render_ms / 1e3)
+            next_frame = max(next_frame + FRAME_NS, time.perf_counter_ns() - FRAME_NS)
+            poller.wait_until(next_frame)
+            stamped.extend((t, lane) for t, lane, _ in poller.queue.drain())
+    th.join()
+    return start_ns, posted, stamped
+
+def _judge(stream, start_ns, presses):
+    beatmap = Beatmap.from_notes((t, lane) for t, lane, _ in stream)
+    sched = NoteScheduler(beatmap, miss_ms=HW["bad"], ahead_ms=1000)
+    judge = Judge(sched, HW)
+    grades = []
+    for t_ns, lane in presses:
+        now = (t_ns - start_ns) // 1_000_000
+        judge.miss(sched.update(now))
+        grades.append(judge.press(lane, now))
+    return grades
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--count", type=int, default=200)
+    ap.add_argument("--render-ms", type=float, default=6.0, help="custo falso de render por frame")
+    args = ap.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    stream = synthetic_stream(args.count)
+    print(f"{args.count} presses, render falso {args.render_ms} ms/frame, 60 fps")
+    print(f"{'modo':>7} {'media':>7} {'p50':>7} {'p95':>7} {'max':>7}  julgamentos diferentes")
+    for mode in ("frame", "poller"):
+        start_ns, posted, stamped = _run(mode, stream, args.render_ms)
+        if len(stamped) != len(posted):
+            print(f"{mode:>7}: {len(posted)} postados, {len(stamped)} recebidos")
+            continue
+        err = [(s - p) / 1e6 for (s, _), (p, _) in zip(stamped, posted)]
+        exact = _judge(stream, start_ns, posted)
+        got = _judge(stream, start_ns, stamped)
+        diff = sum(a != b for a, b in zip(exact, got))
+        print(f"{mode:>7} {sum(err)/len(err):6.2f}ms {_pct(err, 50):6.2f}ms {_pct(err, 95):6.2f}ms "
+              f"{max(err):6.2f}ms  {diff}/{len(err)}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
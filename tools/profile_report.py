@@ -0,0 +1,66 @@
+# tools/profile_report.py
+# mostra o agregado de um profile (OSUMANIA_PROFILE=1) ou compara dois builds.
+# uso: python tools/profile_report.py dados/profile/gameplay_X.json
+#      python tools/profile_report.py antes.json depois.json
+#      python tools/profile_report.py --latest gameplay
+import argparse
+import glob
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from game.profiler import PROFILE_DIR  # noqa: E402
+
+COLS = ("mean_us", "p50_us", "p95_us", "p99_us", "max_us", "share")
+
+def _load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _fmt(col, v):
+    return f"{v*100:7.1f}%" if col == "share" else f"{v:8.1f}"
+
+def show(data):
+    print(f"{data['name']}  {data['date']}  {data['frames']} frames")
+    print(f"{'fase':>12} " + " ".join(f"{c:>8}" for c in COLS))
+    for name, st in sorted(data["phases"].items(), key=lambda kv: -kv[1]["total_ms"]):
+        print(f"{name:>12} " + " ".join(_fmt(c, st[c]) for c in COLS))
+
+def compare(a, b):
+    print(f"A: {a['name']} {a['date']} ({a['frames']} frames)")
+    print(f"B: {b['name']} {b['date']} ({b['frames']} frames)")
+    print(f"{'fase':>12} {'A media':>9} {'B media':>9} {'delta':>8} {'A p99':>9} {'B p99':>9} {'delta':>8}")
+    for name in sorted(set(a["phases"]) | set(b["phases"])):
+        pa, pb = a["phases"].get(name), b["phases"].get(name)
+        if not pa or not pb:
+            print(f"{name:>12}  so em {'A' if pa else 'B'}")
+            continue
+        def delta(k):
+            return f"{(pb[k] - pa[k]) / pa[k] * 100:+7.1f}%" if pa[k] else "      -"
+        print(f"{name:>12} {pa['mean_us']:9.1f} {pb['mean_us']:9.1f} {delta('mean_us')} "
+              f"{pa['p99_us']:9.1f} {pb['p99_us']:9.1f} {delta('p99_us')}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="*")
+    ap.add_argument("--latest", metavar="NOME", help="usa os 2 profiles mais recentes de NOME (gameplay, menu)")
+    args = ap.parse_args()
+
+    paths = list(args.paths)
+    if args.latest:
+        found = [p for p in glob.glob(os.path.join(PROFILE_DIR, f"{args.latest}_*.json"))
+                 if not p.endswith(".trace.json")]
+        paths += sorted(found, key=os.path.getmtime)[-2:]
+    if not 1 <= len(paths) <= 2:
+        ap.error("passe um profile (mostra) ou dois (compara)")
+    data = [_load(p) for p in paths]
+    if len(data) == 1:
+        show(data[0])
+    else:
+        compare(*data)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# tools/run_replay.py
+# reexecuta replays sem jogador: mesmo Judge/NoteScheduler da gameplay e, com
+# --render, o PlayfieldRenderer desenhando cada frame no driver dummy do SDL.
+# confere se score/accuracy/combo batem com o gravado e mostra a vazao.
+# uso: python tools/run_replay.py dados/replays/x.json [...] [--render]
+#      python tools/run_replay.py --latest
+import argparse
+import glob
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+from game import chart_loader, library  # noqa: E402
+from game.replay import REPLAYS_DIR, load_replay, run_replay  # noqa: E402
+
+def render_frames(size=(1000, 720)):
+    # frame(now, sched, judge) que desenha como o run_game (sem fundo)
+    import pygame
+    from game.render import PlayfieldRenderer
+    from game.skin import Skin
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    W, H = size
+    LANE_W, NOTE_H, SPEED = 100, 24, 0.6
+    LEFT_X, HIT_Y = W//2 - (LANE_W*4)//2, H - 120
+    renderer = PlayfieldRenderer(screen, None, LANE_W, LEFT_X, HIT_Y, NOTE_H, skin=Skin(LANE_W, NOTE_H, H))
+    font = pygame.font.SysFont("arial", 24)
+
+    def frame(now, sched, judge):
+        renderer.begin_frame(((f"Score: {judge.score}  ", f"Combo: {judge.combo}  ",
+                               f"Acc: {judge.accuracy()*100:.0f}%  "),))
+        renderer.draw_chart(now, sched, judge, SPEED)
+        renderer.draw_hud(font, (240, 240, 240), (20, 20))
+        renderer.present()
+    return frame
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="*")
+    ap.add_argument("--latest", action="store_true", help="usa o replay mais recente")
+    ap.add_argument("--render", action="store_true", help="desenha os frames no driver dummy")
+    args = ap.parse_args()
+
+    paths = list(args.paths)
+    if args.latest:
+        found = sorted(glob.glob(os.path.join(REPLAYS_DIR, "*.json")), key=os.path.getmtime)
+        paths += found[-1:]
+    if not paths:
+        ap.error("nenhum replay (passe caminhos ou --latest)")
+
+    frame = render_frames() if args.render else None
+    failed = 0
+    for path in paths:
+        rep = load_replay(path)
+        song = library.get_song(rep["song"])
+        if not song or rep["difficulty"] not in song["charts"]:
+            print(f"{path}: chart {rep['song']} [{rep['difficulty']}] nao encontrado")
+            failed += 1
+            continue
+        bm = chart_loader.load_chart(song["charts"][rep["difficulty"]])
+        res = run_replay(rep, bm, frame=frame)
+        status = {True: "ok", False: "DIFERENTE", None: "sem resultado gravado"}[res["matches"]]
+        print(f"{os.path.basename(path)}: score {res['score']} acc {res['accuracy']*100:.2f}% "
+              f"combo {res['max_combo']} -> {status}  ({res['notes']} notas, "
+              f"{res['notes_per_s']:,.0f} notas/s)")
+        failed += res["matches"] is False
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
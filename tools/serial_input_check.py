@@ -0,0 +1,118 @@
+# tools/serial_input_check.py
+# testa o game.serial_input.SerialInput contra uma placa virtual (pty): o
+# lado mestre do pty faz o papel do arduino e escreve o protocolo binario.
+#  - protocolo: press/release, mapa de lanes, botao sem lane e texto de debug
+#    misturado nos eventos
+#  - latencia: escrita no pty -> carimbo da thread leitora (p50/p95/p99/max)
+#  - vazao: rajada de eventos, eventos/s decodificados
+# sai com codigo 1 se alguma verificacao falhar. so linux/mac (pty).
+# uso: python tools/serial_input_check.py [--backend auto|pyserial|termios] [--events 2000]
+import argparse
+import os
+import pty
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from game.input import InputQueue  # noqa: E402
+from game.serial_input import EV_PRESS, EV_RELEASE, SerialInput  # noqa: E402
+
+class VirtualDevice:
+    # par de pty: o jogo abre self.path como se fosse /dev/ttyACM0
+    def __init__(self):
+        self.master, self.slave = pty.openpty()
+        self.path = os.ttyname(self.slave)
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.master, view):]
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+def _wait(pred, timeout=5.0):
+    end = time.perf_counter() + timeout
+    while not pred() and time.perf_counter() < end:
+        time.sleep(0.001)
+    return pred()
+
+def _pct(sorted_vals, p):
+    return sorted_vals[min(len(sorted_vals) - 1, int(len(sorted_vals) * p / 100))]
+
+def protocol(backend):
+    dev = VirtualDevice()
+    queue = InputQueue()
+    ctl = SerialInput(dev.path, lane_map=[3, 2, None, 0], queue=queue, backend=backend).start()
+    dev.write(b"inicie a musica\r\n" + bytes([EV_PRESS | 0, EV_PRESS | 1, EV_RELEASE | 0])
+              + b"debug\n" + bytes([EV_PRESS | 2, EV_PRESS | 3, EV_PRESS | 7, 0xC1, EV_RELEASE | 3]))
+    _wait(lambda: ctl.bytes >= 31)
+    got = [(lane, down) for _, lane, down in queue.drain()]
+    ctl.stop()
+    dev.close()
+    want = [(3, True), (2, True), (3, False), (0, True), (0, False)]
+    ok = got == want and list(ctl.text) == ["inicie a musica", "debug"] and ctl.dropped == 2
+    print(f"protocolo: eventos {got}, texto {list(ctl.text)}, descartados {ctl.dropped} "
+          f"-> {'ok' if ok else 'FALHOU'}")
+    return ok
+
+def latency(backend, n, seed=1):
+    # um evento por vez, intervalos aleatorios de 0.2..2 ms (dedos + usb)
+    rng = random.Random(seed)
+    dev = VirtualDevice()
+    queue = InputQueue()
+    ctl = SerialInput(dev.path, queue=queue, backend=backend).start()
+    sent = []
+    for i in range(n):
+        lane = i % 4
+        sent.append(time.perf_counter_ns())
+        dev.write(bytes([(EV_PRESS if i % 2 == 0 else EV_RELEASE) | lane]))
+        time.sleep(rng.uniform(0.0002, 0.002))
+    _wait(lambda: ctl.events >= n)
+    got = queue.drain()
+    ctl.stop()
+    dev.close()
+    if len(got) != n:
+        print(f"latencia: recebeu {len(got)}/{n} eventos -> FALHOU")
+        return False
+    lat = sorted((t - s) / 1000 for (t, _, _), s in zip(got, sent))
+    print(f"latencia ({n} eventos, pty -> carimbo): p50 {_pct(lat, 50):.0f} us  p95 {_pct(lat, 95):.0f} us  "
+          f"p99 {_pct(lat, 99):.0f} us  max {lat[-1]:.0f} us -> ok")
+    return True
+
+def throughput(backend, n=200_000):
+    dev = VirtualDevice()
+    queue = InputQueue()
+    ctl = SerialInput(dev.path, queue=queue, backend=backend).start()
+    data = bytes((EV_PRESS if (i // 4) % 2 == 0 else EV_RELEASE) | (i % 4) for i in range(n))
+    t0 = time.perf_counter()
+    for i in range(0, n, 1024):
+        dev.write(data[i:i + 1024])
+    ok = _wait(lambda: ctl.events >= n, timeout=30)
+    elapsed = time.perf_counter() - t0
+    drained = len(queue.drain())
+    ctl.stop()
+    dev.close()
+    ok = ok and drained == n
+    # 115200 baud (8N1) carrega ~11520 bytes/s: a ponte precisa so disso
+    print(f"vazao: {drained}/{n} eventos em {elapsed*1000:.0f} ms = {n/elapsed:,.0f} eventos/s "
+          f"(115200 baud = 11,520/s) -> {'ok' if ok else 'FALHOU'}")
+    return ok
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", default="auto", choices=("auto", "pyserial", "termios"))
+    ap.add_argument("--events", type=int, default=2000)
+    args = ap.parse_args()
+    print(f"backend: {args.backend}")
+    ok = protocol(args.backend)
+    ok &= latency(args.backend, args.events)
+    ok &= throughput(args.backend)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# tools/song_clock_check.py
+# confere o game.song_clock.SongClock sem janela nem placa de som.
+#  - simulado: audio com latencia de inicio, drift e callbacks do mixer com
+#    jitter; verifica que o relogio converge e nunca anda para tras, inclusive
+#    nos timestamps de input a 1 kHz (convertidos depois do sample do frame
+#    seguinte, como na gameplay)
+#  - mixer: toca um wav de silencio no driver dummy do SDL e compara o relogio
+#    com get_pos (o driver dummy costuma andar alguns % fora do tempo real)
+# sai com codigo 1 se alguma verificacao falhar.
+# uso: python tools/song_clock_check.py [--seconds 6]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+from game.song_clock import SongClock  # noqa: E402
+
+FRAME_NS = 1_000_000_000 // 60
+POLL_NS = 1_000_000  # input lido a 1 kHz entre frames
+TOLERANCE_MS = 12.0  # erro maximo aceito depois de convergir
+
+def _check(name, clock, errors, backwards):
+    settled = errors[len(errors) // 3:]  # ignora o primeiro terco (convergencia)
+    worst = max(abs(e) for e in settled)
+    ok = worst <= TOLERANCE_MS and not backwards
+    print(f"{name}: {clock.stats()}")
+    print(f"  erro apos convergir: max {worst:.2f} ms, voltou no tempo: {backwards}x -> {'ok' if ok else 'FALHOU'}")
+    return ok
+
+def simulated(seconds, drift=0.004, start_latency_ms=120, buffer_ms=23.2, seed=3):
+    # audio real (em ms) no instante t: 0 ate a latencia, depois anda com drift.
+    # como no pygame, get_pos = posicao no ultimo callback do mixer (que atrasa
+    # ate 2 ms) + ticks inteiros desde entao
+    rng = random.Random(seed)
+    def true_ms(t_ms):
+        return max(0.0, (t_ms - start_latency_ms) * (1 + drift))
+    clock = SongClock()
+    clock.start(0)
+    errors, backwards, last = [], 0, None
+    t = 0
+    while t < seconds * 1e9:
+        prev = t
+        t += FRAME_NS + int(rng.gauss(0, 1e6))  # frames com jitter de ~1 ms
+        t_ms = t / 1e6
+        cb = (t_ms // buffer_ms) * buffer_ms + rng.uniform(0, 2)
+        cb = min(cb, t_ms)
+        pos = int(true_ms(cb) + (t_ms - cb)) if true_ms(cb) > 0 else 0
+        clock.sample(pos, t)
+        # inputs da espera (1 kHz) e o advance do frame, em ordem de tempo
+        for tp in list(range(prev + POLL_NS, t, POLL_NS)) + [t]:
+            now = clock.now_ms(tp)
+            if last is not None and now < last:
+                backwards += 1
+            last = now
+        now = clock.position(t)
+        true_now = true_ms(t_ms)
+        if true_now > 0:
+            errors.append(now - true_now)
+    return _check(f"simulado (latencia {start_latency_ms} ms, drift {drift*100:.1f}%)", clock, errors, backwards)
+
+def mixer(seconds):
+    import pygame
+    path = os.path.join(tempfile.mkdtemp(), "silence.wav")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2); w.setsampwidth(2); w.setframerate(44100)
+        w.writeframes(b"\0\0\0\0" * int(44100 * (seconds + 1)))
+    pygame.mixer.init()
+    pygame.mixer.music.load(path)
+    pygame.mixer.music.play()
+    clock = SongClock()
+    clock.start()
+    wall0 = time.perf_counter_ns()
+    errors, backwards, last = [], 0, None
+    while time.perf_counter_ns() - wall0 < seconds * 1e9:
+        time.sleep(FRAME_NS / 1e9)
+        pos = pygame.mixer.music.get_pos()
+        t = time.perf_counter_ns()
+        clock.sample(pos, t)
+        now = clock.position(t)
+        if last is not None and now < last:
+            backwards += 1
+        last = now
+        if pos > 0:
+            errors.append(now - pos)
+    wall = (time.perf_counter_ns() - wall0) / 1e6
+    pygame.mixer.music.stop()
+    pygame.mixer.quit()
+    os.remove(path)
+    print(f"  (mixer: get_pos {pos} ms em {wall:.0f} ms de parede)")
+    return _check("mixer dummy", clock, errors, backwards)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=6.0)
+    args = ap.parse_args()
+    ok = simulated(args.seconds * 5)
+    ok = simulated(args.seconds * 5, drift=-0.02, start_latency_ms=40, buffer_ms=46.4, seed=5) and ok
+    ok = mixer(args.seconds) and ok
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,110 +1,420 @@
 # tools/validate_beatmaps.py
+# valida os charts de musicas/ (ou de um pack inteiro com --root), em paralelo.
+#  - cada chart vai para um worker do ProcessPoolExecutor
+#  - resultado em cache por arquivo (dados/validation_cache.json): mtime e
+#    tamanho iguais -> nem abre; mudaram -> hash blake2b do conteudo; so
+#    revalida se o hash mudou (ou os audios da pasta mudaram)
+#  - checa o schema real (v1 lista, v2 {song, notes}), tipos e intervalos,
+#    ordem, notas sobrepostas na mesma lane (holds inclusive) e notas depois
+#    do fim do audio (duracao lida do cabecalho, game.audio_info)
+#  - as notas validas vao para um Beatmap (colunas do game.beatmap), como no jogo
+#  - chart que quebra o validador vira erro "interno" so dele; o resto do pack segue
+#  - saida em texto, --json e --junit (para o CI)
+# uso: python tools/validate_beatmaps.py [song_id ...] [--root pasta] [--jobs N]
+#      [--json saida.json] [--junit saida.xml] [--no-cache] [--quiet]
+import argparse
+import hashlib
 import json
+import math
+import os
 import sys
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from game import chart_loader  # noqa: E402
+from game.audio_info import audio_length_ms  # noqa: E402
+from game.beatmap import Beatmap  # noqa: E402
+from game.data_store import BASE_DIR, _atomic_write  # noqa: E402
+
 MUSIC_DIR = ROOT / "musicas"
-DIFFS = ("easy", "normal", "hard")
+CACHE_FILE = os.path.join(BASE_DIR, "validation_cache.json")
+VALIDATOR_VERSION = 3  # mudou uma regra -> invalida o cache
+MAX_DETAILS = 20  # mensagens guardadas por tipo de problema (o resto so conta)
+
+# chaves por formato: (tempo, unidade, lane, intervalo da lane, fim do hold)
+FORMAT_KEYS = {
+    1: ("tempo", "ms", "coluna", (1, 4), "fim"),
+    2: ("time", "s", "lane", (0, 3), "end"),
+}
+NUM = (int, float)
+NUM_TYPES = {int, float}  # type(x) in NUM_TYPES: rapido e recusa bool
+MAX_MS = 2**31 - 1  # tempos viram int32 no Beatmap e no .bmc
+# bloco "song" do v2: chave -> tipos aceitos
+SONG_KEYS = {"title": str, "artist": str, "bpm": NUM, "audio_file": str, "offset_ms": NUM, "preview_ms": NUM}
+
+class Report:
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+        self.counts = {}
+
+    def add(self, code, message, item=None, level="error"):
+        n = self.counts.get(code, 0)
+        self.counts[code] = n + 1
+        if n < MAX_DETAILS:
+            (self.errors if level == "error" else self.warnings).append(
+                {"code": code, "item": item, "message": message})
 
-def validate_entry(entry, idx, song_id, diff):
-    errors = []
-    if not isinstance(entry, dict):
-        errors.append(f"[{song_id}/{diff}] item #{idx}: nao eh objeto JSON")
-        return errors
+    def error_count(self):
+        return sum(n for c, n in self.counts.items() if not c.startswith("aviso_"))
 
-    if "tempo" not in entry:
-        errors.append(f"[{song_id}/{diff}] item #{idx}: falta chave 'tempo'")
-    if "coluna" not in entry:
-        errors.append(f"[{song_id}/{diff}] item #{idx}: falta chave 'coluna'")
+def _is_num(v):
+    return isinstance(v, NUM) and not isinstance(v, bool)
 
-    tempo = entry.get("tempo")
-    coluna = entry.get("coluna")
+def _check_song(data, rep):
+    # devolve False se o bloco song nao pode ir para chart_loader.read_meta
+    ok = True
+    song = data.get("song")
+    if song is not None and not isinstance(song, dict):
+        rep.add("song", f"'song' deve ser objeto. valor={song!r}")
+        ok = False
+    elif song is not None:
+        for key, types in SONG_KEYS.items():
+            v = song.get(key)
+            if v is not None and (not isinstance(v, types) or isinstance(v, bool)):
+                rep.add("song", f"song.{key} com tipo invalido: {v!r}")
+                ok = False
+            elif types is NUM and v is not None and not math.isfinite(v):
+                rep.add("song", f"song.{key} deve ser finito. valor={v!r}")
+                ok = False
+    ar = data.get("approach_rate")
+    if ar is not None and not _is_num(ar):
+        rep.add("song", f"approach_rate deve ser numero. valor={ar!r}")
+    return ok
 
-    if tempo is not None:
-        if not isinstance(tempo, (int, float)):
-            errors.append(f"[{song_id}/{diff}] item #{idx}: tempo deve ser numero (ms). valor={tempo!r}")
+def _check_notes(entries, fmt, meta, rep):
+    # devolve o Beatmap das notas validas e, em paralelo, o item de cada uma no json
+    t_key, unit, l_key, (lo, hi), e_key = FORMAT_KEYS[fmt]
+    scale = 1 if fmt == 1 else 1000
+    offset_ms = meta.get("offset_ms", 0)
+    # colunas em listas e convertidas no fim: o caminho rapido roda milhoes de
+    # vezes num pack e list.append eh mais barato que array.append
+    times, lanes, ends, items = [], [], [], []
+    t_append, l_append, e_append, i_append = times.append, lanes.append, ends.append, items.append
+    # limite na unidade do chart; NaN/Infinity (o json do python aceita) caem fora
+    t_max = (MAX_MS - abs(offset_ms) - 1) / scale
+    for i, entry in enumerate(entries):
+        if type(entry) is not dict:
+            rep.add("item", f"item #{i}: nao eh objeto JSON", i)
+            continue
+        tempo, coluna, fim = entry.get(t_key), entry.get(l_key), entry.get(e_key)
+        # caminho rapido: nota simples valida (a grande maioria)
+        if fim is None and type(tempo) in NUM_TYPES and type(coluna) is int and 0 <= tempo <= t_max and lo <= coluna <= hi:
+            t_append(round(tempo * scale) + offset_ms)
+            l_append(coluna - lo)
+            e_append(0)
+            i_append(i)
+            continue
+        ok = True
+        if tempo is None:
+            rep.add("chave", f"item #{i}: falta chave '{t_key}'", i)
+            ok = False
+        elif not _is_num(tempo):
+            rep.add("tipo", f"item #{i}: {t_key} deve ser numero ({unit}). valor={tempo!r}", i)
+            ok = False
+        elif not math.isfinite(tempo):
+            rep.add("tipo", f"item #{i}: {t_key} deve ser numero finito ({unit}). valor={tempo!r}", i)
+            ok = False
         elif tempo < 0:
-            errors.append(f"[{song_id}/{diff}] item #{idx}: tempo deve ser >= 0. valor={tempo}")
-    if coluna is not None:
-        if not isinstance(coluna, int):
-            errors.append(f"[{song_id}/{diff}] item #{idx}: coluna deve ser inteiro 1..4. valor={coluna!r}")
-        elif not (1 <= coluna <= 4):
-            errors.append(f"[{song_id}/{diff}] item #{idx}: coluna fora do intervalo 1..4. valor={coluna}")
+            rep.add("intervalo", f"item #{i}: {t_key} deve ser >= 0. valor={tempo}", i)
+            ok = False
+        elif tempo > t_max:
+            rep.add("intervalo", f"item #{i}: {t_key} grande demais (max {t_max:g} {unit}). valor={tempo}", i)
+            ok = False
+        if coluna is None:
+            rep.add("chave", f"item #{i}: falta chave '{l_key}'", i)
+            ok = False
+        elif not isinstance(coluna, int) or isinstance(coluna, bool):
+            rep.add("tipo", f"item #{i}: {l_key} deve ser inteiro {lo}..{hi}. valor={coluna!r}", i)
+            ok = False
+        elif not lo <= coluna <= hi:
+            rep.add("intervalo", f"item #{i}: {l_key} fora do intervalo {lo}..{hi}. valor={coluna}", i)
+            ok = False
+        # hold: fim opcional, depois do inicio
+        if fim is not None:
+            if not _is_num(fim):
+                rep.add("tipo", f"item #{i}: {e_key} deve ser numero ({unit}). valor={fim!r}", i)
+                ok = False
+            elif not math.isfinite(fim):
+                rep.add("tipo", f"item #{i}: {e_key} deve ser numero finito ({unit}). valor={fim!r}", i)
+                ok = False
+            elif fim > t_max:
+                rep.add("intervalo", f"item #{i}: {e_key} grande demais (max {t_max:g} {unit}). valor={fim}", i)
+                ok = False
+            elif _is_num(tempo) and fim <= tempo:
+                rep.add("hold", f"item #{i}: {e_key} deve ser maior que {t_key}. {e_key}={fim} {t_key}={tempo}", i)
+                ok = False
+        if ok:
+            t_append(round(tempo * scale) + offset_ms)
+            l_append(coluna - lo)
+            e_append(round(fim * scale) + offset_ms if fim is not None else 0)
+            i_append(i)
+    bm = Beatmap(meta)
+    bm.times, bm.lanes, bm.ends = array("i", times), array("b", lanes), array("i", ends)
+    bm.judged = bytearray(len(times))
+    return bm, items
 
-    return errors
+def _check_timeline(bm, items, rep):
+    last_t = -1
+    in_order = True
+    for t, i in zip(bm.times, items):
+        if t < last_t:
+            rep.add("ordem", f"item #{i}: tempo fora de ordem (anterior={last_t}, atual={t})", i)
+            in_order = False
+        else:
+            last_t = t
+    # mesma lane: a nota seguinte nao pode comecar antes do fim da anterior
+    # (nota simples ocupa so o proprio instante; duas no mesmo ms sobrepoem)
+    busy_until, busy_item = {}, {}
+    notes = zip(bm.times, bm.lanes, bm.ends, items)
+    for t, lane, end, i in (notes if in_order else sorted(notes)):
+        until = busy_until.get(lane)
+        if until is not None and t <= until:
+            rep.add("sobreposicao", f"item #{i}: sobrepoe o item #{busy_item[lane]} na lane {lane} "
+                                    f"(comeca em {t} ms, anterior ocupa ate {until} ms)", i)
+        stop = end if end > t else t
+        if until is None or stop >= until:
+            busy_until[lane], busy_item[lane] = stop, i
 
-def validate_file(path: Path, song_id: str, diff: str):
-    errors = []
-    if not path.exists():
-        return errors  # sem arquivo = sem validacao para este diff
+def _check_audio(folder, bm, items, rep):
+    audio = chart_loader.find_audio(folder, None, bm.meta)
+    if audio is None:
+        rep.add("aviso_audio", "audio nao encontrado (duracao nao conferida)", level="warning")
+        return
+    length = audio_length_ms(audio)
+    if length is None:
+        rep.add("aviso_audio", f"duracao de {os.path.basename(audio)} desconhecida", level="warning")
+        return
+    if not len(bm) or max(max(bm.times), max(bm.ends)) <= length:
+        return
+    for t, end, i in zip(bm.times, bm.ends, items):
+        if max(t, end) > length:
+            rep.add("audio", f"item #{i}: termina em {max(t, end)} ms, depois do fim do audio ({length} ms)", i)
 
+def _result(bm, rep):
+    return {"notes": len(bm), "errors": rep.errors, "warnings": rep.warnings,
+            "counts": rep.counts, "error_count": rep.error_count()}
+
+def validate_chart(path, folder, src=None):
+    # {notes, errors, warnings, counts} de um chart
+    rep = Report()
+    bm = Beatmap()
     try:
-        data = json.loads(path.read_text(encoding="utf-8"))
+        src = src if src is not None else Path(path).read_bytes()
+        data = json.loads(src)
     except json.JSONDecodeError as e:
-        errors.append(f"[{song_id}/{diff}] JSON invalido em {path.name}: linha {e.lineno}, col {e.colno} - {e.msg}")
-        return errors
+        rep.add("json", f"JSON invalido: linha {e.lineno}, col {e.colno} - {e.msg}")
+        data = None
+    except (OSError, UnicodeDecodeError) as e:
+        rep.add("json", f"erro lendo: {e}")
+        data = None
+    if data is not None:
+        try:
+            fmt = chart_loader.detect_format(data)
+        except ValueError:
+            rep.add("formato", "raiz do JSON deve ser lista [] ou objeto com 'notes'")
+        else:
+            # read_meta so recebe um bloco song com os tipos certos
+            song_ok = fmt == 1 or _check_song(data, rep)
+            meta = chart_loader.read_meta(data) if song_ok else {"format": fmt}
+            bm, items = _check_notes(data if fmt == 1 else data["notes"], fmt, meta, rep)
+            _check_timeline(bm, items, rep)
+            _check_audio(folder, bm, items, rep)
+    return _result(bm, rep)
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _failure(code, message):
+    rep = Report()
+    rep.add(code, message)
+    return _result(Beatmap(), rep)
+
+def _work(task):
+    # worker: hash do conteudo; se bate com o do cache, nao revalida
+    path, folder, cached_digest = task
+    try:
+        src = Path(path).read_bytes()
+    except OSError as e:
+        return path, None, _failure("json", f"erro lendo: {e}")
+    digest = _digest(src)
+    if digest == cached_digest:
+        return path, digest, None
+    try:
+        return path, digest, validate_chart(path, folder, src)
     except Exception as e:
-        errors.append(f"[{song_id}/{diff}] erro lendo {path.name}: {e}")
-        return errors
+        # excecao escapando do worker derrubaria o pool.map (e o pack inteiro)
+        return path, digest, _failure("interno", f"erro inesperado validando: {type(e).__name__}: {e}")
 
-    if not isinstance(data, list):
-        errors.append(f"[{song_id}/{diff}] raiz do JSON deve ser lista []")
-        return errors
+def discover(base, song_ids=None):
+    # [(song_id, diff, caminho, pasta, assinatura dos audios da pasta)]
+    charts = []
+    with os.scandir(base) as it:
+        dirs = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
+    for entry in dirs:
+        if song_ids and entry.name not in song_ids:
+            continue
+        with os.scandir(entry.path) as it:
+            files = [e for e in it if e.is_file()]
+        names = {e.name for e in files}
+        audio_sig = sorted([e.name, e.stat().st_size, e.stat().st_mtime_ns] for e in files
+                           if e.name.lower().endswith(chart_loader.AUDIO_EXTS))
+        for diff, path in chart_loader.find_charts(entry.path, names).items():
+            charts.append((entry.name, diff, path, entry.path, audio_sig))
+    return charts
 
-    # validar itens
-    last_t = -1
-    for i, entry in enumerate(data):
-        errs = validate_entry(entry, i, song_id, diff)
-        errors.extend(errs)
-        # checar ordem de tempo quando possivel
-        t = entry.get("tempo")
-        if isinstance(t, (int, float)):
-            if t < last_t:
-                errors.append(f"[{song_id}/{diff}] item #{i}: tempo fora de ordem (anterior={last_t}, atual={t})")
-            last_t = max(last_t, t if t is not None else last_t)
-
-    return errors
-
-def validate_song(song_dir: Path):
-    song_id = song_dir.name
-    errors = []
-    for diff in DIFFS:
-        path = song_dir / f"{diff}.json"
-        errors.extend(validate_file(path, song_id, diff))
-    return errors
+def _load_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == VALIDATOR_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": VALIDATOR_VERSION, "charts": {}}
 
-def main():
-    base = MUSIC_DIR
-    if len(sys.argv) > 1:
-        # validar so uma musica: tools/validate_beatmaps.py <song_id>
-        base = base / sys.argv[1]
-        if not base.exists():
-            print(f"pasta nao encontrada: {base}")
-            sys.exit(2)
-        song_dirs = [base]
+def run(charts, cache, jobs):
+    # devolve {caminho: resultado} e quantos vieram do cache
+    entries = cache["charts"]
+    results, pending, stats = {}, [], {}
+    hits = 0
+    for song_id, diff, path, folder, audio_sig in charts:
+        st = os.stat(path)
+        stats[path] = (st.st_mtime_ns, st.st_size, audio_sig)
+        ent = entries.get(path)
+        if ent and ent["audio"] == audio_sig and (ent["mtime_ns"], ent["size"]) == (st.st_mtime_ns, st.st_size):
+            results[path] = ent["result"]
+            hits += 1
+            continue
+        # mtime mudou mas o conteudo pode ser o mesmo: o worker confere o hash
+        same_audio = ent is not None and ent["audio"] == audio_sig
+        pending.append((path, folder, ent["digest"] if same_audio else None))
+
+    if jobs > 1 and len(pending) > jobs:
+        with ProcessPoolExecutor(jobs) as pool:
+            done = list(pool.map(_work, pending, chunksize=max(1, len(pending) // (jobs * 8))))
     else:
-        if not MUSIC_DIR.exists():
-            print("pasta 'musicas' nao encontrada")
-            sys.exit(2)
-        song_dirs = [p for p in MUSIC_DIR.iterdir() if p.is_dir()]
-
-    all_errors = []
-    for sdir in sorted(song_dirs, key=lambda p: p.name):
-        errs = validate_song(sdir)
-        if errs:
-            for e in errs:
-                print(e)
-            all_errors.extend(errs)
-        else:
-            print(f"[ok] {sdir.name} (easy/normal/hard validos ou ausentes)")
+        done = [_work(t) for t in pending]
 
-    if all_errors:
-        print(f"\nfalhas: {len(all_errors)} problema(s) encontrado(s)")
-        sys.exit(1)
+    for path, digest, result in done:
+        if result is None:  # hash igual ao do cache
+            result = entries[path]["result"]
+            hits += 1
+        results[path] = result
+        mtime_ns, size, audio_sig = stats[path]
+        if digest is not None:
+            entries[path] = {"mtime_ns": mtime_ns, "size": size, "digest": digest,
+                             "audio": audio_sig, "result": result}
+    return results, hits
+
+def write_json(path, charts, results, summary):
+    out = {
+        "version": VALIDATOR_VERSION,
+        "summary": summary,
+        "charts": [{"song": s, "difficulty": d, "path": p, **results[p]} for s, d, p, _, _ in charts],
+    }
+    if path == "-":
+        json.dump(out, sys.stdout, ensure_ascii=False, indent=2)
+        print()
     else:
-        print("\nvalidacao concluida sem erros.")
-        sys.exit(0)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(out, f, ensure_ascii=False, indent=2)
+
+def write_junit(path, charts, results, summary):
+    # um testcase por chart (classname = musica, name = dificuldade)
+    suite = ET.Element("testsuite", name="beatmaps", tests=str(len(charts)),
+                       failures=str(summary["failed"]), errors="0", time=f"{summary['seconds']:.3f}")
+    for song_id, diff, p, _, _ in charts:
+        res = results[p]
+        case = ET.SubElement(suite, "testcase", classname=song_id, name=diff, file=p)
+        if res["error_count"]:
+            fail = ET.SubElement(case, "failure", message=f"{res['error_count']} problema(s)",
+                                 type="beatmap")
+            fail.text = "\n".join(e["message"] for e in res["errors"])
+        if res["warnings"]:
+            ET.SubElement(case, "system-out").text = "\n".join(w["message"] for w in res["warnings"])
+    root = ET.Element("testsuites")
+    root.append(suite)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+def _print_text(charts, results, quiet):
+    by_song = {}
+    for song_id, diff, p, _, _ in charts:
+        by_song.setdefault(song_id, []).append((diff, results[p]))
+    for song_id, items in by_song.items():
+        bad = False
+        for diff, res in items:
+            for e in res["errors"]:
+                print(f"[{song_id}/{diff}] {e['message']}")
+            hidden = res["error_count"] - len(res["errors"])
+            if hidden > 0:
+                print(f"[{song_id}/{diff}] ... mais {hidden} problema(s)")
+            if not quiet:
+                for w in res["warnings"]:
+                    print(f"[{song_id}/{diff}] aviso: {w['message']}")
+            bad = bad or res["error_count"] > 0
+        if not bad and not quiet:
+            print(f"[ok] {song_id} ({len(items)} chart(s))")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("songs", nargs="*", help="valida so estas musicas (nome da pasta)")
+    ap.add_argument("--root", default=str(MUSIC_DIR), help="pasta com uma subpasta por musica")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--cache", default=CACHE_FILE)
+    ap.add_argument("--no-cache", action="store_true", help="revalida tudo (e nao grava o cache)")
+    ap.add_argument("--json", metavar="ARQUIVO", help="resultado em json ('-' = stdout)")
+    ap.add_argument("--junit", metavar="ARQUIVO", help="resultado em junit xml")
+    ap.add_argument("--quiet", action="store_true", help="so mostra problemas")
+    args = ap.parse_args()
+
+    base = Path(args.root)
+    if not base.is_dir():
+        print(f"pasta nao encontrada: {base}")
+        sys.exit(2)
+    missing = [s for s in args.songs if not (base / s).is_dir()]
+    if missing:
+        print(f"pasta nao encontrada: {', '.join(str(base / s) for s in missing)}")
+        sys.exit(2)
+
+    t0 = time.perf_counter()
+    charts = discover(base, set(args.songs))
+    cache = {"version": VALIDATOR_VERSION, "charts": {}} if args.no_cache else _load_cache(args.cache)
+    results, hits = run(charts, cache, args.jobs)
+    elapsed = time.perf_counter() - t0
+    if not args.no_cache:
+        os.makedirs(os.path.dirname(os.path.abspath(args.cache)), exist_ok=True)
+        _atomic_write(args.cache, cache)
+
+    failed = sum(1 for r in results.values() if r["error_count"])
+    summary = {
+        "charts": len(charts),
+        "failed": failed,
+        "problems": sum(r["error_count"] for r in results.values()),
+        "cached": hits,
+        "notes": sum(r["notes"] for r in results.values()),
+        "seconds": round(elapsed, 3),
+    }
+    if args.json != "-":
+        _print_text(charts, results, args.quiet)
+    if args.json:
+        write_json(args.json, charts, results, summary)
+    if args.junit:
+        write_junit(args.junit, charts, results, summary)
+
+    out = sys.stderr if args.json == "-" else sys.stdout
+    print(f"\n{summary['charts']} chart(s), {summary['cached']} do cache, {summary['notes']:,} notas "
+          f"em {elapsed:.2f} s ({args.jobs} processo(s))", file=out)
+    if failed:
+        print(f"falhas: {summary['problems']} problema(s) em {failed} chart(s)", file=out)
+        sys.exit(1)
+    print("validacao concluida sem erros.", file=out)
+    sys.exit(0)
 
 if __name__ == "__main__":
     main()